@@ -0,0 +1,111 @@
+"""
+Affinité conversation → catégories (cache du NIVEAU 1).
+
+Une conversation pose souvent plusieurs questions sur le même sujet. On
+mémorise, PAR CLIENT (session ou identifiant fourni par le client), les
+dernières catégories qui ont donné la meilleure réponse; le niveau 1 les
+explore en premier à la question suivante.
+
+Le cache est borné (éviction LRU), chaque entrée expire après un délai
+d'inactivité (TTL) et tous les accès sont protégés par un verrou: les
+threads d'un worker ne se marchent pas dessus et la recherche d'un
+utilisateur n'influence jamais celle d'un autre.
+
+Fonctions principales :
+- `AffinityCache.get(client_id)` : catégories récentes du client (plus récente d'abord).
+- `AffinityCache.record(client_id, category_id)` : mémorise la catégorie gagnante.
+- `get_affinity_cache()` : cache partagé du processus.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+
+class AffinityCache:
+    """
+    OrderedDict client_id → (expiration, [category_id, ...]), du moins
+    récemment utilisé au plus récemment utilisé.
+    """
+
+    def __init__(self, max_clients: int = 10000, ttl: float = 1800.0, per_client: int = 3):
+        self.max_clients = max_clients
+        self.ttl = ttl
+        self.per_client = per_client
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, client_id: Optional[str]) -> List[int]:
+        """
+        Catégories récentes d'un client, la plus récente d'abord.
+
+        Args:
+            client_id: identifiant de la conversation (None = pas d'affinité)
+
+        Returns:
+            Liste de category_id (vide si inconnu ou expiré)
+        """
+        if not client_id:
+            return []
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(client_id)
+            if entry is None:
+                return []
+            expires_at, categories = entry
+            if expires_at <= now:
+                del self._entries[client_id]
+                return []
+            self._entries.move_to_end(client_id)
+            return list(categories)
+
+    def record(self, client_id: Optional[str], category_id: int) -> None:
+        """
+        Mémoriser la catégorie de la meilleure réponse donnée à un client.
+
+        Args:
+            client_id: identifiant de la conversation (None = ignoré)
+            category_id: catégorie gagnante
+        """
+        if not client_id:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.pop(client_id, None)
+            categories = [] if entry is None or entry[0] <= now else entry[1]
+            categories = [category_id] + [c for c in categories if c != category_id]
+            self._entries[client_id] = (now + self.ttl, categories[:self.per_client])
+
+            # Éviction LRU
+            while len(self._entries) > self.max_clients:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Cache partagé par les threads du processus (créé à la première utilisation)
+_affinity_cache: Optional[AffinityCache] = None
+_affinity_lock = threading.Lock()
+
+
+def get_affinity_cache() -> AffinityCache:
+    """Retourne le cache d'affinité du processus (paramètres: settings.CHATBOT_AFFINITY_*)."""
+    global _affinity_cache
+
+    if _affinity_cache is None:
+        from django.conf import settings
+        with _affinity_lock:
+            if _affinity_cache is None:
+                _affinity_cache = AffinityCache(
+                    max_clients=getattr(settings, 'CHATBOT_AFFINITY_MAX_CLIENTS', 10000),
+                    ttl=getattr(settings, 'CHATBOT_AFFINITY_TTL', 1800),
+                )
+    return _affinity_cache
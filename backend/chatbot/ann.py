@@ -0,0 +1,308 @@
+"""
+Recherche approximative des plus proches voisins (IVF) pour les gros corpus.
+
+La recherche exacte (`FAQIndex.score`) reste linéaire en nombre de FAQs.
+Ici les FAQs sont regroupées hors ligne en clusters (k-means sphérique sur
+les vecteurs TF-IDF normalisés, centroïdes creux):
+
+- une question est comparée aux centroïdes (un produit matrice × vecteur);
+- seules les FAQs des `nprobe` clusters les plus proches sont candidates;
+- les candidates sont rescorées EXACTEMENT (cosinus de l'index résident).
+
+`nprobe` règle le compromis rappel / latence (settings.CHATBOT_ANN_NPROBE).
+Les listes stockent des ids de FAQ: une FAQ ajoutée depuis la dernière
+publication (mise à jour incrémentale) n'appartient à aucun cluster et est
+toujours rescorée. La republication qui suit la sauvegarde l'affecte au
+centroïde le plus proche (`with_faqs`); les centroïdes ne sont recalculés
+que par une réindexation complète.
+
+Fonctions principales :
+- `IVFIndex.build(index, n_clusters)` : clustering + listes inversées.
+- `IVFIndex.with_faqs(index, faq_ids)` : réaffectation de quelques FAQs, centroïdes conservés.
+- `IVFIndex.search(index, user_vec, user_norm, top_k, nprobe)` : top-k (faq_id, score).
+- `IVFIndex.save(directory)` / `IVFIndex.load(directory)` : artefacts (voir chatbot.artifacts).
+- `get_ann_index()` : index IVF du processus, aligné sur `get_faq_index()`.
+"""
+
+import json
+import threading
+import numpy as np
+import scipy.sparse as sp
+from pathlib import Path
+from typing import List, Optional, Tuple
+from chatbot.artifacts import artifact_generation, current_artifact_dir
+from chatbot.index import FAQIndex, get_faq_index, top_k_indices
+
+
+# Fichiers de l'index IVF dans un répertoire d'artefacts
+ANN_ARRAYS = ('centroid_data', 'centroid_indices', 'centroid_indptr', 'list_indptr', 'list_faq_ids')
+ANN_META = 'ann_meta.json'
+
+# Itérations du k-means sphérique
+KMEANS_ITERATIONS = 10
+
+# Lignes traitées par bloc lors de l'affectation aux centroïdes
+ASSIGN_CHUNK_SIZE = 4096
+
+
+def default_n_clusters(n_rows: int) -> int:
+    """Nombre de clusters par défaut: ~4·√N (listes de ~√N/4 FAQs)."""
+    return max(1, min(n_rows, int(4 * np.sqrt(max(n_rows, 1)))))
+
+
+def _normalize_rows(matrix: sp.csr_matrix) -> sp.csr_matrix:
+    """Lignes normalisées L2 (les lignes nulles restent nulles)."""
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()).astype(np.float32)
+    inverse = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    return sp.csr_matrix(sp.diags(inverse) @ matrix, dtype=np.float32)
+
+
+def _with_columns(matrix: sp.csr_matrix, n_columns: int) -> sp.csr_matrix:
+    """Matrice ramenée à `n_columns` colonnes (colonnes en trop ignorées, manquantes nulles)."""
+    if matrix.shape[1] > n_columns:
+        return matrix[:, :n_columns]
+    if matrix.shape[1] < n_columns:
+        return sp.csr_matrix((matrix.data, matrix.indices, matrix.indptr),
+                             shape=(matrix.shape[0], n_columns))
+    return matrix
+
+
+def _assign(normalized: sp.csr_matrix, centroids: sp.csr_matrix) -> np.ndarray:
+    """Cluster le plus proche (cosinus) de chaque ligne, par blocs."""
+    transposed = centroids.T.tocsr()
+    labels = np.empty(normalized.shape[0], dtype=np.int64)
+    for start in range(0, normalized.shape[0], ASSIGN_CHUNK_SIZE):
+        similarities = (normalized[start:start + ASSIGN_CHUNK_SIZE] @ transposed).toarray()
+        labels[start:start + ASSIGN_CHUNK_SIZE] = similarities.argmax(axis=1)
+    return labels
+
+
+class IVFIndex:
+    """
+    Centroïdes creux (CSR, un par cluster) et listes inversées:
+    les FAQs du cluster c sont `list_faq_ids[list_indptr[c]:list_indptr[c+1]]`.
+    """
+
+    def __init__(self, centroids: sp.csr_matrix, list_indptr: np.ndarray,
+                 list_faq_ids: np.ndarray, version: str = ''):
+        self.centroids = centroids
+        self.list_indptr = list_indptr
+        self.list_faq_ids = list_faq_ids
+        self.version = version
+        # Génération d'artefacts d'origine (voir `get_ann_index`)
+        self.generation = None
+        # (index résident, tri des faq_ids, lignes hors clusters) du dernier index interrogé
+        self._lookup: Optional[Tuple[FAQIndex, np.ndarray, np.ndarray]] = None
+
+    @property
+    def n_clusters(self) -> int:
+        return self.centroids.shape[0]
+
+    @classmethod
+    def build(cls, index: FAQIndex, n_clusters: Optional[int] = None,
+              seed: int = 0) -> 'IVFIndex':
+        """
+        Regrouper les FAQs de l'index en clusters (k-means sphérique creux).
+
+        Args:
+            index (FAQIndex): index CSR des FAQs actives
+            n_clusters (int): nombre de clusters (défaut: ~4·√N)
+            seed (int): graine de l'initialisation
+
+        Returns:
+            IVFIndex: centroïdes + listes inversées
+        """
+        n_rows = len(index)
+        if n_rows == 0:
+            return cls(sp.csr_matrix((0, index.n_features), dtype=np.float32),
+                       np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64), version=index.version)
+
+        n_clusters = min(n_clusters or default_n_clusters(n_rows), n_rows)
+        normalized = _normalize_rows(index.matrix)
+        rng = np.random.default_rng(seed)
+
+        centroids = normalized[rng.choice(n_rows, size=n_clusters, replace=False)]
+        labels = np.zeros(n_rows, dtype=np.int64)
+
+        for _ in range(KMEANS_ITERATIONS):
+            labels = _assign(normalized, centroids)
+
+            # Clusters vides: réamorcés sur des lignes tirées au hasard
+            counts = np.bincount(labels, minlength=n_clusters)
+            empty = np.flatnonzero(counts == 0)
+            if len(empty):
+                labels[rng.choice(n_rows, size=len(empty), replace=False)] = empty
+
+            membership = sp.csr_matrix(
+                (np.ones(n_rows, dtype=np.float32), (labels, np.arange(n_rows))),
+                shape=(n_clusters, n_rows),
+            )
+            centroids = _normalize_rows(membership @ normalized)
+
+        order = np.argsort(labels, kind='stable')
+        list_indptr = np.zeros(n_clusters + 1, dtype=np.int64)
+        list_indptr[1:] = np.cumsum(np.bincount(labels, minlength=n_clusters))
+        list_faq_ids = np.asarray(index.faq_ids, dtype=np.int64)[order]
+
+        return cls(centroids, list_indptr, list_faq_ids, version=index.version)
+
+    def with_faqs(self, index: FAQIndex, faq_ids) -> 'IVFIndex':
+        """
+        Copie où les FAQs `faq_ids` sont réaffectées au centroïde le plus
+        proche de leur ligne dans `index`, ou retirées des listes si elles
+        n'y sont plus. Pas de k-means: les centroïdes sont conservés.
+
+        Args:
+            index (FAQIndex): index contenant les nouvelles lignes
+            faq_ids: ids des FAQs créées, modifiées ou retirées
+
+        Returns:
+            IVFIndex: nouvel index, à la version de `index`
+        """
+        faq_ids = np.asarray(list(faq_ids), dtype=np.int64)
+        labels = np.repeat(np.arange(self.n_clusters, dtype=np.int64), np.diff(self.list_indptr))
+        keep = ~np.isin(self.list_faq_ids, faq_ids)
+        labels, list_faq_ids = labels[keep], np.asarray(self.list_faq_ids[keep], dtype=np.int64)
+
+        rows = np.flatnonzero(np.isin(index.faq_ids, faq_ids))
+        if len(rows) and self.n_clusters:
+            matrix = _with_columns(index.matrix[rows], self.centroids.shape[1])
+            labels = np.concatenate([labels, _assign(_normalize_rows(matrix), self.centroids)])
+            list_faq_ids = np.concatenate([list_faq_ids, np.asarray(index.faq_ids[rows], dtype=np.int64)])
+
+        order = np.argsort(labels, kind='stable')
+        list_indptr = np.zeros(self.n_clusters + 1, dtype=np.int64)
+        list_indptr[1:] = np.cumsum(np.bincount(labels, minlength=self.n_clusters))
+        return IVFIndex(self.centroids, list_indptr, list_faq_ids[order], version=index.version)
+
+    def save(self, directory: Path) -> None:
+        """Écrire centroïdes et listes dans un répertoire d'artefacts."""
+        arrays = {
+            'centroid_data': self.centroids.data.astype(np.float32),
+            'centroid_indices': self.centroids.indices.astype(np.int32),
+            'centroid_indptr': self.centroids.indptr.astype(np.int64),
+            'list_indptr': self.list_indptr,
+            'list_faq_ids': self.list_faq_ids,
+        }
+        for name, array in arrays.items():
+            np.save(directory / f"{name}.npy", array)
+        with open(directory / ANN_META, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'n_clusters': self.n_clusters,
+                       'n_features': self.centroids.shape[1]}, f)
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional['IVFIndex']:
+        """Relire l'index IVF d'un répertoire d'artefacts (None s'il n'y en a pas)."""
+        if not (directory / ANN_META).exists():
+            return None
+        with open(directory / ANN_META, encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {name: np.load(directory / f"{name}.npy") for name in ANN_ARRAYS}
+        centroids = sp.csr_matrix(
+            (arrays['centroid_data'], arrays['centroid_indices'], arrays['centroid_indptr']),
+            shape=(meta['n_clusters'], meta['n_features']),
+        )
+        return cls(centroids, arrays['list_indptr'], arrays['list_faq_ids'], version=meta['version'])
+
+    def _row_lookup(self, index: FAQIndex) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (tri des faq_ids de l'index, lignes absentes de tous les clusters),
+        recalculés uniquement quand l'index résident a été remplacé.
+        """
+        lookup = self._lookup
+        if lookup is None or lookup[0] is not index:
+            sorter = np.argsort(index.faq_ids, kind='stable')
+            orphans = np.flatnonzero(~np.isin(index.faq_ids, self.list_faq_ids))
+            lookup = (index, sorter, orphans)
+            self._lookup = lookup
+        return lookup[1], lookup[2]
+
+    def candidate_rows(self, index: FAQIndex, user_vec: np.ndarray, user_norm: float,
+                       nprobe: int) -> np.ndarray:
+        """Lignes de l'index à rescorer: FAQs des `nprobe` clusters les plus proches."""
+        user_vec = np.asarray(user_vec, dtype=np.float32)
+        n_features = self.centroids.shape[1]
+        if user_vec.shape[0] < n_features:
+            user_vec = np.pad(user_vec, (0, n_features - user_vec.shape[0]))
+        similarities = self.centroids @ (user_vec[:n_features] / np.float32(user_norm))
+
+        probes = top_k_indices(similarities, min(nprobe, self.n_clusters))
+        faq_ids = np.concatenate(
+            [self.list_faq_ids[self.list_indptr[c]:self.list_indptr[c + 1]] for c in probes]
+        )
+
+        # faq_id → ligne de l'index courant (les FAQs retirées depuis sont ignorées)
+        sorter, orphans = self._row_lookup(index)
+        sorted_ids = index.faq_ids[sorter]
+        positions = np.minimum(np.searchsorted(sorted_ids, faq_ids), len(sorted_ids) - 1)
+        found = sorted_ids[positions] == faq_ids
+        rows = sorter[positions[found]]
+
+        return np.union1d(rows, orphans)
+
+    def search(self, index: FAQIndex, user_vec: np.ndarray, user_norm: float,
+               top_k: int = 3, nprobe: int = 8) -> List[Tuple[int, float]]:
+        """
+        Top-k approximatif: candidats des `nprobe` meilleurs clusters, rescorés exactement.
+
+        Args:
+            index (FAQIndex): index résident (scores exacts)
+            user_vec: Vecteur TF-IDF dense de la question
+            user_norm: Norme du vecteur utilisateur
+            top_k (int): Nombre de résultats
+            nprobe (int): Nombre de clusters explorés (rappel ↑, latence ↑)
+
+        Returns:
+            List de tuples (faq_id, score), score décroissant
+        """
+        if len(index) == 0 or user_norm == 0 or self.n_clusters == 0:
+            return []
+
+        rows = self.candidate_rows(index, user_vec, user_norm, nprobe)
+        if not len(rows):
+            return []
+
+        scores = index.score_rows(rows, user_vec, user_norm)
+        order = top_k_indices(scores, top_k)
+        return [(int(index.faq_ids[rows[i]]), float(scores[i])) for i in order]
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# INDEX IVF PARTAGÉ DU PROCESSUS
+# ═══════════════════════════════════════════════════════════════════════
+
+_ann_index: Optional[IVFIndex] = None
+_ann_lock = threading.Lock()
+
+
+def get_ann_index() -> IVFIndex:
+    """
+    Retourne l'index IVF du processus.
+
+    Relu depuis les artefacts courants (ou reconstruit s'ils n'en
+    contiennent pas) à chaque nouvelle publication d'artefacts; les mises à
+    jour incrémentales de l'index résident ne le reconstruisent pas.
+    """
+    global _ann_index
+
+    faq_index = get_faq_index()
+    generation = (artifact_generation(), faq_index.version)
+    ann = _ann_index
+    if ann is not None and ann.generation == generation:
+        return ann
+
+    with _ann_lock:
+        # Un autre thread a pu charger cette génération pendant l'attente du verrou
+        ann = _ann_index
+        if ann is not None and ann.generation == generation:
+            return ann
+
+        directory = current_artifact_dir()
+        ann = IVFIndex.load(directory) if directory is not None else None
+        if ann is None or ann.version != faq_index.version:
+            from django.conf import settings
+            ann = IVFIndex.build(faq_index, getattr(settings, 'CHATBOT_ANN_CLUSTERS', 0) or None)
+        ann.generation = generation
+        _ann_index = ann
+    print(f"[ANN] ✅ Index IVF prêt: {ann.n_clusters} clusters")
+    return ann
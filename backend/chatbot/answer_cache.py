@@ -0,0 +1,112 @@
+"""
+Cache partagé des réponses de /api/chatbot/ask/.
+
+Les réponses sont stockées dans l'alias de cache `answers` (table
+`chatbot_answer_cache` de la base, voir `settings.CACHES`): tous les
+workers partagent les mêmes entrées et elles survivent à un redémarrage.
+
+Chaque clé contient le numéro de GÉNÉRATION du corpus. Les signaux de
+sauvegarde/suppression des FAQs et catégories (et chaque réindexation
+complète) incrémentent cette génération: les anciennes entrées ne sont
+plus jamais lues, sans aucun parcours du cache, et expirent d'elles-mêmes.
+
+Fonctions principales :
+- `get_cached_answers(questions, top_k)` : lecture groupée {question: réponse}.
+- `set_cached_answers(answers, top_k)` : écriture groupée.
+- `bump_corpus_generation()` : invalide toutes les réponses en cache.
+"""
+
+import hashlib
+import time
+from typing import Dict, List
+from django.core.cache import caches
+from chatbot.preprocessing import canonicalize_query
+
+
+# Alias du cache des réponses (settings.CACHES)
+ANSWER_CACHE_ALIAS = 'answers'
+
+# Durée de vie d'une réponse en cache (secondes)
+ANSWER_CACHE_TIMEOUT = 3600
+
+# Clé de la génération courante du corpus (sans expiration)
+GENERATION_KEY = 'chatbot:corpus_generation'
+
+
+def get_answer_cache():
+    """Backend de cache des réponses."""
+    return caches[ANSWER_CACHE_ALIAS]
+
+
+def get_corpus_generation() -> int:
+    """
+    Génération courante du corpus.
+
+    Si la clé est absente (premier démarrage, entrée évincée), une valeur
+    neuve basée sur l'horloge est créée: elle ne peut correspondre à
+    aucune ancienne entrée, l'absence ne sert donc jamais de réponse périmée.
+    """
+    cache = get_answer_cache()
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, time.time_ns(), None)
+        generation = cache.get(GENERATION_KEY, time.time_ns())
+    return generation
+
+
+def bump_corpus_generation() -> int:
+    """Passer à une nouvelle génération: toutes les réponses en cache sont invalidées."""
+    generation = time.time_ns()
+    get_answer_cache().set(GENERATION_KEY, generation, None)
+    return generation
+
+
+def answer_cache_key(question: str, top_k: int, generation: int) -> str:
+    """
+    Clé d'une réponse, calculée sur la forme canonique de la question:
+    « Comment réinitialiser mon mot de passe ? » et « comment reinitialiser
+    mon mot de passe » partagent la même entrée.
+    """
+    digest = hashlib.md5(canonicalize_query(question).encode()).hexdigest()
+    return f"answer:{generation}:{top_k}:{digest}"
+
+
+def get_cached_answers(questions: List[str], top_k: int) -> Dict[str, dict]:
+    """
+    Réponses en cache pour la génération courante.
+
+    Le champ `question` de chaque réponse est remplacé par la question
+    posée (l'entrée a pu être créée par une autre formulation).
+
+    Args:
+        questions: Questions posées
+        top_k (int): Nombre de résultats demandés (fait partie de la clé)
+
+    Returns:
+        Dict {question: réponse} limité aux questions trouvées en cache
+    """
+    generation = get_corpus_generation()
+    keys = {question: answer_cache_key(question, top_k, generation) for question in questions}
+    found = get_answer_cache().get_many(list(set(keys.values())))
+    return {
+        question: dict(found[key], question=question)
+        for question, key in keys.items()
+        if key in found
+    }
+
+
+def set_cached_answers(answers: Dict[str, dict], top_k: int) -> None:
+    """
+    Mettre des réponses en cache pour la génération courante.
+
+    Args:
+        answers: Dict {question: réponse}
+        top_k (int): Nombre de résultats demandés
+    """
+    if not answers:
+        return
+    generation = get_corpus_generation()
+    get_answer_cache().set_many(
+        {answer_cache_key(question, top_k, generation): answer for question, answer in answers.items()},
+        ANSWER_CACHE_TIMEOUT,
+    )
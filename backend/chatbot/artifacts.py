@@ -0,0 +1,183 @@
+"""
+Artefacts versionnés du moteur de recherche (vectorizer + vocabulaire + index).
+
+Chaque publication (réindexation complète, ou republication incrémentale
+après une sauvegarde) écrit un répertoire immuable nommé par le hash de son
+contenu:
+
+    ARTIFACTS_ROOT/
+        CURRENT                 → nom du répertoire actif (remplacé par rename atomique)
+        3f9a1c.../vectorizer.pkl
+                  vocabulary.json
+                  data.npy, indices.npy, indptr.npy, faq_ids.npy, ...
+                  meta.json
+
+Un worker n'ouvre jamais un répertoire incomplet (écrit sous un nom
+temporaire puis renommé) et détecte une nouvelle publication par un simple
+`os.stat` du fichier CURRENT: il recharge alors son vectorizer et son index
+sans redémarrer, sans coupure ni démarrage à froid.
+
+Ce module ne dépend que du système de fichiers: `chatbot.index` et
+`chatbot.vectorization` l'utilisent pour écrire et relire les artefacts.
+
+Fonctions principales :
+- `publish_artifacts(write_files)` : écrit, hashe, renomme et publie un répertoire.
+- `current_artifact_dir()` : répertoire actif (ou None).
+- `artifact_generation()` : marqueur bon marché de la publication courante.
+- `publication_lock()` : sérialise les publications de tous les processus.
+"""
+
+import hashlib
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Tuple
+
+
+# Répertoire racine des artefacts publiés
+ARTIFACTS_ROOT = Path('/tmp/faq_artifacts')
+
+# Pointeur vers le répertoire actif
+CURRENT_FILE = 'CURRENT'
+
+# Nombre de répertoires conservés (les workers peuvent encore mapper l'ancien)
+ARTIFACTS_KEEP = 3
+
+# Verrou des publications (fichier créé atomiquement, partagé par les workers)
+PUBLICATION_LOCK_FILE = '.publish.lock'
+
+# Âge (secondes) au-delà duquel un verrou est considéré abandonné (worker tué)
+PUBLICATION_LOCK_TIMEOUT = 300
+
+
+def _content_hash(directory: Path) -> str:
+    """Hash SHA-1 (16 caractères) des noms et contenus des fichiers d'un répertoire."""
+    digest = hashlib.sha1()
+    for path in sorted(directory.iterdir()):
+        digest.update(path.name.encode('utf-8'))
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def publish_artifacts(write_files: Callable[[Path], None],
+                      root: Path = ARTIFACTS_ROOT) -> Path:
+    """
+    Écrire un nouveau jeu d'artefacts et le rendre actif atomiquement.
+
+    Args:
+        write_files: fonction qui écrit les fichiers dans le répertoire donné
+        root (Path): répertoire racine des artefacts
+
+    Returns:
+        Path: répertoire publié (`root/<hash du contenu>`)
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    tmp_dir = root / f".build.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir()
+
+    try:
+        write_files(tmp_dir)
+        target = root / _content_hash(tmp_dir)
+        if target.exists():
+            # Contenu identique déjà publié: on le réutilise tel quel
+            shutil.rmtree(tmp_dir)
+        else:
+            os.rename(tmp_dir, target)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    # Bascule du pointeur (rename atomique: jamais de CURRENT à moitié écrit)
+    pointer_tmp = root / f".{CURRENT_FILE}.{os.getpid()}.tmp"
+    pointer_tmp.write_text(target.name)
+    os.replace(pointer_tmp, root / CURRENT_FILE)
+
+    _cleanup_old_artifacts(root, keep=target)
+
+    print(f"[Artifacts] 📦 Artefacts publiés: {target}")
+    return target
+
+
+def _cleanup_old_artifacts(root: Path, keep: Path) -> None:
+    """Supprimer les répertoires les plus anciens au-delà de ARTIFACTS_KEEP."""
+    directories = sorted(
+        (d for d in root.iterdir() if d.is_dir() and not d.name.startswith('.') and d != keep),
+        key=lambda d: d.stat().st_mtime,
+        reverse=True,
+    )
+    for old in directories[ARTIFACTS_KEEP - 1:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+
+def current_artifact_dir(root: Path = ARTIFACTS_ROOT) -> Optional[Path]:
+    """Répertoire pointé par CURRENT, ou None s'il n'y a pas d'artefacts valides."""
+    try:
+        name = (root / CURRENT_FILE).read_text().strip()
+    except OSError:
+        return None
+
+    directory = root / name
+    if not name or not (directory / 'meta.json').exists():
+        return None
+    return directory
+
+
+def artifact_generation(root: Path = ARTIFACTS_ROOT) -> Optional[Tuple[int, int]]:
+    """
+    Marqueur de la publication courante: (inode, mtime_ns) du fichier CURRENT.
+
+    Chaque publication remplace CURRENT par rename: l'inode change, un
+    `os.stat` suffit donc à détecter une nouvelle génération.
+    """
+    try:
+        stat = os.stat(root / CURRENT_FILE)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+@contextmanager
+def publication_lock(root: Path = ARTIFACTS_ROOT,
+                     timeout: float = PUBLICATION_LOCK_TIMEOUT) -> Iterator[None]:
+    """
+    Sérialiser les publications de tous les processus.
+
+    Une republication incrémentale part des artefacts courants: sans ce
+    verrou, deux workers qui publient en même temps perdraient chacun les
+    FAQs de l'autre. Même principe que le verrou de démarrage (création
+    atomique O_CREAT | O_EXCL); un verrou plus vieux que `timeout` secondes
+    est retiré.
+
+    Args:
+        root (Path): répertoire racine des artefacts
+        timeout (float): âge maximal d'un verrou avant de le considérer abandonné
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    lock_file = root / PUBLICATION_LOCK_FILE
+
+    while True:
+        try:
+            fd = os.open(str(lock_file), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                age = time.time() - lock_file.stat().st_mtime
+            except OSError:
+                continue  # libéré entre-temps
+            if age > timeout:
+                print(f"[Artifacts] ⚠️ Verrou de publication abandonné ({age:.0f}s), retiré")
+                lock_file.unlink(missing_ok=True)
+            else:
+                time.sleep(0.05)
+
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        os.close(fd)
+        yield
+    finally:
+        lock_file.unlink(missing_ok=True)
@@ -0,0 +1,639 @@
+"""
+Index FAQ résident en mémoire (matrice creuse CSR).
+
+Au lieu de relire et désérialiser les lignes `FAQVector` à chaque requête,
+chaque processus charge UNE FOIS tous les vecteurs actifs dans une matrice
+`scipy.sparse.csr_matrix` float32, accompagnée de tableaux parallèles:
+
+- `faq_ids`      : id de la FAQ de chaque ligne
+- `category_ids` : id de la catégorie de chaque ligne
+- `norms`        : norme L2 de chaque ligne
+
+Scorer une question = un produit matrice creuse × vecteur, puis une
+recherche d'ids. L'index est reconstruit par `compute_and_store_vectors()`.
+
+Snapshot disque (partagé entre workers gunicorn):
+    Le répertoire d'artefacts courant (`chatbot.artifacts`) contient
+    data/indices/indptr (CSR), faq_ids, category_ids, norms (.npy). Les
+    workers l'ouvrent en `np.memmap` (mode lecture seule): les pages sont
+    partagées via le page cache de l'OS, la RSS de chaque worker reste stable
+    et un worker neuf est prêt en quelques millisecondes, sans réentraînement
+    ni lecture en base.
+
+Format de stockage `FAQVector.sparse_vector` (BinaryField):
+    [indices des termes: int32 little-endian × nnz][valeurs: float32 × nnz]
+Le décodage se fait avec `np.frombuffer`, sans copie ni parsing JSON.
+
+Fonctions principales :
+- `pack_sparse_vector()` / `unpack_sparse_vector()` : encodage binaire creux.
+- `get_faq_index()` : index partagé du processus (artefacts ou base, à la demande).
+- `rebuild_faq_index()` : reconstruit l'index depuis la base.
+- `install_faq_index()` : remplace atomiquement l'index du processus et son vectorizer (hot reload).
+- `patch_faq_index()` / `remove_from_faq_index()` : mises à jour d'une seule FAQ (ce processus).
+- `update_faq_index()` : remplace l'index du processus par une copie modifiée (lecture + remplacement sous verrou).
+"""
+
+import json
+import threading
+import numpy as np
+import scipy.sparse as sp
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from faq.models import FAQVector
+from chatbot.artifacts import current_artifact_dir
+
+
+# Tableaux persistés dans un snapshot (un fichier .npy chacun)
+SNAPSHOT_ARRAYS = ('data', 'indices', 'indptr', 'faq_ids', 'category_ids', 'norms')
+
+
+# Types du format binaire (little-endian pour être portable entre machines)
+SPARSE_INDEX_DTYPE = np.dtype('<i4')
+SPARSE_VALUE_DTYPE = np.dtype('<f4')
+
+
+def pack_sparse_vector(indices, values) -> bytes:
+    """
+    Encoder un vecteur creux en bytes pour `FAQVector.sparse_vector`.
+
+    Args:
+        indices: indices des termes non nuls (triés)
+        values: poids TF-IDF correspondants
+
+    Returns:
+        bytes: indices int32 suivis des valeurs float32
+    """
+    return (np.asarray(indices, dtype=SPARSE_INDEX_DTYPE).tobytes()
+            + np.asarray(values, dtype=SPARSE_VALUE_DTYPE).tobytes())
+
+
+def unpack_sparse_vector(blob) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Décoder un vecteur creux SANS copie (vues `np.frombuffer` sur le blob).
+
+    Args:
+        blob (bytes | memoryview): contenu de `FAQVector.sparse_vector`
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (indices int32, valeurs float32), lecture seule
+    """
+    nnz = len(blob) // (SPARSE_INDEX_DTYPE.itemsize + SPARSE_VALUE_DTYPE.itemsize)
+    indices = np.frombuffer(blob, dtype=SPARSE_INDEX_DTYPE, count=nnz)
+    values = np.frombuffer(blob, dtype=SPARSE_VALUE_DTYPE, count=nnz,
+                           offset=nnz * SPARSE_INDEX_DTYPE.itemsize)
+    return indices, values
+
+
+def top_k_indices(scores: np.ndarray, top_k: Optional[int]) -> np.ndarray:
+    """
+    Indices des `top_k` meilleurs scores, triés par score décroissant.
+
+    Sélection partielle `np.argpartition` en O(n), puis tri des seuls k
+    gagnants: pas de tri complet O(n log n) du tableau de scores.
+
+    Args:
+        scores (np.ndarray): scores 1D
+        top_k (int): nombre d'indices voulus (None = tous, tri complet)
+
+    Returns:
+        np.ndarray: indices dans `scores`
+    """
+    n = len(scores)
+    if top_k is None or top_k >= n:
+        return np.argsort(-scores, kind='stable')
+    if top_k <= 0:
+        return np.zeros(0, dtype=np.intp)
+
+    winners = np.argpartition(-scores, top_k - 1)[:top_k]
+    return winners[np.argsort(-scores[winners], kind='stable')]
+
+
+class FAQIndex:
+    """
+    Matrice CSR float32 des vecteurs TF-IDF des FAQs actives.
+
+    Les lignes de la matrice sont alignées avec `faq_ids`, `category_ids`
+    et `norms`.
+
+    `vectorizer` est le vectorizer dont les colonnes sont celles de la
+    matrice: l'index et son vectorizer sont publiés d'un bloc (une seule
+    affectation), un lecteur ne voit jamais l'un sans l'autre.
+    """
+
+    def __init__(self, matrix: sp.csr_matrix, faq_ids: np.ndarray,
+                 category_ids: np.ndarray, norms: np.ndarray, version: str = '',
+                 vectorizer=None):
+        self.matrix = matrix
+        self.faq_ids = faq_ids
+        self.category_ids = category_ids
+        self.norms = norms
+        self.version = version
+        self.vectorizer = vectorizer
+
+        # Lignes de chaque catégorie (pour la recherche par catégorie)
+        self._category_rows = {}
+        if len(category_ids):
+            order = np.argsort(category_ids, kind='stable')
+            cats, starts = np.unique(category_ids[order], return_index=True)
+            for cat_id, rows in zip(cats, np.split(order, starts[1:])):
+                self._category_rows[int(cat_id)] = rows
+
+    def __len__(self):
+        return len(self.faq_ids)
+
+    @property
+    def n_features(self) -> int:
+        return self.matrix.shape[1]
+
+    @classmethod
+    def from_database(cls, chunk_size: int = 1000) -> 'FAQIndex':
+        """
+        Construire l'index depuis les `FAQVector` des FAQs actives.
+
+        Les blobs creux sont décodés par vues `np.frombuffer` puis concaténés
+        une seule fois dans les tableaux CSR.
+
+        Args:
+            chunk_size (int): taille des lots lus depuis la base
+
+        Returns:
+            FAQIndex: index prêt à l'emploi (éventuellement vide)
+        """
+        rows = FAQVector.objects.filter(faq__is_active=True).values_list(
+            'faq_id', 'faq__category_id', 'norm', 'sparse_vector', 'vectorizer_version'
+        ).order_by('faq_id')
+
+        faq_ids = []
+        category_ids = []
+        norms = []
+        indices = []
+        data = []
+        indptr = [0]
+        versions = set()
+        n_features = 0
+
+        for faq_id, category_id, norm, blob, version in rows.iterator(chunk_size=chunk_size):
+            row_indices, row_values = unpack_sparse_vector(blob)
+            if len(row_indices):
+                n_features = max(n_features, int(row_indices.max()) + 1)
+
+            faq_ids.append(faq_id)
+            category_ids.append(category_id)
+            norms.append(norm)
+            indices.append(row_indices)
+            data.append(row_values)
+            indptr.append(indptr[-1] + len(row_indices))
+            versions.add(version)
+
+        if len(versions) > 1:
+            print(f"[Index] ⚠️ Vecteurs issus de {len(versions)} vectorizers: {sorted(versions)[:3]}")
+
+        matrix = sp.csr_matrix(
+            (
+                np.concatenate(data) if data else np.zeros(0, dtype=np.float32),
+                np.concatenate(indices) if indices else np.zeros(0, dtype=np.int32),
+                np.asarray(indptr, dtype=np.int32),
+            ),
+            shape=(len(faq_ids), n_features),
+            dtype=np.float32,
+        )
+
+        return cls(
+            matrix,
+            np.asarray(faq_ids, dtype=np.int64),
+            np.asarray(category_ids, dtype=np.int64),
+            np.asarray(norms, dtype=np.float32),
+            version=versions.pop() if len(versions) == 1 else '',
+        )
+
+    def row_indices(self, faq_id: int) -> Optional[np.ndarray]:
+        """Indices des termes non nuls de la FAQ, ou None si elle n'est pas indexée."""
+        rows = np.flatnonzero(self.faq_ids == faq_id)
+        if not len(rows):
+            return None
+        start, end = self.matrix.indptr[rows[0]], self.matrix.indptr[rows[0] + 1]
+        return np.asarray(self.matrix.indices[start:end])
+
+    def without_faqs(self, faq_ids) -> 'FAQIndex':
+        """
+        Copie de l'index sans les lignes des FAQs données.
+
+        Args:
+            faq_ids: ids des FAQs à retirer
+
+        Returns:
+            FAQIndex: nouvel index (ou `self` si rien à retirer)
+        """
+        keep = ~np.isin(self.faq_ids, np.asarray(list(faq_ids), dtype=np.int64))
+        if keep.all():
+            return self
+
+        return FAQIndex(
+            self.matrix[keep],
+            np.asarray(self.faq_ids[keep]),
+            np.asarray(self.category_ids[keep]),
+            np.asarray(self.norms[keep]),
+            version=self.version,
+            vectorizer=self.vectorizer,
+        )
+
+    def with_faq(self, faq_id: int, category_id: int, indices: np.ndarray,
+                 values: np.ndarray, norm: float) -> 'FAQIndex':
+        """
+        Copie de l'index où la ligne de `faq_id` est remplacée (ou ajoutée).
+
+        Coût O(nnz) sans accès base: utilisé pour les mises à jour
+        incrémentales d'une seule FAQ.
+
+        Returns:
+            FAQIndex: nouvel index
+        """
+        n_features = int(indices.max()) + 1 if len(indices) else 0
+        row = sp.csr_matrix(
+            (np.asarray(values, dtype=np.float32), np.asarray(indices, dtype=np.int32),
+             np.asarray([0, len(indices)], dtype=np.int32)),
+            shape=(1, n_features),
+        )
+        return self.with_faqs([faq_id], [category_id], row, [norm])
+
+    def with_faqs(self, faq_ids, category_ids, rows: sp.csr_matrix, norms) -> 'FAQIndex':
+        """
+        Copie de l'index où les lignes de plusieurs FAQs sont remplacées (ou
+        ajoutées) d'un bloc: une seule copie des tableaux.
+
+        Args:
+            faq_ids: ids des FAQs
+            category_ids: catégories correspondantes
+            rows: matrice CSR, une ligne par FAQ
+            norms: normes L2 des lignes
+
+        Returns:
+            FAQIndex: nouvel index
+        """
+        base = self.without_faqs(faq_ids)
+        n_features = max(base.n_features, rows.shape[1])
+
+        matrix = base.matrix
+        if matrix.shape[1] < n_features:
+            matrix = sp.csr_matrix((matrix.data, matrix.indices, matrix.indptr),
+                                   shape=(matrix.shape[0], n_features))
+        if rows.shape[1] < n_features:
+            rows = sp.csr_matrix((rows.data, rows.indices, rows.indptr),
+                                 shape=(rows.shape[0], n_features))
+
+        return FAQIndex(
+            sp.vstack([matrix, rows], format='csr', dtype=np.float32),
+            np.concatenate([base.faq_ids, np.asarray(faq_ids, dtype=np.int64)]),
+            np.concatenate([base.category_ids, np.asarray(category_ids, dtype=np.int64)]),
+            np.concatenate([base.norms, np.asarray(norms, dtype=np.float32)]).astype(np.float32),
+            version=self.version,
+            vectorizer=self.vectorizer,
+        )
+
+    def with_matrix(self, matrix: sp.csr_matrix, vectorizer=None) -> 'FAQIndex':
+        """
+        Copie de l'index où les lignes sont remplacées par `matrix` (mêmes
+        lignes, mêmes termes, poids différents), normes recalculées.
+
+        Coût O(nnz) sans accès base: utilisé pour repondérer tout l'index
+        quand l'IDF change (mode hachage).
+
+        Args:
+            matrix: matrice CSR alignée avec `faq_ids`
+            vectorizer: vectorizer de la nouvelle matrice (défaut: inchangé)
+
+        Returns:
+            FAQIndex: nouvel index
+        """
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1), dtype=np.float64).ravel())
+        return FAQIndex(
+            sp.csr_matrix(matrix, dtype=np.float32),
+            self.faq_ids,
+            self.category_ids,
+            norms.astype(np.float32),
+            version=self.version,
+            vectorizer=vectorizer if vectorizer is not None else self.vectorizer,
+        )
+
+    def save_snapshot(self, directory: Path, prefix: str = '') -> None:
+        """
+        Écrire les tableaux de l'index (.npy) et `meta.json` dans `directory`.
+
+        La publication atomique du répertoire est gérée par `chatbot.artifacts`.
+
+        Args:
+            directory (Path): répertoire (existant) de destination
+            prefix (str): préfixe des noms de fichiers (plusieurs index par répertoire)
+        """
+        arrays = {
+            'data': np.asarray(self.matrix.data, dtype=np.float32),
+            'indices': np.asarray(self.matrix.indices, dtype=np.int32),
+            'indptr': np.asarray(self.matrix.indptr, dtype=np.int32),
+            'faq_ids': self.faq_ids,
+            'category_ids': self.category_ids,
+            'norms': self.norms,
+        }
+        for name in SNAPSHOT_ARRAYS:
+            np.save(directory / f"{prefix}{name}.npy", arrays[name])
+
+        with open(directory / f"{prefix}meta.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': self.version,
+                'rows': len(self),
+                'n_features': self.n_features,
+                'nnz': int(self.matrix.nnz),
+            }, f)
+
+    @classmethod
+    def load_snapshot(cls, directory: Path, prefix: str = '', vectorizer=None) -> 'FAQIndex':
+        """
+        Ouvrir un snapshot en `np.memmap` (lecture seule, aucune copie).
+
+        Args:
+            directory (Path): répertoire du snapshot
+            prefix (str): préfixe des noms de fichiers
+            vectorizer: vectorizer publié avec ce snapshot (optionnel)
+
+        Returns:
+            FAQIndex: index dont les tableaux pointent dans le page cache
+        """
+        with open(directory / f"{prefix}meta.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        arrays = {
+            name: np.load(directory / f"{prefix}{name}.npy", mmap_mode='r')
+            for name in SNAPSHOT_ARRAYS
+        }
+
+        matrix = sp.csr_matrix(
+            (arrays['data'], arrays['indices'], arrays['indptr']),
+            shape=(meta['rows'], meta['n_features']),
+            copy=False,
+        )
+
+        return cls(
+            matrix,
+            arrays['faq_ids'],
+            arrays['category_ids'],
+            arrays['norms'],
+            version=meta['version'],
+            vectorizer=vectorizer,
+        )
+
+    def score(self, user_vec: np.ndarray, user_norm: float) -> np.ndarray:
+        """
+        Similarités cosinus de la question avec TOUTES les lignes de l'index.
+
+        Args:
+            user_vec: Vecteur TF-IDF dense de la question
+            user_norm: Norme du vecteur utilisateur
+
+        Returns:
+            np.ndarray: scores float32 alignés avec `faq_ids` (dans [0, 1])
+        """
+        return self.score_rows(None, user_vec, user_norm)
+
+    def score_rows(self, rows: Optional[np.ndarray], user_vec: np.ndarray,
+                   user_norm: float) -> np.ndarray:
+        """
+        Similarités cosinus de la question avec les lignes `rows` seulement.
+
+        Args:
+            rows: indices des lignes à scorer (None = toutes)
+            user_vec: Vecteur TF-IDF dense de la question
+            user_norm: Norme du vecteur utilisateur
+
+        Returns:
+            np.ndarray: scores float32 alignés avec `rows` (dans [0, 1])
+        """
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        norms = self.norms if rows is None else self.norms[rows]
+        if matrix.shape[0] == 0 or user_norm == 0:
+            return np.zeros(matrix.shape[0], dtype=np.float32)
+
+        # Les termes au-delà du dernier indice indexé n'ont aucun poids côté FAQ:
+        # ils comptent dans la norme de la question mais pas dans les produits.
+        user_vec = np.asarray(user_vec, dtype=np.float32)[:self.n_features]
+        dot_products = matrix @ user_vec
+        denominators = norms * np.float32(user_norm)
+        scores = np.divide(
+            dot_products, denominators,
+            out=np.zeros(matrix.shape[0], dtype=np.float32),
+            where=denominators > 0,
+        )
+        return np.clip(scores, 0.0, 1.0)
+
+    def score_faqs(self, faq_ids, user_vec: np.ndarray,
+                   user_norm: float) -> Dict[int, float]:
+        """
+        Similarités cosinus de la question avec quelques FAQs désignées par id.
+
+        Args:
+            faq_ids: ids des FAQs à scorer
+            user_vec: Vecteur TF-IDF dense de la question
+            user_norm: Norme du vecteur utilisateur
+
+        Returns:
+            Dict {faq_id: score} (les FAQs absentes de l'index sont omises)
+        """
+        rows = np.flatnonzero(np.isin(self.faq_ids, np.asarray(list(faq_ids), dtype=np.int64)))
+        scores = self.score_rows(rows, user_vec, user_norm)
+        return {int(self.faq_ids[row]): float(score) for row, score in zip(rows, scores)}
+
+    def search(self, user_vec: np.ndarray, user_norm: float, top_k: int = 3,
+               category_id: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Retourner les `top_k` meilleures FAQs (id, score), score décroissant.
+
+        Args:
+            user_vec: Vecteur TF-IDF dense de la question
+            user_norm: Norme du vecteur utilisateur
+            top_k (int): Nombre de résultats
+            category_id (int): Restreindre à une catégorie (None = tout l'index)
+
+        Returns:
+            List de tuples (faq_id, score)
+        """
+        if category_id is not None:
+            return self.search_categories(user_vec, user_norm, [category_id], top_k=top_k)
+
+        if user_vec.shape[0] < self.n_features:
+            print(f"[Index] ⚠️ Dimension incompatible: question={user_vec.shape[0]}, index={self.n_features}")
+            return []
+
+        scores = self.score(user_vec, user_norm)
+        order = top_k_indices(scores, top_k)
+
+        return [(int(self.faq_ids[i]), float(scores[i])) for i in order]
+
+    def search_categories(self, user_vec: np.ndarray, user_norm: float, category_ids,
+                          top_k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Top-k restreint aux FAQs de quelques catégories.
+
+        Seules les lignes de ces catégories sont multipliées: le coût dépend
+        de leur taille, pas de celle de l'index.
+
+        Args:
+            user_vec: Vecteur TF-IDF dense de la question
+            user_norm: Norme du vecteur utilisateur
+            category_ids: catégories à explorer
+            top_k (int): Nombre de résultats
+
+        Returns:
+            List de tuples (faq_id, score), score décroissant
+        """
+        if user_vec.shape[0] < self.n_features:
+            print(f"[Index] ⚠️ Dimension incompatible: question={user_vec.shape[0]}, index={self.n_features}")
+            return []
+
+        blocks = [self._category_rows[int(c)] for c in category_ids if int(c) in self._category_rows]
+        if not blocks:
+            return []
+
+        rows = np.concatenate(blocks)
+        scores = self.score_rows(rows, user_vec, user_norm)
+        order = top_k_indices(scores, top_k)
+
+        return [(int(self.faq_ids[rows[i]]), float(scores[i])) for i in order]
+
+    def search_many(self, user_matrix: sp.csr_matrix, user_norms: np.ndarray,
+                    top_k: int = 3, chunk_size: int = 256) -> List[List[Tuple[int, float]]]:
+        """
+        Top-k de plusieurs questions en un produit matrice creuse × matrice creuse.
+
+        Les questions sont traitées par paquets de `chunk_size` pour borner
+        la matrice de scores dense (chunk_size × nombre de FAQs).
+
+        Args:
+            user_matrix: Vecteurs TF-IDF des questions (CSR, une ligne par question)
+            user_norms: Normes des vecteurs questions
+            top_k (int): Nombre de résultats par question
+            chunk_size (int): Nombre de questions scorées par produit
+
+        Returns:
+            Une liste de tuples (faq_id, score) par question, dans l'ordre
+        """
+        n_queries = user_matrix.shape[0]
+        if len(self) == 0:
+            return [[] for _ in range(n_queries)]
+
+        # Même règle que `score`: les colonnes au-delà de l'index sont ignorées
+        user_matrix = sp.csr_matrix(user_matrix, dtype=np.float32)
+        if user_matrix.shape[1] > self.n_features:
+            user_matrix = user_matrix[:, :self.n_features]
+        elif user_matrix.shape[1] < self.n_features:
+            user_matrix = sp.csr_matrix(
+                (user_matrix.data, user_matrix.indices, user_matrix.indptr),
+                shape=(n_queries, self.n_features),
+            )
+
+        user_norms = np.asarray(user_norms, dtype=np.float32)
+        transposed = self.matrix.T.tocsr()
+        results = []
+
+        for start in range(0, n_queries, chunk_size):
+            chunk = user_matrix[start:start + chunk_size]
+            dot_products = (chunk @ transposed).toarray()
+            denominators = np.outer(user_norms[start:start + chunk_size], self.norms)
+            scores = np.divide(
+                dot_products, denominators,
+                out=np.zeros_like(dot_products, dtype=np.float32),
+                where=denominators > 0,
+            )
+            np.clip(scores, 0.0, 1.0, out=scores)
+
+            for row_scores in scores:
+                order = top_k_indices(row_scores, top_k)
+                results.append([(int(self.faq_ids[i]), float(row_scores[i])) for i in order])
+
+        return results
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# INDEX PARTAGÉ DU PROCESSUS
+# ═══════════════════════════════════════════════════════════════════════
+
+_faq_index: Optional[FAQIndex] = None
+_index_lock = threading.Lock()
+
+
+def rebuild_faq_index() -> FAQIndex:
+    """Reconstruire l'index depuis la base et le publier pour ce processus."""
+    index = FAQIndex.from_database()
+    install_faq_index(index)
+
+    print(f"[Index] ✅ Index chargé: {len(index)} FAQs, {index.matrix.nnz} termes non nuls")
+    return index
+
+
+def install_faq_index(index: FAQIndex) -> None:
+    """Remplacer l'index du processus (simple affectation: les lecteurs en cours gardent l'ancien)."""
+    global _faq_index
+
+    with _index_lock:
+        _faq_index = index
+
+
+def load_faq_index(directory: Optional[Path] = None) -> FAQIndex:
+    """
+    Charger l'index du processus: snapshot mmap des artefacts courants si
+    disponible, sinon reconstruction depuis la base.
+
+    Args:
+        directory (Path): répertoire d'artefacts (défaut: artefacts courants)
+    """
+    directory = directory or current_artifact_dir()
+    if directory is not None:
+        try:
+            index = FAQIndex.load_snapshot(directory)
+            install_faq_index(index)
+            print(f"[Index] ⚡ Snapshot mappé: {directory} ({len(index)} FAQs)")
+            return index
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[Index] ⚠️ Snapshot illisible ({e}), reconstruction depuis la base")
+
+    return rebuild_faq_index()
+
+
+def update_faq_index(update: Callable[[FAQIndex], FAQIndex]) -> FAQIndex:
+    """
+    Remplacer l'index du processus par `update(index courant)`.
+
+    Lecture et remplacement sous le même verrou: aucune mise à jour
+    concurrente perdue. `update` retourne une copie: l'index reçu et son
+    vectorizer restent intacts pour les requêtes en cours (lues sans verrou).
+
+    Returns:
+        FAQIndex: index installé
+    """
+    global _faq_index
+
+    # Charger d'abord (hors verrou: le chargement installe l'index sous ce verrou)
+    get_faq_index()
+    with _index_lock:
+        _faq_index = update(_faq_index)
+        return _faq_index
+
+
+def patch_faq_index(faq_id: int, category_id: int, indices: np.ndarray,
+                    values: np.ndarray, norm: float) -> None:
+    """
+    Remplacer (ou ajouter) la ligne d'une FAQ dans l'index du processus.
+
+    Seul ce processus voit la modification: `chatbot.vectorization` republie
+    ensuite les artefacts pour les autres workers.
+    """
+    update_faq_index(lambda index: index.with_faq(faq_id, category_id, indices, values, norm))
+
+
+def remove_from_faq_index(faq_id: int) -> None:
+    """Retirer une FAQ (supprimée ou désactivée) de l'index du processus."""
+    update_faq_index(lambda index: index.without_faqs([faq_id]))
+
+
+def get_faq_index() -> FAQIndex:
+    """Retourne l'index du processus (chargé à la première utilisation)."""
+    if _faq_index is None:
+        return load_faq_index()
+    return _faq_index
@@ -0,0 +1,189 @@
+"""
+Index inversé terme → FAQs avec recherche top-k élaguée (MaxScore).
+
+La recherche cosinus classique (`FAQIndex.score`) touche toutes les lignes,
+même celles qui ne partagent aucun terme avec la question. Ici:
+
+- chaque terme du vocabulaire a une liste de postings (ligne FAQ, poids),
+  poids = composante du vecteur FAQ normalisé L2;
+- chaque terme garde son poids maximal (borne supérieure de contribution);
+- seules les FAQs partageant au moins un terme avec la question sont scorées;
+- dès que la k-ième meilleure note dépasse la borne de ce qui reste à lire,
+  plus aucune nouvelle candidate n'est admise et les candidates dont la
+  borne supérieure ne peut plus battre la k-ième note sont abandonnées.
+
+Le coût d'une requête dépend donc de la longueur des postings des termes
+de la question, pas de la taille du corpus.
+
+Fonctions principales :
+- `InvertedIndex.from_faq_index(index)` : construit les postings depuis l'index CSR.
+- `InvertedIndex.search(user_vec, user_norm, top_k)` : top-k (faq_id, score).
+- `get_inverted_index()` : index inversé du processus, aligné sur `get_faq_index()`.
+"""
+
+import threading
+import numpy as np
+import scipy.sparse as sp
+from typing import List, Optional, Tuple
+from chatbot.index import FAQIndex, get_faq_index, top_k_indices
+
+
+# Tolérance d'arrondi float32 sur les bornes (évite d'élaguer une ex-aequo)
+PRUNE_EPSILON = 1e-6
+
+
+class InvertedIndex:
+    """
+    Postings par terme stockés en CSC: pour le terme t, les lignes
+    `rows[indptr[t]:indptr[t+1]]` (triées) et leurs poids normalisés.
+    """
+
+    def __init__(self, postings: sp.csc_matrix, max_weights: np.ndarray,
+                 faq_ids: np.ndarray, source: Optional[FAQIndex] = None):
+        self.postings = postings
+        self.max_weights = max_weights
+        self.faq_ids = faq_ids
+        self.source = source
+
+    def __len__(self):
+        return len(self.faq_ids)
+
+    @property
+    def n_features(self) -> int:
+        return self.postings.shape[1]
+
+    @classmethod
+    def from_faq_index(cls, index: FAQIndex) -> 'InvertedIndex':
+        """
+        Construire les postings à partir de l'index résident.
+
+        Args:
+            index (FAQIndex): index CSR des FAQs actives
+
+        Returns:
+            InvertedIndex: postings normalisés + poids max par terme
+        """
+        norms = np.asarray(index.norms, dtype=np.float32)
+        inverse_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+
+        # Lignes normalisées L2: cosinus = somme des produits de poids
+        normalized = sp.diags(inverse_norms) @ index.matrix
+        postings = sp.csc_matrix(normalized, dtype=np.float32)
+        postings.sort_indices()
+
+        if postings.nnz:
+            max_weights = postings.max(axis=0).toarray().ravel().astype(np.float32)
+        else:
+            max_weights = np.zeros(postings.shape[1], dtype=np.float32)
+
+        return cls(postings, max_weights, np.asarray(index.faq_ids), source=index)
+
+    def search(self, user_vec: np.ndarray, user_norm: float,
+               top_k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Top-k par accumulation terme par terme avec élagage MaxScore.
+
+        Les termes sont lus par borne décroissante. `remaining` est la somme
+        des bornes des termes non encore lus: une FAQ jamais vue ne peut pas
+        dépasser `remaining`, une candidate ne peut pas dépasser
+        `score + remaining`.
+
+        Args:
+            user_vec: Vecteur TF-IDF dense de la question
+            user_norm: Norme du vecteur utilisateur
+            top_k (int): Nombre de résultats
+
+        Returns:
+            List de tuples (faq_id, score), score décroissant
+        """
+        if len(self) == 0 or user_norm == 0 or top_k <= 0:
+            return []
+
+        user_vec = np.asarray(user_vec, dtype=np.float32)[:self.n_features]
+        terms = np.flatnonzero(user_vec)
+        if not len(terms):
+            return []
+
+        query_weights = user_vec[terms] / np.float32(user_norm)
+        bounds = query_weights * self.max_weights[terms]
+
+        # Termes les plus prometteurs d'abord
+        order = np.argsort(-bounds, kind='stable')
+        terms, query_weights, bounds = terms[order], query_weights[order], bounds[order]
+        remaining = float(bounds.sum())
+
+        indptr = self.postings.indptr
+        posting_rows = self.postings.indices
+        posting_weights = self.postings.data
+
+        cand_rows = np.zeros(0, dtype=posting_rows.dtype)
+        cand_scores = np.zeros(0, dtype=np.float32)
+        threshold = 0.0
+
+        for term, q_weight, bound in zip(terms, query_weights, bounds):
+            if bound <= 0:
+                break
+
+            start, end = indptr[term], indptr[term + 1]
+            rows = posting_rows[start:end]
+            contributions = posting_weights[start:end] * q_weight
+
+            if remaining + PRUNE_EPSILON > threshold:
+                # Des FAQs jamais vues peuvent encore entrer dans le top-k
+                merged_rows = np.union1d(cand_rows, rows)
+                merged_scores = np.zeros(len(merged_rows), dtype=np.float32)
+                merged_scores[np.searchsorted(merged_rows, cand_rows)] = cand_scores
+                merged_scores[np.searchsorted(merged_rows, rows)] += contributions
+                cand_rows, cand_scores = merged_rows, merged_scores
+            elif len(cand_rows):
+                # Seules les candidates déjà vues peuvent encore progresser
+                positions = np.searchsorted(rows, cand_rows)
+                positions[positions >= len(rows)] = 0
+                hits = rows[positions] == cand_rows if len(rows) else np.zeros(len(cand_rows), dtype=bool)
+                cand_scores[hits] += contributions[positions[hits]]
+
+            remaining = max(remaining - float(bound), 0.0)
+
+            if len(cand_scores) >= top_k:
+                threshold = float(np.partition(cand_scores, -top_k)[-top_k])
+                # Abandonner les candidates qui ne peuvent plus battre la k-ième
+                keep = cand_scores + (remaining + PRUNE_EPSILON) >= threshold
+                cand_rows, cand_scores = cand_rows[keep], cand_scores[keep]
+
+        if not len(cand_rows):
+            return []
+
+        best = top_k_indices(cand_scores, top_k)
+        scores = np.clip(cand_scores[best], 0.0, 1.0)
+        return [(int(self.faq_ids[cand_rows[i]]), float(score)) for i, score in zip(best, scores)]
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# INDEX INVERSÉ PARTAGÉ DU PROCESSUS
+# ═══════════════════════════════════════════════════════════════════════
+
+_inverted_index: Optional[InvertedIndex] = None
+_inverted_lock = threading.Lock()
+
+
+def get_inverted_index(faq_index: Optional[FAQIndex] = None) -> InvertedIndex:
+    """
+    Retourne l'index inversé du processus.
+
+    Il est reconstruit (en quelques millisecondes) dès que l'index résident
+    `get_faq_index()` a été remplacé.
+
+    Args:
+        faq_index (FAQIndex): index de la requête (défaut: index du processus)
+    """
+    global _inverted_index
+
+    if faq_index is None:
+        faq_index = get_faq_index()
+    inverted = _inverted_index
+    if inverted is None or inverted.source is not faq_index:
+        with _inverted_lock:
+            inverted = InvertedIndex.from_faq_index(faq_index)
+            _inverted_index = inverted
+        print(f"[Inverted] ✅ Postings construits: {inverted.n_features} termes, {inverted.postings.nnz} entrées")
+    return inverted
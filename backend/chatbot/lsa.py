@@ -0,0 +1,274 @@
+"""
+Plongements denses LSA (TruncatedSVD) des FAQs.
+
+Une SVD tronquée est ajustée sur la matrice TF-IDF normalisée de l'index:
+chaque FAQ devient un vecteur dense de `settings.CHATBOT_LSA_COMPONENTS`
+dimensions (256 par défaut), normalisé L2, en float32 contigu.
+
+- une question est projetée par un produit dense (composantes × termes);
+- ses scores contre toutes les FAQs sont UN produit matrice × vecteur (GEMV
+  BLAS) sur un tableau contigu, sans structure creuse;
+- des questions sans terme commun avec une FAQ peuvent la retrouver si
+  leurs termes apparaissent dans les mêmes contextes (quasi-synonymes).
+
+Les composantes ne portent que sur les colonnes réellement utilisées par le
+corpus: en mode 'hashing' (2^18 dimensions) elles restent de la taille du
+vocabulaire effectif.
+
+Fonctions principales :
+- `LSAIndex.build(index, n_components)` : SVD + plongements des FAQs.
+- `LSAIndex.with_faqs(index, faq_ids)` : replongement de quelques FAQs, composantes conservées.
+- `LSAIndex.search(user_vec, user_norm, top_k)` : top-k (faq_id, cosinus latent).
+- `LSAIndex.save(directory)` / `LSAIndex.load(directory)` : artefacts (voir chatbot.artifacts).
+- `get_lsa_index()` : index LSA du processus, aligné sur les artefacts publiés.
+"""
+
+import json
+import threading
+import numpy as np
+import scipy.sparse as sp
+from pathlib import Path
+from typing import List, Optional, Tuple
+from chatbot.artifacts import artifact_generation, current_artifact_dir
+from chatbot.index import FAQIndex, get_faq_index, top_k_indices
+
+
+# Fichiers de l'index LSA dans un répertoire d'artefacts
+LSA_ARRAYS = ('lsa_columns', 'lsa_components', 'lsa_embeddings', 'lsa_faq_ids', 'lsa_category_ids')
+LSA_META = 'lsa_meta.json'
+
+# Nombre de dimensions latentes par défaut
+DEFAULT_LSA_COMPONENTS = 256
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """Lignes normalisées L2 (les lignes nulles restent nulles), float32 contigu."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    normalized = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+    return np.ascontiguousarray(normalized, dtype=np.float32)
+
+
+class LSAIndex:
+    """
+    `components` (k × colonnes utilisées) projette un vecteur TF-IDF restreint
+    à `columns`; `embeddings` (N × k) contient les FAQs `faq_ids` normalisées.
+    """
+
+    def __init__(self, columns: np.ndarray, components: np.ndarray, embeddings: np.ndarray,
+                 faq_ids: np.ndarray, category_ids: np.ndarray, version: str = ''):
+        self.columns = columns
+        self.components = components
+        self.embeddings = embeddings
+        self.faq_ids = faq_ids
+        self.category_ids = category_ids
+        self.version = version
+        # Génération d'artefacts d'origine (voir `get_lsa_index`)
+        self.generation = None
+        # (index résident, FAQs plongées encore présentes) du dernier index interrogé
+        self._active: Optional[Tuple[FAQIndex, np.ndarray]] = None
+
+    def __len__(self):
+        return len(self.faq_ids)
+
+    @property
+    def n_components(self) -> int:
+        return self.components.shape[0]
+
+    @classmethod
+    def build(cls, index: FAQIndex, n_components: int = DEFAULT_LSA_COMPONENTS,
+              seed: int = 0) -> 'LSAIndex':
+        """
+        Ajuster la SVD tronquée sur l'index et plonger toutes les FAQs.
+
+        Args:
+            index (FAQIndex): index CSR des FAQs actives
+            n_components (int): dimensions latentes (bornées par la taille du corpus)
+            seed (int): graine de la SVD randomisée
+
+        Returns:
+            LSAIndex: composantes + plongements normalisés
+        """
+        norms = np.asarray(index.norms, dtype=np.float32)
+        inverse_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        normalized = sp.csr_matrix(sp.diags(inverse_norms) @ index.matrix, dtype=np.float32)
+
+        # Colonnes utilisées par au moins une FAQ
+        columns = np.unique(normalized.indices).astype(np.int64)
+        restricted = normalized[:, columns]
+
+        n_components = min(n_components, restricted.shape[0] - 1, restricted.shape[1] - 1)
+        if n_components < 1:
+            return cls(columns, np.zeros((0, len(columns)), dtype=np.float32),
+                       np.zeros((len(index), 0), dtype=np.float32),
+                       np.asarray(index.faq_ids), np.asarray(index.category_ids), version=index.version)
+
+        from sklearn.decomposition import TruncatedSVD  # import coûteux: seulement à la construction
+        svd = TruncatedSVD(n_components=n_components, algorithm='randomized', random_state=seed)
+        embeddings = _normalize(svd.fit_transform(restricted))
+        components = np.ascontiguousarray(svd.components_, dtype=np.float32)
+
+        return cls(columns, components, embeddings,
+                   np.asarray(index.faq_ids, dtype=np.int64),
+                   np.asarray(index.category_ids, dtype=np.int64), version=index.version)
+
+    def with_faqs(self, index: FAQIndex, faq_ids) -> 'LSAIndex':
+        """
+        Copie où les FAQs `faq_ids` sont replongées d'après leur ligne dans
+        `index` (projection sur les composantes existantes, comme une
+        question), ou retirées si elles n'y sont plus. Pas de nouvelle SVD.
+
+        Args:
+            index (FAQIndex): index contenant les nouvelles lignes
+            faq_ids: ids des FAQs créées, modifiées ou retirées
+
+        Returns:
+            LSAIndex: nouvel index, à la version de `index`
+        """
+        faq_ids = np.asarray(list(faq_ids), dtype=np.int64)
+        keep = ~np.isin(self.faq_ids, faq_ids)
+        rows = np.flatnonzero(np.isin(index.faq_ids, faq_ids))
+
+        embeddings = np.zeros((len(rows), self.n_components), dtype=np.float32)
+        if len(rows) and self.n_components:
+            norms = np.asarray(index.norms[rows], dtype=np.float32)
+            inverse_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+            normalized = sp.csr_matrix(sp.diags(inverse_norms) @ index.matrix[rows], dtype=np.float32)
+            # Même restriction que `embed`: colonnes au-delà de l'index ignorées
+            columns = self.columns[self.columns < normalized.shape[1]]
+            embeddings = _normalize(normalized[:, columns] @ self.components[:, :len(columns)].T)
+
+        return LSAIndex(
+            self.columns,
+            self.components,
+            np.ascontiguousarray(np.concatenate([self.embeddings[keep], embeddings]), dtype=np.float32),
+            np.concatenate([self.faq_ids[keep], np.asarray(index.faq_ids[rows], dtype=np.int64)]),
+            np.concatenate([self.category_ids[keep], np.asarray(index.category_ids[rows], dtype=np.int64)]),
+            version=index.version,
+        )
+
+    def save(self, directory: Path) -> None:
+        """Écrire composantes et plongements dans un répertoire d'artefacts."""
+        arrays = {
+            'lsa_columns': self.columns,
+            'lsa_components': self.components,
+            'lsa_embeddings': self.embeddings,
+            'lsa_faq_ids': self.faq_ids,
+            'lsa_category_ids': self.category_ids,
+        }
+        for name, array in arrays.items():
+            np.save(directory / f"{name}.npy", array)
+        with open(directory / LSA_META, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'n_components': self.n_components}, f)
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional['LSAIndex']:
+        """
+        Relire l'index LSA d'un répertoire d'artefacts (None s'il n'y en a pas).
+
+        Les plongements sont mappés en mémoire: les workers partagent leurs pages.
+        """
+        if not (directory / LSA_META).exists():
+            return None
+        with open(directory / LSA_META, encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode='r') for name in LSA_ARRAYS}
+        return cls(arrays['lsa_columns'], arrays['lsa_components'], arrays['lsa_embeddings'],
+                   arrays['lsa_faq_ids'], arrays['lsa_category_ids'], version=meta['version'])
+
+    def embed(self, user_vec: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Plongement normalisé d'un vecteur TF-IDF dense (None s'il est nul).
+
+        Args:
+            user_vec: Vecteur TF-IDF dense de la question
+        """
+        user_vec = np.asarray(user_vec, dtype=np.float32)
+        if len(self.columns) and self.columns[-1] >= user_vec.shape[0]:
+            columns = self.columns[self.columns < user_vec.shape[0]]
+            latent = self.components[:, :len(columns)] @ user_vec[columns]
+        else:
+            latent = self.components @ user_vec[self.columns]
+        norm = np.linalg.norm(latent)
+        if norm == 0:
+            return None
+        return latent / norm
+
+    def _active_mask(self, index: FAQIndex) -> np.ndarray:
+        """FAQs plongées encore présentes dans l'index résident (retraits incrémentaux)."""
+        active = self._active
+        if active is None or active[0] is not index:
+            active = (index, np.isin(self.faq_ids, index.faq_ids))
+            self._active = active
+        return active[1]
+
+    def search(self, user_vec: np.ndarray, user_norm: float, top_k: int = 3,
+               index: Optional[FAQIndex] = None) -> List[Tuple[int, float]]:
+        """
+        Top-k global par cosinus dans l'espace latent.
+
+        Args:
+            user_vec: Vecteur TF-IDF dense de la question
+            user_norm: Norme du vecteur utilisateur
+            top_k (int): Nombre de résultats
+            index (FAQIndex): index résident: les FAQs qui en ont été retirées
+                depuis la construction sont ignorées (défaut: aucun filtre)
+
+        Returns:
+            List de tuples (faq_id, score), score décroissant
+        """
+        if len(self) == 0 or user_norm == 0 or self.n_components == 0:
+            return []
+
+        latent = self.embed(user_vec)
+        if latent is None:
+            return []
+
+        scores = self.embeddings @ latent
+        if index is not None:
+            scores = np.where(self._active_mask(index), scores, -np.inf)
+        order = top_k_indices(scores, top_k)
+        return [(int(self.faq_ids[i]), float(scores[i])) for i in order if np.isfinite(scores[i])]
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# INDEX LSA PARTAGÉ DU PROCESSUS
+# ═══════════════════════════════════════════════════════════════════════
+
+_lsa_index: Optional[LSAIndex] = None
+_lsa_lock = threading.Lock()
+
+
+def get_lsa_index() -> LSAIndex:
+    """
+    Retourne l'index LSA du processus.
+
+    Relu depuis les artefacts courants (ou recalculé s'ils n'en contiennent
+    pas) à chaque nouvelle publication d'artefacts. Les mises à jour
+    incrémentales de l'index résident ne le recalculent pas: jusqu'à la
+    republication en arrière-plan qui suit la sauvegarde (`with_faqs`),
+    une FAQ modifiée reste plongée d'après sa version précédente et une FAQ
+    NOUVELLE n'a aucun plongement: elle est absente des résultats LSA.
+    """
+    global _lsa_index
+
+    faq_index = get_faq_index()
+    generation = (artifact_generation(), faq_index.version)
+    lsa = _lsa_index
+    if lsa is not None and lsa.generation == generation:
+        return lsa
+
+    with _lsa_lock:
+        # Un autre thread a pu charger cette génération pendant l'attente du verrou
+        lsa = _lsa_index
+        if lsa is not None and lsa.generation == generation:
+            return lsa
+
+        directory = current_artifact_dir()
+        lsa = LSAIndex.load(directory) if directory is not None else None
+        if lsa is None or lsa.version != faq_index.version:
+            from django.conf import settings
+            lsa = LSAIndex.build(faq_index, getattr(settings, 'CHATBOT_LSA_COMPONENTS', DEFAULT_LSA_COMPONENTS))
+        lsa.generation = generation
+        _lsa_index = lsa
+    print(f"[LSA] ✅ Plongements prêts: {len(lsa)} FAQs × {lsa.n_components} dimensions")
+    return lsa
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:00
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_tables(apps, schema_editor):
+    """Créer la table du cache des réponses (alias `answers`, DatabaseCache) si absente."""
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = []
+
+    operations = [
+        migrations.RunPython(create_cache_tables, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,259 @@
+"""
+Canal TF-IDF de n-grammes de caractères (tolérance aux fautes de frappe).
+
+Le vectorizer par mots ne connaît que des mots entiers: "inscripsion" ou
+"reinscripton" donnent un vecteur nul et la question tombe dans « Je n'ai
+pas compris ». Ce canal découpe questions et FAQs en n-grammes de
+caractères À L'INTÉRIEUR des mots (`analyzer='char_wb'`, 3 à 4 caractères):
+une faute n'altère que quelques n-grammes, les autres continuent de matcher.
+
+- index séparé (CSR float32), avec un budget de n-grammes
+  (`settings.CHATBOT_CHAR_NGRAM_FEATURES`) qui borne sa mémoire;
+- publié avec les autres artefacts (fichiers préfixés `char_`, mappés en
+  mémoire) et tenu à jour FAQ par FAQ comme l'index par mots;
+- utilisé selon `settings.CHATBOT_CHAR_NGRAMS`:
+    'fallback' : seulement quand le vecteur par mots est nul
+    'blend'    : aussi mélangé aux scores par mots (poids CHATBOT_CHAR_NGRAM_WEIGHT)
+    'off'      : désactivé
+
+Fonctions principales :
+- `CharNgramChannel.build(max_features)` : entraînement + index depuis la base.
+- `CharNgramChannel.search(text, top_k)` : top-k (faq_id, score) par n-grammes.
+- `CharNgramChannel.with_faqs(faqs, removed_ids)` : lignes remplacées/retirées, sans réentraîner.
+- `get_char_channel()` : canal du processus, aligné sur les artefacts publiés.
+- `patch_char_channel(faq)` / `remove_from_char_channel(faq_id)` : mises à jour d'une FAQ.
+"""
+
+import pickle
+import threading
+import numpy as np
+import scipy.sparse as sp
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from django.conf import settings
+from faq.models import FAQ
+from chatbot.artifacts import artifact_generation, current_artifact_dir
+from chatbot.index import FAQIndex
+from chatbot.preprocessing import canonicalize_query
+
+if TYPE_CHECKING:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+# Modes d'utilisation du canal
+CHAR_NGRAM_MODES = ('off', 'fallback', 'blend')
+
+# Fichiers du canal dans un répertoire d'artefacts
+CHAR_VECTORIZER_FILE = 'char_vectorizer.pkl'
+CHAR_SNAPSHOT_PREFIX = 'char_'
+
+# Longueurs des n-grammes (à l'intérieur des mots, bornes d'espaces comprises)
+CHAR_NGRAM_RANGE = (3, 4)
+
+# Budget de n-grammes par défaut
+DEFAULT_CHAR_NGRAM_FEATURES = 20000
+
+
+def get_char_ngram_mode() -> str:
+    """Mode configuré (`settings.CHATBOT_CHAR_NGRAMS`, défaut: 'fallback')."""
+    mode = getattr(settings, 'CHATBOT_CHAR_NGRAMS', 'fallback')
+    if mode not in CHAR_NGRAM_MODES:
+        print(f"[Ngrams] ⚠️ Mode inconnu '{mode}', utilisation de 'fallback'")
+        return 'fallback'
+    return mode
+
+
+def get_char_ngram_budget() -> int:
+    """Nombre maximal de n-grammes (`settings.CHATBOT_CHAR_NGRAM_FEATURES`)."""
+    return getattr(settings, 'CHATBOT_CHAR_NGRAM_FEATURES', DEFAULT_CHAR_NGRAM_FEATURES)
+
+
+def _vectorize(vectorizer: 'TfidfVectorizer', texts: List[str]) -> Tuple[sp.csr_matrix, np.ndarray]:
+    """Matrice CSR float32 triée et normes L2 de plusieurs textes."""
+    matrix = vectorizer.transform(texts).tocsr().astype(np.float32)
+    matrix.sort_indices()
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()).astype(np.float32)
+    return matrix, norms
+
+
+class CharNgramChannel:
+    """Vectorizer `char_wb` entraîné + index CSR des FAQs actives dans cet espace."""
+
+    def __init__(self, vectorizer: 'TfidfVectorizer', index: FAQIndex):
+        self.vectorizer = vectorizer
+        self.index = index
+        # Génération d'artefacts d'origine (voir `get_char_channel`)
+        self.generation = None
+
+    def __len__(self):
+        return len(self.index)
+
+    @classmethod
+    def build(cls, max_features: int = DEFAULT_CHAR_NGRAM_FEATURES) -> 'CharNgramChannel':
+        """
+        Entraîner le vectorizer de n-grammes sur les FAQs actives et les indexer.
+
+        Args:
+            max_features (int): budget de n-grammes (les plus fréquents)
+
+        Returns:
+            CharNgramChannel: canal prêt à l'emploi
+        """
+        rows = list(
+            FAQ.objects.filter(is_active=True).order_by('id')
+            .values_list('id', 'category_id', 'question')
+        )
+        faq_ids, category_ids, questions = zip(*rows) if rows else ((), (), ())
+
+        from sklearn.feature_extraction.text import TfidfVectorizer  # import coûteux: seulement à l'entraînement
+        vectorizer = TfidfVectorizer(
+            analyzer='char_wb',
+            ngram_range=CHAR_NGRAM_RANGE,
+            preprocessor=canonicalize_query,
+            max_features=max_features,
+            sublinear_tf=True,
+            norm=None,
+            dtype=np.float32,
+        )
+        vectorizer.fit(questions or [''])
+        matrix, norms = _vectorize(vectorizer, list(questions))
+
+        index = FAQIndex(
+            matrix,
+            np.asarray(faq_ids, dtype=np.int64),
+            np.asarray(category_ids, dtype=np.int64),
+            norms,
+            version=f"char-{len(vectorizer.vocabulary_)}",
+        )
+        print(f"[Ngrams] ✅ Canal n-grammes: {len(index)} FAQs, "
+              f"{len(vectorizer.vocabulary_)} n-grammes, {matrix.nnz} termes non nuls")
+        return cls(vectorizer, index)
+
+    def save(self, directory: Path) -> None:
+        """Écrire vectorizer et snapshot de l'index dans un répertoire d'artefacts."""
+        with open(directory / CHAR_VECTORIZER_FILE, 'wb') as f:
+            pickle.dump(self.vectorizer, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.index.save_snapshot(directory, prefix=CHAR_SNAPSHOT_PREFIX)
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional['CharNgramChannel']:
+        """Relire le canal d'un répertoire d'artefacts (None s'il n'y en a pas)."""
+        if not (directory / CHAR_VECTORIZER_FILE).exists():
+            return None
+        with open(directory / CHAR_VECTORIZER_FILE, 'rb') as f:
+            vectorizer = pickle.load(f)
+        return cls(vectorizer, FAQIndex.load_snapshot(directory, prefix=CHAR_SNAPSHOT_PREFIX))
+
+    def vectorize(self, text: str) -> Tuple[np.ndarray, float]:
+        """Vecteur dense de n-grammes d'un texte et sa norme."""
+        matrix, norms = _vectorize(self.vectorizer, [text])
+        return matrix.toarray().ravel(), float(norms[0])
+
+    def search(self, text: str, top_k: int = 3) -> List[Tuple[int, float]]:
+        """
+        Top-k global par cosinus sur les n-grammes de caractères.
+
+        Args:
+            text (str): Question de l'utilisateur
+            top_k (int): Nombre de résultats
+
+        Returns:
+            List de tuples (faq_id, score), score décroissant (scores > 0)
+        """
+        user_vec, user_norm = self.vectorize(text)
+        return [(faq_id, score) for faq_id, score in self.index.search(user_vec, user_norm, top_k)
+                if score > 0]
+
+    def score_faqs(self, text: str, faq_ids) -> Dict[int, float]:
+        """Scores n-grammes de la question pour quelques FAQs désignées par id."""
+        user_vec, user_norm = self.vectorize(text)
+        return self.index.score_faqs(faq_ids, user_vec, user_norm)
+
+    def with_faq(self, faq) -> 'CharNgramChannel':
+        """Copie du canal où la ligne de `faq` est remplacée (ou ajoutée), sans réentraîner."""
+        return self.with_faqs([faq])
+
+    def with_faqs(self, faqs, removed_ids=()) -> 'CharNgramChannel':
+        """
+        Copie du canal où les lignes des FAQs actives `faqs` sont remplacées
+        (ou ajoutées) et les FAQs `removed_ids` retirées, sans réentraîner:
+        le vectorizer (vocabulaire et IDF des n-grammes) est conservé.
+        """
+        faqs = list(faqs)
+        index = self.index.without_faqs(removed_ids)
+        if faqs:
+            matrix, norms = _vectorize(self.vectorizer, [faq.question for faq in faqs])
+            index = index.with_faqs([faq.id for faq in faqs], [faq.category_id for faq in faqs],
+                                    matrix, norms)
+        channel = CharNgramChannel(self.vectorizer, index)
+        channel.generation = self.generation
+        return channel
+
+    def without_faq(self, faq_id: int) -> 'CharNgramChannel':
+        """Copie du canal sans la FAQ donnée."""
+        return self.with_faqs([], removed_ids=[faq_id])
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# CANAL PARTAGÉ DU PROCESSUS
+# ═══════════════════════════════════════════════════════════════════════
+
+_char_channel: Optional[CharNgramChannel] = None
+_char_lock = threading.Lock()
+
+
+def get_char_channel() -> Optional[CharNgramChannel]:
+    """
+    Retourne le canal n-grammes du processus (None si le mode est 'off').
+
+    Relu depuis les artefacts courants (ou reconstruit depuis la base s'ils
+    n'en contiennent pas) à chaque nouvelle publication d'artefacts.
+    """
+    global _char_channel
+
+    if get_char_ngram_mode() == 'off':
+        return None
+
+    generation = artifact_generation()
+    channel = _char_channel
+    if channel is not None and channel.generation == generation:
+        return channel
+
+    with _char_lock:
+        channel = _char_channel
+        if channel is not None and channel.generation == generation:
+            return channel
+
+        directory = current_artifact_dir()
+        channel = None
+        if directory is not None:
+            try:
+                channel = CharNgramChannel.load(directory)
+            except (OSError, ValueError, KeyError, pickle.UnpicklingError) as e:
+                print(f"[Ngrams] ⚠️ Canal n-grammes illisible ({e}), reconstruction depuis la base")
+        if channel is None:
+            channel = CharNgramChannel.build(get_char_ngram_budget())
+        channel.generation = generation
+        _char_channel = channel
+    return channel
+
+
+def patch_char_channel(faq) -> None:
+    """Remplacer (ou ajouter) la ligne d'une FAQ active dans le canal du processus."""
+    global _char_channel
+
+    if get_char_channel() is None:
+        return
+    # Lecture et remplacement sous le même verrou: aucune mise à jour concurrente perdue
+    with _char_lock:
+        _char_channel = _char_channel.with_faq(faq)
+
+
+def remove_from_char_channel(faq_id: int) -> None:
+    """Retirer une FAQ (supprimée ou désactivée) du canal du processus."""
+    global _char_channel
+
+    if get_char_channel() is None:
+        return
+    with _char_lock:
+        _char_channel = _char_channel.without_faq(faq_id)
@@ -1,6 +1,361 @@
-import spacy
-from typing import List
+"""
+Prétraitement du texte des questions.
 
+- `canonicalize_query(text)` : forme canonique légère (accents, ponctuation,
+  élisions, mots vides optionnels) partagée par la clé de cache des réponses
+  et par le vectorizer TF-IDF.
+- `normalize_query(text)` : entrée du vectorizer, selon le normaliseur
+  choisi (`settings.CHATBOT_PREPROCESSOR`): forme canonique seule,
+  racinisation française en Python pur, ou lemmatisation spaCy avec cache
+  LRU token → lemme.
+- `TextPreprocessor` / `preprocess_text(text)` : lemmatisation spaCy (ou
+  racines françaises si le normaliseur 'french' est choisi).
+"""
+
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from django.conf import settings
+from chatbot.stemmer import french_stem
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# FORME CANONIQUE DES QUESTIONS (clé de cache + entrée du vectorizer)
+# ═══════════════════════════════════════════════════════════════════════
+
+# Incrémenter à chaque changement de règle: les vecteurs stockés sont recalculés
+CANONICAL_VERSION = 1
+
+# Apostrophes typographiques ramenées à l'apostrophe simple
+_APOSTROPHES_RE = re.compile(r"[’‘ʼ`´]")
+
+# Élisions françaises en début de mot: l', d', qu', j', n', s', c', m', t', jusqu'...
+_ELISION_RE = re.compile(r"\b(?:l|d|j|m|n|s|t|c|qu|jusqu|lorsqu|puisqu|quoiqu)'")
+
+# Tout ce qui n'est ni lettre ni chiffre devient un séparateur
+_PUNCTUATION_RE = re.compile(r"[\W_]+")
+
+# Mots vides français (forme sans accents)
+FRENCH_STOPWORDS = frozenset("""
+a ai aie ait as au aux avec avoir c ca ce ceci cela celle celles celui ces cet cette
+ceux chez d dans de des du elle elles en es est et etre eu ete il ils j je l la le les
+leur leurs lui m ma mais me meme mes moi mon n ne nos notre nous on ont ou par pas pour
+qu que quel quelle quelles quels qui s sa sans se ses si son sont sur t ta te tes toi
+ton tu un une vos votre vous y
+""".split())
+
+
+def fold_accents(text: str) -> str:
+    """Supprimer les accents (é → e, ç → c) par décomposition Unicode."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def canonicalize_query(text: str, remove_stopwords: Optional[bool] = None) -> str:
+    """
+    Forme canonique d'une question.
+
+    Minuscules, accents retirés, élisions supprimées (l'inscription →
+    inscription), ponctuation et espaces multiples réduits à un espace,
+    mots vides retirés en option. Deux formulations qui ne diffèrent que
+    par ces détails partagent la même clé de cache et le même vecteur.
+
+    Args:
+        text (str): texte brut
+        remove_stopwords (bool): retirer les mots vides
+            (défaut: settings.CHATBOT_QUERY_STOPWORDS)
+
+    Returns:
+        str: forme canonique (mots séparés par un espace)
+    """
+    if remove_stopwords is None:
+        remove_stopwords = getattr(settings, 'CHATBOT_QUERY_STOPWORDS', False)
+
+    text = fold_accents(text.casefold())
+    text = _APOSTROPHES_RE.sub("'", text)
+    text = _ELISION_RE.sub('', text)
+    words = _PUNCTUATION_RE.sub(' ', text).split()
+
+    if remove_stopwords:
+        words = [word for word in words if word not in FRENCH_STOPWORDS]
+    return ' '.join(words)
+
+
+def canonical_signature() -> str:
+    """Identifiant des règles de canonicalisation actives (version + options)."""
+    stopwords = 'stopwords' if getattr(settings, 'CHATBOT_QUERY_STOPWORDS', False) else 'all-words'
+    return f"canonical-v{CANONICAL_VERSION}-{stopwords}"
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# NORMALISEURS (entrée du vectorizer)
+# ═══════════════════════════════════════════════════════════════════════
+
+# Normaliseurs disponibles (settings.CHATBOT_PREPROCESSOR)
+PREPROCESSORS = ('canonical', 'french', 'spacy')
+
+# Incrémenter à chaque changement des règles du normaliseur 'french'
+FRENCH_NORMALIZER_VERSION = 1
+
+
+class CanonicalNormalizer:
+    """Forme canonique seule (`canonicalize_query`): aucun modèle à charger."""
+
+    name = 'canonical'
+
+    def normalize(self, text: str) -> str:
+        return canonicalize_query(text)
+
+    def normalize_many(self, texts: Iterable[str]) -> List[str]:
+        return [canonicalize_query(text) for text in texts]
+
+    def prime(self, texts: Iterable[str]) -> None:
+        """Rien à préparer: la forme canonique est calculée à la volée."""
+
+
+class LemmaCache:
+    """
+    Cache LRU borné token → lemme, partagé par les threads du processus.
+
+    OrderedDict du moins récemment utilisé au plus récemment utilisé.
+    """
+
+    def __init__(self, max_size: int = 50000):
+        self.max_size = max_size
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_many(self, tokens: Iterable[str]) -> Dict[str, str]:
+        """Lemmes connus parmi `tokens` (les tokens trouvés deviennent les plus récents)."""
+        found = {}
+        with self._lock:
+            for token in tokens:
+                lemma = self._entries.get(token)
+                if lemma is not None:
+                    self._entries.move_to_end(token)
+                    found[token] = lemma
+        return found
+
+    def put_many(self, lemmas: Dict[str, str]) -> None:
+        with self._lock:
+            for token, lemma in lemmas.items():
+                self._entries[token] = lemma
+                self._entries.move_to_end(token)
+
+            # Éviction LRU
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class FrenchNormalizer:
+    """
+    Racinisation française sans modèle: mots → racines Snowball (`chatbot.stemmer`).
+
+    Même découpage que `SpacyLemmatizer` (élisions et ponctuation retirées,
+    accents conservés pour les règles), mots vides retirés selon
+    `settings.CHATBOT_QUERY_STOPWORDS`, puis accents retirés comme dans la
+    forme canonique. inscription / inscriptions → "inscript". Rien à
+    charger au démarrage: quelques microsecondes par mot, mémorisées dans
+    un cache LRU mot → racine.
+    """
+
+    name = 'french'
+
+    def __init__(self, cache_size: int = 50000):
+        self.cache = LemmaCache(cache_size)
+
+    def stem_many(self, words: List[str]) -> Dict[str, str]:
+        """Racines (sans accents) d'une liste de mots: cache d'abord, règles pour le reste."""
+        unique = list(dict.fromkeys(words))
+        stems = self.cache.get_many(unique)
+        missing = [word for word in unique if word not in stems]
+        if missing:
+            computed = {word: fold_accents(french_stem(word)) for word in missing}
+            self.cache.put_many(computed)
+            stems.update(computed)
+        return stems
+
+    @staticmethod
+    def _content_words(words: List[str]) -> List[str]:
+        if getattr(settings, 'CHATBOT_QUERY_STOPWORDS', False):
+            return [word for word in words if fold_accents(word) not in FRENCH_STOPWORDS]
+        return words
+
+    def tokens(self, text: str) -> List[str]:
+        """Racines des mots d'un texte, dans l'ordre."""
+        words = self._content_words(SpacyLemmatizer.split_words(text))
+        stems = self.stem_many(words)
+        return [stems[word] for word in words]
+
+    def normalize(self, text: str) -> str:
+        return ' '.join(self.tokens(text))
+
+    def normalize_many(self, texts: Iterable[str]) -> List[str]:
+        split = [self._content_words(SpacyLemmatizer.split_words(text)) for text in texts]
+        stems = self.stem_many([word for words in split for word in words])
+        return [' '.join(stems[word] for word in words) for words in split]
+
+    def prime(self, texts: Iterable[str]) -> None:
+        """Raciniser tous les mots distincts de `texts` (remplit le cache)."""
+        self.stem_many([word for text in texts for word in SpacyLemmatizer.split_words(text)])
+
+
+class SpacyLemmatizer:
+    """
+    Lemmatisation spaCy avec cache token → lemme.
+
+    Les questions sont découpées en mots (minuscules, élisions et
+    ponctuation retirées, accents CONSERVÉS pour le modèle), chaque mot est
+    remplacé par son lemme, puis les accents sont retirés comme dans la
+    forme canonique. Un mot n'est soumis à spaCy qu'une seule fois:
+
+    - à l'indexation, `prime(corpus)` lemmatise tous les mots distincts du
+      corpus en lots `nlp.pipe` (parser et ner désactivés, `n_process`);
+    - à la recherche, les mots déjà vus sont lus dans le cache LRU, seuls
+      les mots nouveaux passent dans le pipeline.
+
+    Le lemme d'un mot est calculé hors contexte: le même mot donne toujours
+    le même lemme à l'indexation et à la recherche.
+    """
+
+    name = 'spacy'
+
+    def __init__(self, language_model: str = 'fr_core_news_sm', cache_size: int = 50000,
+                 batch_size: int = 1000, n_process: int = 1):
+        import spacy  # import coûteux: seulement si la lemmatisation est utilisée
+        self.nlp = spacy.load(language_model, disable=['parser', 'ner'])
+        self.cache = LemmaCache(cache_size)
+        self.batch_size = batch_size
+        self.n_process = n_process
+
+    @staticmethod
+    def split_words(text: str) -> List[str]:
+        """Mots d'un texte: minuscules, sans élisions ni ponctuation, accents conservés."""
+        text = _APOSTROPHES_RE.sub("'", text.casefold())
+        text = _ELISION_RE.sub('', text)
+        return _PUNCTUATION_RE.sub(' ', text).split()
+
+    def lemmatize(self, words: List[str], n_process: int = 1) -> Dict[str, str]:
+        """
+        Lemmes (sans accents) d'une liste de mots: cache d'abord, spaCy pour le reste.
+
+        Args:
+            words: mots à lemmatiser (doublons acceptés)
+            n_process (int): processus spaCy pour les mots absents du cache
+
+        Returns:
+            Dict {mot: lemme}
+        """
+        unique = list(dict.fromkeys(words))
+        lemmas = self.cache.get_many(unique)
+        missing = [word for word in unique if word not in lemmas]
+
+        if missing:
+            computed = {}
+            docs = self.nlp.pipe(missing, batch_size=self.batch_size, n_process=n_process)
+            for word, doc in zip(missing, docs):
+                lemma = ' '.join(token.lemma_.casefold() or token.text for token in doc)
+                computed[word] = ' '.join(_PUNCTUATION_RE.sub(' ', fold_accents(lemma)).split()) or word
+            self.cache.put_many(computed)
+            lemmas.update(computed)
+        return lemmas
+
+    def _join(self, words: List[str], lemmas: Dict[str, str]) -> str:
+        remove_stopwords = getattr(settings, 'CHATBOT_QUERY_STOPWORDS', False)
+        output = ' '.join(lemmas[word] for word in words).split()
+        if remove_stopwords:
+            output = [word for word in output if word not in FRENCH_STOPWORDS]
+        return ' '.join(output)
+
+    def normalize(self, text: str) -> str:
+        words = self.split_words(text)
+        return self._join(words, self.lemmatize(words))
+
+    def normalize_many(self, texts: Iterable[str]) -> List[str]:
+        split = [self.split_words(text) for text in texts]
+        lemmas = self.lemmatize([word for words in split for word in words], n_process=self.n_process)
+        return [self._join(words, lemmas) for words in split]
+
+    def prime(self, texts: Iterable[str]) -> None:
+        """Lemmatiser en lots tous les mots distincts de `texts` (remplit le cache)."""
+        words = {word for text in texts for word in self.split_words(text)}
+        self.lemmatize(list(words), n_process=self.n_process)
+
+
+# Normaliseur partagé du processus (le modèle spaCy n'est chargé qu'une fois)
+_normalizer = None
+_normalizer_lock = threading.Lock()
+
+
+def get_preprocessor_name() -> str:
+    """Normaliseur configuré (`settings.CHATBOT_PREPROCESSOR`, défaut: 'canonical')."""
+    name = getattr(settings, 'CHATBOT_PREPROCESSOR', 'canonical')
+    if name not in PREPROCESSORS:
+        print(f"[Preprocessing] ⚠️ Normaliseur inconnu '{name}', utilisation de 'canonical'")
+        return 'canonical'
+    return name
+
+
+def get_normalizer():
+    """Retourne le normaliseur du processus (créé à la première utilisation)."""
+    global _normalizer
+
+    name = get_preprocessor_name()
+    if _normalizer is None or _normalizer.name != name:
+        with _normalizer_lock:
+            if _normalizer is None or _normalizer.name != name:
+                if name == 'spacy':
+                    _normalizer = SpacyLemmatizer(
+                        getattr(settings, 'CHATBOT_SPACY_MODEL', 'fr_core_news_sm'),
+                        cache_size=getattr(settings, 'CHATBOT_LEMMA_CACHE_SIZE', 50000),
+                        n_process=getattr(settings, 'CHATBOT_SPACY_N_PROCESS', 1),
+                    )
+                elif name == 'french':
+                    _normalizer = FrenchNormalizer(
+                        cache_size=getattr(settings, 'CHATBOT_LEMMA_CACHE_SIZE', 50000),
+                    )
+                else:
+                    _normalizer = CanonicalNormalizer()
+                print(f"[Preprocessing] ✅ Normaliseur: {name}")
+    return _normalizer
+
+
+def normalize_query(text: str) -> str:
+    """
+    Entrée du vectorizer pour un texte (préprocesseur des vectorizers TF-IDF).
+
+    Args:
+        text (str): texte brut
+
+    Returns:
+        str: mots normalisés séparés par un espace
+    """
+    return get_normalizer().normalize(text)
+
+
+def prime_normalizer(texts: Iterable[str]) -> None:
+    """Préparer le normaliseur pour un lot de textes (lemmes calculés en lots)."""
+    get_normalizer().prime(texts)
+
+
+def normalizer_signature() -> str:
+    """Identifiant du normaliseur actif (sans charger de modèle)."""
+    name = get_preprocessor_name()
+    if name == 'spacy':
+        return f"spacy-{getattr(settings, 'CHATBOT_SPACY_MODEL', 'fr_core_news_sm')}"
+    if name == 'french':
+        return f"french-v{FRENCH_NORMALIZER_VERSION}"
+    return name
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# LEMMATISATION spaCy
+# ═══════════════════════════════════════════════════════════════════════
 
 class TextPreprocessor:
     def __init__(self, language_model: str = "fr_core_news_sm"):
@@ -11,6 +366,7 @@ class TextPreprocessor:
         utiliser la fonction `get_preprocessor()` pour obtenir une instance
         réutilisable plutôt que d'instancier à chaque appel.
         """
+        import spacy  # import coûteux: seulement si la lemmatisation est utilisée
         self.nlp = spacy.load(language_model)
 
     def preprocess(self, text: str) -> List[str]:
@@ -49,7 +405,11 @@ def preprocess_text(text: str) -> List[str]:
     Prétraite un texte en utilisant l'instance partagée du préprocesseur.
     
     Cette fonction est sûre à appeler fréquemment — le modèle spaCy n'est
-    chargé qu'une seule fois.
+    chargé qu'une seule fois. Avec le normaliseur 'french', les racines
+    remplacent les lemmes et spaCy n'est jamais chargé.
     """
+    if get_preprocessor_name() == 'french':
+        return [token for token in get_normalizer().tokens(text)
+                if token.isalpha() and token not in FRENCH_STOPWORDS]
     preproc = get_preprocessor()
     return preproc.preprocess(text)
@@ -0,0 +1,150 @@
+"""
+Routage des questions vers les catégories (NIVEAU 1).
+
+Pour chaque catégorie, à partir des lignes normalisées L2 de l'index:
+
+- un CENTROÏDE (moyenne des FAQs de la catégorie, renormalisée): son
+  cosinus avec la question dit quelle catégorie traite le sujet;
+- une BORNE max-norm: pour chaque terme, le plus grand poids normalisé
+  d'une FAQ de la catégorie. `q · borne` majore le cosinus de la question
+  avec n'importe quelle FAQ de la catégorie.
+
+Centroïdes et bornes sont empilés dans une seule matrice creuse: une
+question est routée en UN produit matrice × vecteur, quel que soit le
+nombre de catégories. Seules les meilleures catégories sont ensuite
+scorées, et une catégorie n'est ignorée que si sa borne prouve qu'elle ne
+peut pas battre le meilleur score trouvé.
+
+Fonctions principales :
+- `CategoryRouter.from_faq_index(index)` : centroïdes + bornes depuis l'index CSR.
+- `CategoryRouter.route(user_vec, user_norm)` : (category_ids, scores centroïdes, bornes).
+- `get_category_router()` : routeur du processus, aligné sur `get_faq_index()`.
+"""
+
+import threading
+import numpy as np
+import scipy.sparse as sp
+from typing import Optional, Tuple
+from chatbot.index import FAQIndex, get_faq_index
+
+
+class CategoryRouter:
+    """
+    Lignes 0..n-1 de `stacked`: centroïdes normalisés des catégories
+    `category_ids`; lignes n..2n-1: bornes max-norm des mêmes catégories.
+    """
+
+    def __init__(self, category_ids: np.ndarray, stacked: sp.csr_matrix,
+                 source: Optional[FAQIndex] = None):
+        self.category_ids = category_ids
+        self.stacked = stacked
+        self.source = source
+
+    def __len__(self):
+        return len(self.category_ids)
+
+    @property
+    def n_features(self) -> int:
+        return self.stacked.shape[1]
+
+    @classmethod
+    def from_faq_index(cls, index: FAQIndex) -> 'CategoryRouter':
+        """
+        Calculer centroïdes et bornes de toutes les catégories de l'index.
+
+        Args:
+            index (FAQIndex): index CSR des FAQs actives
+
+        Returns:
+            CategoryRouter: routeur prêt à l'emploi (éventuellement vide)
+        """
+        n_rows, n_features = index.matrix.shape
+        category_ids, row_category = np.unique(np.asarray(index.category_ids), return_inverse=True)
+        n_categories = len(category_ids)
+
+        norms = np.asarray(index.norms, dtype=np.float32)
+        inverse_norms = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+        normalized = (sp.diags(inverse_norms) @ index.matrix).tocoo()
+
+        # Centroïdes: somme des lignes normalisées par catégorie, puis renormalisation L2
+        membership = sp.csr_matrix(
+            (np.ones(n_rows, dtype=np.float32), (row_category, np.arange(n_rows))),
+            shape=(n_categories, n_rows),
+        )
+        centroids = sp.csr_matrix(membership @ normalized.tocsr(), dtype=np.float32)
+        centroid_norms = np.sqrt(np.asarray(centroids.multiply(centroids).sum(axis=1)).ravel())
+        inverse_centroid_norms = np.divide(
+            1.0, centroid_norms, out=np.zeros_like(centroid_norms), where=centroid_norms > 0
+        )
+        centroids = sp.csr_matrix(sp.diags(inverse_centroid_norms) @ centroids, dtype=np.float32)
+
+        # Bornes: poids normalisé maximal par (catégorie, terme)
+        entry_category = row_category[normalized.row]
+        order = np.lexsort((normalized.col, entry_category))
+        keys = entry_category[order].astype(np.int64) * n_features + normalized.col[order]
+        if len(keys):
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+            max_weights = np.maximum.reduceat(normalized.data[order], starts)
+            unique_keys = keys[starts]
+        else:
+            max_weights = np.zeros(0, dtype=np.float32)
+            unique_keys = np.zeros(0, dtype=np.int64)
+        bounds = sp.csr_matrix(
+            (max_weights.astype(np.float32), (unique_keys // n_features, unique_keys % n_features)),
+            shape=(n_categories, n_features),
+        )
+
+        stacked = sp.vstack([centroids, bounds], format='csr', dtype=np.float32)
+        return cls(category_ids.astype(np.int64), stacked, source=index)
+
+    def route(self, user_vec: np.ndarray,
+              user_norm: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Scorer toutes les catégories en un seul produit.
+
+        Args:
+            user_vec: Vecteur TF-IDF dense de la question
+            user_norm: Norme du vecteur utilisateur
+
+        Returns:
+            Tuple (category_ids, cosinus question/centroïde, borne supérieure
+            du cosinus question/FAQ), tableaux alignés
+        """
+        n_categories = len(self)
+        if n_categories == 0 or user_norm == 0:
+            zeros = np.zeros(n_categories, dtype=np.float32)
+            return self.category_ids, zeros, zeros
+
+        user_vec = np.asarray(user_vec, dtype=np.float32)[:self.n_features] / np.float32(user_norm)
+        combined = self.stacked @ user_vec
+        return self.category_ids, combined[:n_categories], combined[n_categories:]
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# ROUTEUR PARTAGÉ DU PROCESSUS
+# ═══════════════════════════════════════════════════════════════════════
+
+_category_router: Optional[CategoryRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_category_router(faq_index: Optional[FAQIndex] = None) -> CategoryRouter:
+    """
+    Retourne le routeur de catégories du processus.
+
+    Il est recalculé dès que l'index résident `get_faq_index()` a été remplacé.
+
+    Args:
+        faq_index (FAQIndex): index de la requête (défaut: index du processus)
+    """
+    global _category_router
+
+    if faq_index is None:
+        faq_index = get_faq_index()
+    router = _category_router
+    if router is None or router.source is not faq_index:
+        with _router_lock:
+            router = CategoryRouter.from_faq_index(faq_index)
+            _category_router = router
+        print(f"[Routing] ✅ Centroïdes calculés: {len(router)} catégories")
+    return router
@@ -0,0 +1,260 @@
+"""
+Règles conversationnelles (NIVEAU 0) compilées en automate Aho-Corasick.
+
+Tous les motifs de `conversational_rules.json` sont compilés UNE fois en un
+seul automate dont l'alphabet est le MOT (forme canonique, voir
+`chatbot.preprocessing.canonicalize_query`):
+
+- une question est parcourue en une seule passe, quel que soit le nombre
+  de règles;
+- un motif ne correspond qu'à des mots entiers: "cc" ne matche plus dans
+  "accès", ni "ty" dans "faculty";
+- accents, casse, ponctuation et élisions sont ignorés des deux côtés.
+
+Quand plusieurs règles correspondent, la plus prioritaire gagne (champ
+optionnel `priority` d'une règle, défaut 0), puis la première du fichier.
+
+Le fichier peut être modifié en production: `RuleRegistry` recompile
+l'automate en arrière-plan dès que son mtime change (vérifié au plus
+toutes les `settings.CHATBOT_RULES_RELOAD_INTERVAL` secondes).
+
+Fonctions principales :
+- `load_conversational_rules(path)` : lit les règles depuis le JSON.
+- `RuleMatcher(rules).match(question)` : règle retenue ou None.
+- `RuleRegistry` : automate courant, rechargé à chaud.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+from chatbot.preprocessing import canonicalize_query
+
+
+# Chemin du fichier JSON des règles conversationnelles
+RULES_JSON_PATH = Path(__file__).parent.parent / 'data' / 'json' / 'conversational_rules.json'
+
+
+class RuleMatch(NamedTuple):
+    """Règle retenue pour une question."""
+    intent: str
+    pattern: str
+    response: str
+
+
+def read_conversational_rules(path: Path = RULES_JSON_PATH) -> List[Dict]:
+    """
+    Lire les règles conversationnelles depuis le fichier JSON.
+
+    Returns:
+        list: Liste de règles {'intent', 'patterns', 'response', 'priority'?}
+
+    Raises:
+        OSError, ValueError: fichier absent, illisible ou JSON invalide
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    rules = data.get('conversational_rules', [])
+    if not isinstance(rules, list):
+        raise ValueError("'conversational_rules' doit être une liste")
+    return rules
+
+
+def load_conversational_rules(path: Path = RULES_JSON_PATH) -> List[Dict]:
+    """
+    Charger les règles conversationnelles (liste vide en cas d'erreur).
+
+    Returns:
+        list: Liste de règles {'intent', 'patterns', 'response', 'priority'?}
+    """
+    try:
+        if path.exists():
+            return read_conversational_rules(path)
+        else:
+            print(f"[Rules] ⚠️ Fichier de règles non trouvé: {path}")
+            return []
+    except Exception as e:
+        print(f"[Rules] ⚠️ Erreur chargement règles: {e}")
+        return []
+
+
+def _pattern_words(pattern: str) -> List[str]:
+    """Mots d'un motif, dans la même forme canonique que les questions."""
+    return canonicalize_query(pattern, remove_stopwords=False).split()
+
+
+class RuleMatcher:
+    """
+    Automate Aho-Corasick sur des séquences de mots.
+
+    État 0 = racine. Pour chaque état: transitions mot → état, lien d'échec
+    (plus long suffixe propre aussi préfixe d'un motif) et meilleure règle
+    reconnue en arrivant dans cet état (sorties des liens d'échec incluses).
+    """
+
+    def __init__(self, rules: List[Dict]):
+        self.rules = rules
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Meilleure sortie de l'état: (rang, motif) avec rang = (-priorité, n° de règle)
+        self._output: List[Optional[tuple]] = [None]
+        self.n_patterns = 0
+
+        for rule_number, rule in enumerate(rules):
+            rank = (-int(rule.get('priority', 0)), rule_number)
+            for pattern in rule.get('patterns', []):
+                words = _pattern_words(pattern)
+                if words:
+                    self._add_pattern(words, (rank, pattern))
+                    self.n_patterns += 1
+
+        self._build_failure_links()
+
+    def __len__(self):
+        return len(self.rules)
+
+    def _add_pattern(self, words: List[str], output: tuple) -> None:
+        state = 0
+        for word in words:
+            next_state = self._goto[state].get(word)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][word] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+            state = next_state
+        self._output[state] = _best(self._output[state], output)
+
+    def _build_failure_links(self) -> None:
+        """Parcours en largeur: lien d'échec de chaque état + fusion des sorties."""
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for word, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and word not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(word, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = _best(self._output[child], self._output[self._fail[child]])
+
+    def match(self, question: str) -> Optional[RuleMatch]:
+        """
+        Règle la plus prioritaire dont un motif apparaît (mots entiers) dans la question.
+
+        Args:
+            question (str): Question de l'utilisateur
+
+        Returns:
+            RuleMatch ou None si aucune règle ne correspond
+        """
+        best = None
+        state = 0
+        for word in canonicalize_query(question, remove_stopwords=False).split():
+            while state and word not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(word, 0)
+            best = _best(best, self._output[state])
+
+        if best is None:
+            return None
+
+        (_, rule_number), pattern = best
+        rule = self.rules[rule_number]
+        return RuleMatch(rule.get('intent', 'unknown'), pattern, rule.get('response', ''))
+
+
+def _best(current: Optional[tuple], candidate: Optional[tuple]) -> Optional[tuple]:
+    """Sortie de meilleur rang (priorité la plus haute, puis règle la plus tôt)."""
+    if candidate is None:
+        return current
+    if current is None or candidate[0] < current[0]:
+        return candidate
+    return current
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# RECHARGEMENT À CHAUD
+# ═══════════════════════════════════════════════════════════════════════
+
+class RuleRegistry:
+    """
+    Automate courant des règles, rechargé à chaud quand le fichier change.
+
+    Au plus une fois par `interval` secondes, un `os.stat` compare le mtime
+    du fichier à celui de l'automate en service. S'il a changé, la lecture
+    et la compilation se font dans un thread: les requêtes continuent avec
+    l'ancien automate jusqu'au remplacement (une simple affectation).
+    Un fichier invalide (JSON en cours d'écriture...) est ignoré: l'ancien
+    automate reste en service jusqu'à la prochaine modification.
+    """
+
+    def __init__(self, path: Path = RULES_JSON_PATH, interval: float = 5.0):
+        self.path = path
+        self.interval = interval
+        self._mtime = self._stat_mtime()
+        self._matcher = RuleMatcher(load_conversational_rules(path))
+        self._next_check = time.monotonic() + interval
+        self._lock = threading.Lock()
+        self._reloading = False
+
+    def _stat_mtime(self) -> Optional[int]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    @property
+    def matcher(self) -> RuleMatcher:
+        """Automate en service (déclenche au besoin un rechargement en arrière-plan)."""
+        self.check_for_changes()
+        return self._matcher
+
+    def match(self, question: str) -> Optional[RuleMatch]:
+        return self.matcher.match(question)
+
+    def check_for_changes(self) -> bool:
+        """
+        Lancer un rechargement si le fichier a changé depuis la dernière compilation.
+
+        Returns:
+            bool: True si un rechargement a été lancé
+        """
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.interval
+
+        mtime = self._stat_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+
+        with self._lock:
+            if self._reloading:
+                return False
+            self._reloading = True
+
+        threading.Thread(target=self._reload, args=(mtime,), daemon=True).start()
+        return True
+
+    def _reload(self, mtime: int) -> None:
+        """Lire, compiler puis remplacer l'automate (thread d'arrière-plan)."""
+        try:
+            matcher = RuleMatcher(read_conversational_rules(self.path))
+            self._matcher = matcher
+            print(f"[Rules] 🔄 Règles rechargées: {len(matcher)} règles, {matcher.n_patterns} motifs")
+
+            # Les réponses en cache ont pu être produites par les anciennes règles
+            from chatbot.answer_cache import bump_corpus_generation
+            bump_corpus_generation()
+        except Exception as e:
+            print(f"[Rules] ⚠️ Rechargement ignoré, règles précédentes conservées: {e}")
+        finally:
+            self._mtime = mtime
+            self._reloading = False
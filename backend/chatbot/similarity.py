@@ -6,36 +6,80 @@ ARCHITECTURE SIMPLIFIÉE (3 NIVEAUX):
 ═══════════════════════════════════════════════════════════════════════
 
 NIVEAU 0: RÈGLES CONVERSATIONNELLES (JSON externe)
-    ✓ Pattern matching simple, AVANT vectorisation
-    ✓ Règles chargées depuis conversational_rules.json
+    ✓ Automate Aho-Corasick sur mots entiers (chatbot.rules), AVANT vectorisation
+    ✓ Règles chargées depuis conversational_rules.json, priorité par règle
+    ✓ Rechargées à chaud (mtime) sans redémarrer les workers
     ✓ Performance: <5ms, RAM: 0 MB
     ✓ Résout: ~30% des requêtes
 
-NIVEAU 1: CATÉGORIES PAR POPULARITÉ + CACHE
-    ✓ Traite catégories par ordre de popularité décroissante
-    ✓ 1 catégorie à la fois (économise RAM)
-    ✓ Cache: dernière catégorie avec meilleur score
-    ✓ Commence par cache, puis catégories populaires
-    ✓ Stop dès que score d'une catégorie = 0 (plus rien à trouver)
-    ✓ Performance: <2s, RAM: 40-60 MB
+INDEX RÉSIDENT (chatbot.index)
+    ✓ Tous les vecteurs actifs chargés UNE FOIS en CSR float32 par processus
+    ✓ Score d'une question = 1 produit matrice creuse × vecteur
+    ✓ Plus aucune lecture de FAQVector pendant la recherche
+
+NIVEAU 1: ROUTAGE PAR CATÉGORIES + CACHE (chatbot.routing)
+    ✓ Question scorée contre TOUS les centroïdes de catégories en un produit
+    ✓ Seules les top-m catégories (settings.CHATBOT_ROUTING_TOP_M) sont explorées
+    ✓ Bornes max-norm: une catégorie n'est écartée que si elle ne peut pas
+      battre le meilleur score trouvé
+    ✓ Affinité par conversation: catégories récentes du client explorées
+      en premier (cache LRU + TTL thread-safe, chatbot.affinity)
+    ✓ Coût indépendant du nombre de catégories
     ✓ Résout: ~60% des requêtes
 
 NIVEAU 2: FALLBACK GLOBAL
     ✓ Si aucune catégorie n'a donné de résultat
-    ✓ Scan toutes catégories (batch de 3)
+    ✓ Scan de tout l'index en un seul produit matriciel
     ✓ Performance: <5s, RAM: 60-80 MB
     ✓ Résout: ~10% des requêtes
 
+MOTEUR ALTERNATIF: INDEX INVERSÉ (settings.CHATBOT_SEARCH_ENGINE = 'inverted')
+    ✓ Remplace les niveaux 1 et 2 par un top-k global élagué (MaxScore)
+    ✓ Ne score que les FAQs partageant un terme avec la question
+    ✓ Coût proportionnel aux postings, pas à la taille du corpus
+
+MOTEUR ALTERNATIF: IVF APPROXIMATIF (settings.CHATBOT_SEARCH_ENGINE = 'ann')
+    ✓ FAQs regroupées hors ligne en clusters (k-means sphérique, chatbot.ann)
+    ✓ Seules les FAQs des CHATBOT_ANN_NPROBE clusters les plus proches sont
+      candidates, puis rescorées exactement
+    ✓ Rappel réglable contre latence (docs/backend/ANN_RAPPEL_LATENCE.md)
+
+MOTEUR ALTERNATIF: PLONGEMENTS LSA (settings.CHATBOT_SEARCH_ENGINE = 'lsa')
+    ✓ TruncatedSVD sur la matrice TF-IDF (chatbot.lsa), 256 dimensions float32
+    ✓ Score = 1 produit matrice dense × vecteur (GEMV) sur un tableau contigu
+    ✓ Retrouve des FAQs sans terme commun avec la question (quasi-synonymes)
+
+CANAL N-GRAMMES DE CARACTÈRES (chatbot.ngrams, settings.CHATBOT_CHAR_NGRAMS)
+    ✓ Index 'char_wb' séparé, tolérant aux fautes ("inscripsion", "mot d passe")
+    ✓ 'fallback': remplace « Je n'ai pas compris » quand le vecteur par mots est nul
+    ✓ 'blend': scores mots et n-grammes mélangés sur les candidats des deux canaux
+
+RECHERCHE PAR LOT (find_best_faq_batch)
+    ✓ N questions vectorisées en un seul transform
+    ✓ Même parcours que find_best_faq (niveaux 1-2 ou moteur, n-grammes)
+    ✓ Niveau 2 de tout le lot: 1 produit matrice creuse × matrice creuse
+
 ═══════════════════════════════════════════════════════════════════════
 """
 
 import numpy as np
-import json
-from pathlib import Path
-from django.db import models
-from django.db.models import Count, Sum
-from faq.models import FAQ, FAQVector, Category
-from chatbot.vectorization import compute_tfidf_vector
+from django.conf import settings
+from faq.models import FAQ, Category
+from chatbot.vectorization import (
+    compute_tfidf_matrix,
+    compute_tfidf_vector,
+    get_search_index,
+    reload_artifacts_if_changed,
+)
+from chatbot.index import FAQIndex, get_faq_index
+from chatbot.inverted_index import get_inverted_index
+from chatbot.ann import get_ann_index
+from chatbot.lsa import get_lsa_index
+from chatbot.ngrams import get_char_channel, get_char_ngram_mode
+from chatbot.routing import get_category_router
+from chatbot.affinity import get_affinity_cache
+from chatbot.preprocessing import get_normalizer
+from chatbot.rules import RuleRegistry
 from typing import List, Dict, Tuple, Optional
 
 
@@ -43,99 +87,41 @@ from typing import List, Dict, Tuple, Optional
 # CONFIGURATION GLOBALE
 # ═══════════════════════════════════════════════════════════════════════
 
-# Chemin du fichier JSON des règles conversationnelles
-RULES_JSON_PATH = Path(__file__).parent.parent / 'data' / 'json' / 'conversational_rules.json'
-
 # Seuil pour considérer un score comme bon
 GOOD_SCORE_THRESHOLD = 0.7
 
-# Cache global: dernière catégorie avec meilleur score
-_CATEGORY_CACHE = {
-    'category_id': None,
-    'category_name': None,
-    'last_score': 0.0
-}
+# Moteurs de recherche disponibles derrière find_best_faq()
+SEARCH_ENGINES = ('cascade', 'inverted', 'ann', 'lsa')
 
 
 # ═══════════════════════════════════════════════════════════════════════
 # CHARGEMENT RÈGLES CONVERSATIONNELLES
 # ═══════════════════════════════════════════════════════════════════════
 
-def load_conversational_rules():
-    """
-    Charger les règles conversationnelles depuis le fichier JSON.
-    
-    Returns:
-        list: Liste de règles {'intent', 'patterns', 'response'}
-    """
-    try:
-        if RULES_JSON_PATH.exists():
-            with open(RULES_JSON_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('conversational_rules', [])
-        else:
-            print(f"[Similarity] ⚠️ Fichier de règles non trouvé: {RULES_JSON_PATH}")
-            return []
-    except Exception as e:
-        print(f"[Similarity] ⚠️ Erreur chargement règles: {e}")
-        return []
-
-
-# Charger les règles au démarrage du module
-CONVERSATIONAL_RULES = load_conversational_rules()
+# Tous les motifs compilés en un seul automate (une passe par question),
+# recompilé à chaud quand conversational_rules.json change
+RULE_REGISTRY = RuleRegistry(interval=getattr(settings, 'CHATBOT_RULES_RELOAD_INTERVAL', 5.0))
 
 
 # ═══════════════════════════════════════════════════════════════════════
 # UTILITAIRES
 # ═══════════════════════════════════════════════════════════════════════
 
-def compute_similarity_batch(user_vec: np.ndarray, 
-                             user_norm: float,
-                             faq_vectors: List) -> List[Tuple[FAQ, float]]:
+def attach_faqs(scored_ids: List[Tuple[int, float]]) -> List[Tuple[FAQ, float]]:
     """
-    Calculer les similarités cosinus pour un batch de FAQVectors.
+    Remplacer les ids renvoyés par l'index par les objets FAQ (1 requête).
     
     Args:
-        user_vec: Vecteur TF-IDF de la question utilisateur
-        user_norm: Norme du vecteur utilisateur
-        faq_vectors: Liste de FAQVector objects
+        scored_ids: Liste de tuples (faq_id, score)
     
     Returns:
-        List de tuples (FAQ, score) triés par score décroissant
+        List de tuples (FAQ, score) dans le même ordre
     """
-    if not faq_vectors or user_norm == 0:
+    if not scored_ids:
         return []
     
-    # Construire matrice de vecteurs FAQ
-    faqs = []
-    norms = []
-    vectors = []
-    
-    for faq_vec in faq_vectors:
-        faqs.append(faq_vec.faq)
-        norms.append(faq_vec.norm)
-        vectors.append(faq_vec.tfidf_vector)
-    
-    # Conversion en numpy arrays (float32 pour économiser RAM)
-    faq_matrix = np.array(vectors, dtype=np.float32)
-    faq_norms = np.array(norms, dtype=np.float32)
-    user_vec_f32 = user_vec.astype(np.float32)
-    
-    # Calcul vectorisé des similarités cosinus
-    dot_products = faq_matrix @ user_vec_f32
-    scores = dot_products / (faq_norms * user_norm)
-    scores = np.clip(scores, 0.0, 1.0)
-    
-    # Créer liste de résultats
-    results = [(faqs[i], float(scores[i])) for i in range(len(faqs))]
-    
-    # Trier par score décroissant
-    results.sort(key=lambda x: x[1], reverse=True)
-    
-    # Libérer mémoire explicitement
-    del faq_matrix, faq_norms, vectors, scores, dot_products
-    
-    return results
+    faqs = FAQ.objects.select_related('category').in_bulk([faq_id for faq_id, _ in scored_ids])
+    return [(faqs[faq_id], score) for faq_id, score in scored_ids if faq_id in faqs]
 
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -152,257 +138,410 @@ def match_conversational_rule(question: str) -> Optional[str]:
     Returns:
         str: Réponse directe si match trouvé, None sinon
     """
-    question_lower = question.lower().strip()
-    
-    # Chercher un match dans chaque règle
-    for rule in CONVERSATIONAL_RULES:
-        intent = rule.get('intent', 'unknown')
-        patterns = rule.get('patterns', [])
-        response = rule.get('response', '')
-        
-        for pattern in patterns:
-            if pattern in question_lower:
-                print(f"[Similarity L0] ✅ RÈGLE '{intent}' (pattern: '{pattern}')")
-                return response
+    rule = RULE_REGISTRY.match(question)
+    if rule is None:
+        return None
     
-    return None
+    print(f"[Similarity L0] ✅ RÈGLE '{rule.intent}' (pattern: '{rule.pattern}')")
+    return rule.response
 
 
 # ═══════════════════════════════════════════════════════════════════════
-# NIVEAU 1: CATÉGORIES PAR POPULARITÉ + CACHE
+# NIVEAU 1: ROUTAGE PAR CATÉGORIES + CACHE
 # ═══════════════════════════════════════════════════════════════════════
 
-def get_categories_by_popularity():
+def search_by_category_routing(user_vec: np.ndarray, user_norm: float,
+                               top_k: int = 3,
+                               client_id: Optional[str] = None,
+                               index: Optional[FAQIndex] = None) -> Optional[List[Dict]]:
     """
-    Récupérer les catégories triées par popularité décroissante.
+    NIVEAU 1: Recherche dans les catégories désignées par le routeur.
+    
+    Processus:
+    1. Chercher d'abord dans les catégories récentes de la conversation
+       (cache d'affinité par client, voir chatbot.affinity)
+    2. Router la question: cosinus avec TOUS les centroïdes + bornes max-norm
+       (un seul produit matriciel, voir chatbot.routing)
+    3. Chercher dans les `top_m` catégories aux meilleurs centroïdes
+    4. Chercher aussi toute autre catégorie dont la borne dépasse encore le
+       meilleur score trouvé (aucune catégorie n'est écartée à tort)
+    5. Mémoriser la catégorie gagnante pour la conversation
+    
+    Args:
+        user_vec: Vecteur TF-IDF
+        user_norm: Norme du vecteur
+        top_k (int): Nombre de résultats
+        client_id (str): Identifiant de la conversation (None = pas d'affinité)
+        index (FAQIndex): Index de la requête, avec son vectorizer (défaut: index du processus)
     
     Returns:
-        List[Category]: Catégories triées
+        Liste de résultats si trouvé, None sinon
     """
-    # Calculer popularité totale par catégorie
-    categories = Category.objects.filter(active=True).annotate(
-        total_popularity=Sum('faq__popularity'),
-        faq_count=Count('faq', filter=models.Q(faq__is_active=True))
-    ).filter(faq_count__gt=0).order_by('-total_popularity')
+    print(f"[Similarity L1] 🧭 Routage par centroïdes de catégories...")
+    
+    if index is None:
+        index = get_faq_index()
+    category_ids, centroid_scores, bounds = get_category_router(index).route(user_vec, user_norm)
+    
+    # Seules les catégories actives pouvant contenir un score non nul
+    active_ids = list(Category.objects.filter(active=True).values_list('id', flat=True))
+    eligible = np.isin(category_ids, active_ids) & (bounds > 0)
+    if not eligible.any():
+        print("[Similarity L1] ⚠️ Aucune catégorie ne partage de terme avec la question")
+        return None
+    
+    bound_of = dict(zip(category_ids[eligible].tolist(), bounds[eligible].tolist()))
+    searched = set()
+    best_scored: List[Tuple[int, float]] = []
+    
+    def explore(ids):
+        nonlocal best_scored
+        searched.update(ids)
+        scored = index.search_categories(user_vec, user_norm, ids, top_k=top_k)
+        best_scored = sorted(best_scored + scored, key=lambda item: item[1], reverse=True)[:top_k]
+        return best_scored[0][1] if best_scored else 0.0
+    
+    # 1. D'ABORD: Catégories récentes de cette conversation
+    affinity = get_affinity_cache()
+    recent = [c for c in affinity.get(client_id) if c in bound_of]
+    if recent:
+        print(f"[Similarity L1] 📦 Affinité conversation: catégories {recent}")
+        score = explore(recent)
+        if score >= GOOD_SCORE_THRESHOLD:
+            print(f"[Similarity L1] ✅ TROUVÉ par affinité (score ≥ {GOOD_SCORE_THRESHOLD})")
+            results = attach_faqs(best_scored)
+            if results:
+                affinity.record(client_id, results[0][0].category_id)
+            # Résultat propre à cette conversation: marqué pour ne pas être partagé en cache
+            return [{'faq': faq, 'score': s, 'affinity': True} for faq, s in results]
+    
+    # 2. ENSUITE: les top-m catégories par centroïde
+    top_m = getattr(settings, 'CHATBOT_ROUTING_TOP_M', 3)
+    by_centroid = category_ids[eligible][np.argsort(-centroid_scores[eligible], kind='stable')]
+    routed = [int(c) for c in by_centroid if int(c) not in searched][:top_m]
+    best_score = explore(routed) if routed else (best_scored[0][1] if best_scored else 0.0)
+    print(f"[Similarity L1] 📊 {len(routed)}/{len(bound_of)} catégories routées, score={best_score:.3f}")
+    
+    # 3. Bornes: une catégorie non explorée n'est écartée que si elle ne peut pas faire mieux
+    for category_id, bound in sorted(bound_of.items(), key=lambda item: item[1], reverse=True):
+        if bound <= best_score:
+            break
+        if category_id not in searched:
+            best_score = explore([category_id])
+    
+    results = attach_faqs(best_scored)
+    if not results or best_score <= 0:
+        print("[Similarity L1] ❌ Aucun résultat trouvé")
+        return None
     
-    return list(categories)
+    # 4. Mémoriser la catégorie gagnante pour cette conversation
+    best_category = results[0][0].category
+    affinity.record(client_id, best_category.id)
+    print(f"[Similarity L1] ✅ Meilleur résultat: {best_score:.3f} dans '{best_category.name}' "
+          f"({len(searched)} catégories explorées)")
+    return [{'faq': faq, 'score': score} for faq, score in results]
 
 
-def search_in_category(category: Category, user_vec: np.ndarray, user_norm: float,
-                      top_k: int = 3) -> Tuple[List[Tuple[FAQ, float]], float]:
+# ═══════════════════════════════════════════════════════════════════════
+# NIVEAU 2: FALLBACK GLOBAL
+# ═══════════════════════════════════════════════════════════════════════
+
+def search_fallback_global(user_vec: np.ndarray, user_norm: float,
+                          top_k: int = 3, index: Optional[FAQIndex] = None,
+                          scored: Optional[List[Tuple[int, float]]] = None) -> List[Dict]:
     """
-    Rechercher dans une catégorie spécifique.
+    NIVEAU 2: Fallback - recherche dans TOUTES les catégories.
     
     Args:
-        category: Catégorie à explorer
-        user_vec: Vecteur utilisateur
+        user_vec: Vecteur TF-IDF
         user_norm: Norme du vecteur
-        top_k: Nombre de résultats
+        top_k (int): Nombre de résultats
+        index (FAQIndex): Index de la requête, avec son vectorizer (défaut: index du processus)
+        scored: Top-k global déjà calculé pour cette question (recherche par
+            lot: un produit matriciel pour tout le lot), sinon calculé ici
     
     Returns:
-        Tuple de (résultats, meilleur_score)
+        Liste de résultats (meilleur score global)
     """
-    # Récupérer vecteurs de cette catégorie
-    category_vectors = FAQVector.objects.filter(
-        faq__category=category,
-        faq__is_active=True
-    ).select_related('faq').only(
-        'tfidf_vector', 'norm',
-        'faq__id', 'faq__question', 'faq__answer', 'faq__popularity'
-    )
+    print(f"[Similarity L2] 🔍 Fallback global...")
+    
+    if index is None:
+        index = get_faq_index()
+    
+    if len(index) == 0:
+        print("[Similarity L2] ⚠️ Aucune FAQ active")
+        return []
     
-    if not category_vectors.exists():
-        return [], 0.0
+    print(f"[Similarity L2] 📊 Recherche dans {len(index)} FAQs...")
     
-    # Calcul des similarités
-    results = compute_similarity_batch(user_vec, user_norm, list(category_vectors))
+    # Un seul produit matrice creuse × vecteur sur TOUT le corpus
+    if scored is None:
+        scored = index.search(user_vec, user_norm, top_k=top_k)
+    best_score = scored[0][1] if scored else 0.0
+    best_results = attach_faqs(scored) if best_score > 0 else []
     
-    if not results:
-        return [], 0.0
+    if best_results:
+        print(f"[Similarity L2] ✅ Meilleur score global: {best_score:.3f}")
+        return [{'faq': faq, 'score': s} for faq, s in best_results]
     
-    best_score = results[0][1]
-    return results[:top_k], best_score
+    print("[Similarity L2] ❌ Aucun résultat trouvé")
+    return []
+
 
+# ═══════════════════════════════════════════════════════════════════════
+# MOTEURS ALTERNATIFS: INDEX INVERSÉ / IVF / LSA
+# ═══════════════════════════════════════════════════════════════════════
 
-def search_by_popularity_with_cache(user_vec: np.ndarray, user_norm: float,
-                                    top_k: int = 3) -> Optional[List[Dict]]:
+def search_inverted_index(user_vec: np.ndarray, user_norm: float,
+                          top_k: int = 3, index: Optional[FAQIndex] = None) -> List[Dict]:
     """
-    NIVEAU 1: Recherche par catégories populaires avec cache.
-    
-    Processus:
-    1. Si cache existe → chercher d'abord dans catégorie cachée
-    2. Chercher dans catégories par ordre de popularité (1 par 1)
-    3. Stop dès que score d'une catégorie = 0 (plus rien à trouver)
-    4. Mettre à jour cache avec catégorie ayant meilleur score
+    Top-k global via l'index inversé (MaxScore), en remplacement des niveaux 1-2.
     
     Args:
         user_vec: Vecteur TF-IDF
         user_norm: Norme du vecteur
         top_k (int): Nombre de résultats
+        index (FAQIndex): Index de la requête, avec son vectorizer (défaut: index du processus)
     
     Returns:
-        Liste de résultats si trouvé, None sinon
+        Liste de résultats {'faq': FAQ, 'score': float}
     """
-    global _CATEGORY_CACHE
-    
-    print(f"[Similarity L1] 🔍 Recherche par catégories populaires...")
+    print("[Similarity INV] 🔍 Recherche par index inversé...")
     
-    best_results = None
-    best_score = 0.0
-    best_category = None
+    scored = get_inverted_index(index).search(user_vec, user_norm, top_k=top_k)
+    results = attach_faqs(scored)
     
-    # Liste des catégories à traiter
-    categories = get_categories_by_popularity()
+    if results:
+        print(f"[Similarity INV] ✅ Meilleur score: {results[0][1]:.3f}")
+    else:
+        print("[Similarity INV] ❌ Aucun résultat trouvé")
     
-    if not categories:
-        print("[Similarity L1] ⚠️ Aucune catégorie active trouvée")
-        return None
+    return [{'faq': faq, 'score': s} for faq, s in results]
+
+
+def search_ann_index(user_vec: np.ndarray, user_norm: float, top_k: int = 3,
+                     nprobe: Optional[int] = None, index: Optional[FAQIndex] = None) -> List[Dict]:
+    """
+    Top-k global approximatif via l'index IVF, en remplacement des niveaux 1-2.
     
-    # 1. D'ABORD: Vérifier le cache
-    if _CATEGORY_CACHE['category_id']:
-        print(f"[Similarity L1] 📦 Vérification cache: '{_CATEGORY_CACHE['category_name']}'")
-        
-        try:
-            cached_category = Category.objects.get(id=_CATEGORY_CACHE['category_id'])
-            results, score = search_in_category(cached_category, user_vec, user_norm, top_k)
-            
-            if score > 0:
-                print(f"[Similarity L1] 📈 Cache: score={score:.3f}")
-                best_results = results
-                best_score = score
-                best_category = cached_category
-                
-                # Si excellent score → retour immédiat
-                if score >= GOOD_SCORE_THRESHOLD:
-                    print(f"[Similarity L1] ✅ TROUVÉ dans cache (score ≥ {GOOD_SCORE_THRESHOLD})")
-                    return [{'faq': faq, 'score': s} for faq, s in best_results]
-        
-        except Category.DoesNotExist:
-            print("[Similarity L1] ⚠️ Catégorie en cache n'existe plus")
-            _CATEGORY_CACHE = {'category_id': None, 'category_name': None, 'last_score': 0.0}
+    Args:
+        user_vec: Vecteur TF-IDF
+        user_norm: Norme du vecteur
+        top_k (int): Nombre de résultats
+        nprobe (int): Clusters explorés (défaut: settings.CHATBOT_ANN_NPROBE)
+        index (FAQIndex): Index de la requête, avec son vectorizer (défaut: index du processus)
     
-    # 2. ENSUITE: Parcourir catégories par popularité
-    print(f"[Similarity L1] 📊 Traitement de {len(categories)} catégories...")
+    Returns:
+        Liste de résultats {'faq': FAQ, 'score': float}
+    """
+    nprobe = nprobe or getattr(settings, 'CHATBOT_ANN_NPROBE', 8)
+    print(f"[Similarity ANN] 🔍 Recherche IVF (nprobe={nprobe})...")
+    
+    if index is None:
+        index = get_faq_index()
+    ann = get_ann_index()
+    if ann.version != index.version:
+        # Requête commencée avant une bascule: centroïdes d'un autre vectorizer, recherche exacte
+        scored = index.search(user_vec, user_norm, top_k=top_k)
+    else:
+        scored = ann.search(index, user_vec, user_norm, top_k=top_k, nprobe=nprobe)
+    results = attach_faqs(scored)
     
-    for category in categories:
-        # Skip si c'est la catégorie déjà testée en cache
-        if _CATEGORY_CACHE['category_id'] == category.id:
-            continue
-        
-        print(f"[Similarity L1] 🔎 Catégorie: '{category.name}'")
-        
-        results, score = search_in_category(category, user_vec, user_norm, top_k)
-        
-        if score == 0:
-            print(f"[Similarity L1] ⚠️ Score nul pour '{category.name}' → STOP recherche")
-            break  # Plus rien à trouver dans les catégories suivantes
-        
-        print(f"[Similarity L1] 📈 Score: {score:.3f}")
-        
-        if score > best_score:
-            best_results = results
-            best_score = score
-            best_category = category
-            
-            # Si excellent score → retour immédiat
-            if score >= GOOD_SCORE_THRESHOLD:
-                print(f"[Similarity L1] ✅ TROUVÉ (score ≥ {GOOD_SCORE_THRESHOLD})")
-                break
-    
-    # 3. Mettre à jour le cache
-    if best_category:
-        _CATEGORY_CACHE = {
-            'category_id': best_category.id,
-            'category_name': best_category.name,
-            'last_score': best_score
-        }
-        print(f"[Similarity L1] 💾 Cache mis à jour: '{best_category.name}' (score: {best_score:.3f})")
-    
-    # 4. Retourner meilleur résultat trouvé
-    if best_results and best_score > 0:
-        print(f"[Similarity L1] ✅ Meilleur résultat: {best_score:.3f} dans '{best_category.name}'")
-        return [{'faq': faq, 'score': s} for faq, s in best_results]
+    if results:
+        print(f"[Similarity ANN] ✅ Meilleur score: {results[0][1]:.3f}")
+    else:
+        print("[Similarity ANN] ❌ Aucun résultat trouvé")
     
-    print("[Similarity L1] ❌ Aucun résultat trouvé")
-    return None
-
+    return [{'faq': faq, 'score': s} for faq, s in results]
 
-# ═══════════════════════════════════════════════════════════════════════
-# NIVEAU 2: FALLBACK GLOBAL
-# ═══════════════════════════════════════════════════════════════════════
 
-def search_fallback_global(user_vec: np.ndarray, user_norm: float,
-                          top_k: int = 3) -> List[Dict]:
+def search_lsa_index(user_vec: np.ndarray, user_norm: float,
+                     top_k: int = 3, index: Optional[FAQIndex] = None) -> List[Dict]:
     """
-    NIVEAU 2: Fallback - recherche dans TOUTES les catégories.
+    Top-k global par cosinus dans l'espace LSA, en remplacement des niveaux 1-2.
     
     Args:
         user_vec: Vecteur TF-IDF
         user_norm: Norme du vecteur
         top_k (int): Nombre de résultats
+        index (FAQIndex): Index de la requête, avec son vectorizer (défaut: index du processus)
     
     Returns:
-        Liste de résultats (meilleur score global)
+        Liste de résultats {'faq': FAQ, 'score': float}
     """
-    print(f"[Similarity L2] 🔍 Fallback global...")
+    print("[Similarity LSA] 🔍 Recherche par plongements LSA...")
+    
+    if index is None:
+        index = get_faq_index()
+    lsa = get_lsa_index()
+    if lsa.version != index.version:
+        # Requête commencée avant une bascule: plongements d'un autre vectorizer, recherche exacte
+        scored = index.search(user_vec, user_norm, top_k=top_k)
+    else:
+        scored = lsa.search(user_vec, user_norm, top_k=top_k, index=index)
+    results = attach_faqs(scored)
     
-    # Récupérer TOUS les vecteurs actifs (toutes catégories)
-    all_vectors = FAQVector.objects.filter(
-        faq__is_active=True
-    ).select_related('faq', 'faq__category').only(
-        'tfidf_vector', 'norm',
-        'faq__id', 'faq__question', 'faq__answer', 'faq__category__name'
-    )
+    if results:
+        print(f"[Similarity LSA] ✅ Meilleur score: {results[0][1]:.3f}")
+    else:
+        print("[Similarity LSA] ❌ Aucun résultat trouvé")
     
-    if not all_vectors.exists():
-        print("[Similarity L2] ⚠️ Aucune FAQ active")
+    return [{'faq': faq, 'score': s} for faq, s in results]
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# CANAL N-GRAMMES DE CARACTÈRES
+# ═══════════════════════════════════════════════════════════════════════
+
+def search_char_ngrams(question: str, top_k: int = 3) -> List[Tuple[int, float]]:
+    """
+    Top-k global sur le canal n-grammes (question sans aucun mot connu).
+    
+    Args:
+        question (str): Question de l'utilisateur
+        top_k (int): Nombre de résultats
+    
+    Returns:
+        List de tuples (faq_id, score), vide si le canal est désactivé
+    """
+    channel = get_char_channel()
+    if channel is None:
         return []
     
-    print(f"[Similarity L2] 📊 Recherche dans {all_vectors.count()} FAQs...")
+    print("[Similarity CHAR] 🔍 Recherche par n-grammes de caractères...")
+    scored = channel.search(question, top_k)
     
-    # Calcul des similarités sur TOUT le corpus (par batch pour RAM)
-    batch_size = 500
-    best_results = []
-    best_score = 0.0
+    if scored:
+        print(f"[Similarity CHAR] ✅ Meilleur score: {scored[0][1]:.3f}")
+    else:
+        print("[Similarity CHAR] ❌ Aucun résultat trouvé")
+    return scored
+
+
+def blend_char_scores(question: str, user_vec: np.ndarray, user_norm: float,
+                      scored_ids: List[Tuple[int, float]], top_k: int = 3,
+                      index: Optional[FAQIndex] = None) -> List[Tuple[int, float]]:
+    """
+    Mélanger scores par mots et par n-grammes (mode 'blend').
     
-    total = all_vectors.count()
-    for i in range(0, total, batch_size):
-        batch = list(all_vectors[i:i+batch_size])
-        results = compute_similarity_batch(user_vec, user_norm, batch)
-        
-        if results and results[0][1] > best_score:
-            best_results = results[:top_k]
-            best_score = results[0][1]
+    Candidats = résultats par mots ∪ top-k n-grammes; chaque candidat est
+    scoré exactement dans les deux espaces puis:
+        score = (1 - w) · mots + w · n-grammes   (w = CHATBOT_CHAR_NGRAM_WEIGHT)
     
-    if best_results:
-        print(f"[Similarity L2] ✅ Meilleur score global: {best_score:.3f}")
-        return [{'faq': faq, 'score': s} for faq, s in best_results]
+    Args:
+        question (str): Question de l'utilisateur
+        user_vec: Vecteur TF-IDF par mots
+        user_norm: Norme du vecteur par mots
+        scored_ids: Résultats par mots (faq_id, score)
+        top_k (int): Nombre de résultats
+        index (FAQIndex): Index de la requête, avec son vectorizer (défaut: index du processus)
     
-    print("[Similarity L2] ❌ Aucun résultat trouvé")
-    return []
+    Returns:
+        List de tuples (faq_id, score), score décroissant
+    """
+    channel = get_char_channel()
+    if channel is None:
+        return scored_ids
+    
+    weight = getattr(settings, 'CHATBOT_CHAR_NGRAM_WEIGHT', 0.3)
+    word_scores = dict(scored_ids)
+    candidates = set(word_scores) | {faq_id for faq_id, _ in channel.search(question, top_k)}
+    
+    missing = candidates - set(word_scores)
+    if missing:
+        if index is None:
+            index = get_faq_index()
+        word_scores.update(index.score_faqs(missing, user_vec, user_norm))
+    char_scores = channel.score_faqs(question, candidates)
+    
+    blended = [
+        (faq_id, (1 - weight) * word_scores.get(faq_id, 0.0) + weight * char_scores.get(faq_id, 0.0))
+        for faq_id in candidates
+    ]
+    blended.sort(key=lambda item: (-item[1], item[0]))
+    return blended[:top_k]
+
+
+# Moteurs qui remplacent les niveaux 1-2 par un top-k global
+ALTERNATIVE_ENGINES = {
+    'inverted': search_inverted_index,
+    'ann': search_ann_index,
+    'lsa': search_lsa_index,
+}
+
+
+def get_search_engine() -> str:
+    """Moteur configuré (`settings.CHATBOT_SEARCH_ENGINE`, défaut: 'cascade')."""
+    engine = getattr(settings, 'CHATBOT_SEARCH_ENGINE', 'cascade')
+    if engine not in SEARCH_ENGINES:
+        print(f"[Similarity] ⚠️ Moteur inconnu '{engine}', utilisation de 'cascade'")
+        return 'cascade'
+    return engine
+
+
+# Structure de recherche propre à chaque moteur (chargée par warmup())
+ENGINE_LOADERS = {
+    'cascade': get_category_router,
+    'inverted': get_inverted_index,
+    'ann': get_ann_index,
+    'lsa': get_lsa_index,
+}
+
+
+def warmup() -> None:
+    """
+    Charger d'avance tout ce que la première question chargerait: artefacts
+    (vectorizer + index), normaliseur, structure du moteur configuré et
+    canal n-grammes.
+    """
+    index = get_search_index(train_if_missing=False)
+    get_normalizer()
+    ENGINE_LOADERS[get_search_engine()]()
+    get_char_channel()
+    print(f"[Similarity] 🔥 Préchauffage terminé ({len(index)} FAQs)")
 
 
 # ═══════════════════════════════════════════════════════════════════════
 # FONCTION PRINCIPALE
 # ═══════════════════════════════════════════════════════════════════════
 
-def find_best_faq(question: str, top_k: int = 3, min_score: float = 0.0) -> List[Dict]:
+def find_best_faq(question: str, top_k: int = 3, min_score: float = 0.0,
+                  engine: Optional[str] = None, client_id: Optional[str] = None) -> List[Dict]:
     """
     Fonction principale de recherche FAQ - Architecture simplifiée.
     
     Processus:
     0. NIVEAU 0: Règles conversationnelles (JSON)
-    1. NIVEAU 1: Catégories par popularité + cache
+    1. NIVEAU 1: Catégories routées par centroïdes + cache
     2. NIVEAU 2: Fallback global (si nécessaire)
     
+    Avec les moteurs 'inverted', 'ann' et 'lsa', les niveaux 1 et 2 sont
+    remplacés par un top-k global sur l'index inversé, l'index IVF ou les
+    plongements LSA.
+    
+    Canal n-grammes (settings.CHATBOT_CHAR_NGRAMS): une question sans aucun
+    mot connu est cherchée par n-grammes de caractères avant de répondre
+    « Je n'ai pas compris »; en mode 'blend', les scores des deux canaux
+    sont mélangés.
+    
     Args:
         question (str): Question de l'utilisateur
         top_k (int): Nombre de résultats à retourner (défaut: 3)
         min_score (float): Score minimum pour inclure un résultat (défaut: 0.0)
+        engine (str): 'cascade', 'inverted', 'ann' ou 'lsa' (défaut: settings.CHATBOT_SEARCH_ENGINE)
+        client_id (str): Identifiant de la conversation pour l'affinité de
+            catégories du niveau 1 (défaut: aucune affinité)
     
     Returns:
-        List[Dict]: Liste de {'faq': FAQ, 'score': float}
+        List[Dict]: Liste de {'faq': FAQ, 'score': float}; `'affinity': True`
+        si le résultat vient de l'affinité de la conversation (à ne pas
+        partager entre clients)
     """
+    engine = engine or get_search_engine()
+    
+    # Nouvelle génération d'artefacts publiée ? (un simple os.stat)
+    reload_artifacts_if_changed()
+    
     print("=" * 70)
     print(f"[Similarity] 🚀 RECHERCHE - '{question[:50]}...'")
     print("=" * 70)
@@ -417,17 +556,7 @@ def find_best_faq(question: str, top_k: int = 3, min_score: float = 0.0) -> List
     if direct_response:
         print("[Similarity L0] ✅ RÉPONSE DIRECTE")
         print("=" * 70)
-        
-        # FAQ virtuelle pour compatibilité
-        virtual_faq = type('VirtualFAQ', (), {
-            'id': 0,
-            'question': question,
-            'answer': direct_response,
-            'category': type('Category', (), {'name': 'conversationnel'})(),
-            'popularity': 999
-        })()
-        
-        return [{'faq': virtual_faq, 'score': 1.0}]
+        return [direct_response_result(question, direct_response)]
     
     print("[Similarity L0] ⚠️ Aucune règle ne correspond")
     
@@ -435,44 +564,176 @@ def find_best_faq(question: str, top_k: int = 3, min_score: float = 0.0) -> List
     # VECTORISATION
     # ═══════════════════════════════════════════════════════════════════
     print("[Similarity] 🔢 Vectorisation...")
-    user_vec, user_norm = compute_tfidf_vector(question)
+    # Index lu UNE fois: vectorizer et index de la même génération pour toute la requête
+    index = get_search_index()
+    user_vec, user_norm = compute_tfidf_vector(question, index.vectorizer)
+    
+    results = search_vectorized(question, user_vec, user_norm, top_k, min_score,
+                                engine=engine, client_id=client_id, index=index)
+    print("=" * 70)
+    return results
+
+
+def search_vectorized(question: str, user_vec: np.ndarray, user_norm: float,
+                      top_k: int = 3, min_score: float = 0.0,
+                      engine: Optional[str] = None, client_id: Optional[str] = None,
+                      index: Optional[FAQIndex] = None,
+                      global_scored: Optional[List[Tuple[int, float]]] = None) -> List[Dict]:
+    """
+    Recherche d'une question déjà vectorisée: niveaux 1-2 (ou moteur
+    alternatif), puis canal n-grammes. Parcours commun à `find_best_faq`
+    et `find_best_faq_batch`.
+    
+    Args:
+        question (str): Question de l'utilisateur
+        user_vec: Vecteur TF-IDF de la question
+        user_norm: Norme du vecteur
+        top_k (int): Nombre de résultats
+        min_score (float): Score minimum pour inclure un résultat
+        engine (str): Moteur (défaut: settings.CHATBOT_SEARCH_ENGINE)
+        client_id (str): Identifiant de la conversation (affinité du niveau 1)
+        index (FAQIndex): Index de la requête, avec son vectorizer (défaut: index du processus)
+        global_scored: Top-k global déjà calculé (niveau 2 d'une recherche par lot)
+    
+    Returns:
+        List[Dict]: même format que `find_best_faq`
+    """
+    engine = engine or get_search_engine()
+    if index is None:
+        index = get_faq_index()
     
     if user_norm == 0:
         print("[Similarity] ⚠️ Vecteur nul (mots inconnus)")
-        print("=" * 70)
-        
-        virtual_faq = type('VirtualFAQ', (), {
-            'id': 0,
-            'question': question,
-            'answer': "Je n'ai pas compris votre question. Pouvez-vous la reformuler avec plus de détails ?",
-            'category': type('Category', (), {'name': 'système'})(),
-            'popularity': 0
-        })()
         
-        return [{'faq': virtual_faq, 'score': 0.0}]
-    
-    # ═══════════════════════════════════════════════════════════════════
-    # NIVEAU 1: CATÉGORIES PAR POPULARITÉ + CACHE
-    # ═══════════════════════════════════════════════════════════════════
-    results = search_by_popularity_with_cache(user_vec, user_norm, top_k)
-    
-    if results:
-        print("[Similarity] ✅ TROUVÉ AU NIVEAU 1")
-        print("=" * 70)
+        # Fautes de frappe: le canal n-grammes peut encore reconnaître la question
+        results = [{'faq': faq, 'score': s} for faq, s in attach_faqs(search_char_ngrams(question, top_k))]
+        if not results:
+            return [not_understood_result(question)]
         return [r for r in results if r['score'] >= min_score]
     
+    if engine in ALTERNATIVE_ENGINES:
+        # ═══════════════════════════════════════════════════════════════
+        # MOTEURS ALTERNATIFS: INDEX INVERSÉ / IVF / LSA
+        # ═══════════════════════════════════════════════════════════════
+        results = ALTERNATIVE_ENGINES[engine](user_vec, user_norm, top_k, index=index)
+    else:
+        # ═══════════════════════════════════════════════════════════════
+        # NIVEAU 1: ROUTAGE PAR CATÉGORIES + CACHE
+        # ═══════════════════════════════════════════════════════════════
+        results = search_by_category_routing(user_vec, user_norm, top_k, client_id=client_id, index=index)
+        
+        if results:
+            print("[Similarity] ✅ TROUVÉ AU NIVEAU 1")
+        else:
+            # ═══════════════════════════════════════════════════════════
+            # NIVEAU 2: FALLBACK GLOBAL
+            # ═══════════════════════════════════════════════════════════
+            print("[Similarity] ⚡ NIVEAU 2 (Fallback)...")
+            results = search_fallback_global(user_vec, user_norm, top_k, index=index, scored=global_scored)
+    
     # ═══════════════════════════════════════════════════════════════════
-    # NIVEAU 2: FALLBACK GLOBAL
+    # MÉLANGE AVEC LE CANAL N-GRAMMES (mode 'blend')
     # ═══════════════════════════════════════════════════════════════════
-    print("[Similarity] ⚡ NIVEAU 2 (Fallback)...")
-    results = search_fallback_global(user_vec, user_norm, top_k)
+    if get_char_ngram_mode() == 'blend':
+        steered = any(r.get('affinity') for r in results)
+        scored = blend_char_scores(question, user_vec, user_norm,
+                                   [(r['faq'].id, r['score']) for r in results], top_k, index=index)
+        results = [{'faq': faq, 'score': s, 'affinity': steered} for faq, s in attach_faqs(scored)]
     
     print("[Similarity] ✅ RECHERCHE TERMINÉE")
-    print("=" * 70)
     
     return [r for r in results if r['score'] >= min_score]
 
 
+def find_best_faq_batch(questions: List[str], top_k: int = 3, min_score: float = 0.0,
+                        engine: Optional[str] = None) -> List[List[Dict]]:
+    """
+    Recherche FAQ pour plusieurs questions à la fois.
+    
+    Chaque question suit le même parcours que `find_best_faq` (sans
+    affinité de conversation): mêmes résultats, donc mêmes entrées du cache
+    partagé des réponses. Seuls les calculs communs sont groupés:
+    0. NIVEAU 0: Règles conversationnelles, question par question
+    1. Vectorisation des questions restantes en UN seul transform
+    2. Moteur 'cascade': top-k global (niveau 2) de tout le lot en UN
+       produit matriciel, utilisé par les questions que le niveau 1 ne
+       résout pas
+    3. Niveaux 1-2 (ou moteur alternatif) et canal n-grammes, question
+       par question (`search_vectorized`)
+    
+    Args:
+        questions (List[str]): Questions des utilisateurs
+        top_k (int): Nombre de résultats par question (défaut: 3)
+        min_score (float): Score minimum pour inclure un résultat (défaut: 0.0)
+        engine (str): 'cascade', 'inverted', 'ann' ou 'lsa' (défaut: settings.CHATBOT_SEARCH_ENGINE)
+    
+    Returns:
+        List[List[Dict]]: Pour chaque question, liste de {'faq': FAQ, 'score': float}
+    """
+    engine = engine or get_search_engine()
+    reload_artifacts_if_changed()
+    
+    print(f"[Similarity] 🚀 RECHERCHE PAR LOT - {len(questions)} questions")
+    
+    results: List[List[Dict]] = [[] for _ in questions]
+    pending = []
+    
+    for position, question in enumerate(questions):
+        direct_response = match_conversational_rule(question)
+        if direct_response:
+            results[position] = [direct_response_result(question, direct_response)]
+        else:
+            pending.append(position)
+    
+    if not pending:
+        return results
+    
+    # Index lu UNE fois: vectorizer et index de la même génération pour tout le lot
+    index = get_search_index()
+    user_matrix, user_norms = compute_tfidf_matrix([questions[p] for p in pending], index.vectorizer)
+    
+    # Niveau 2 de la cascade pour tout le lot: un produit matrice creuse × matrice creuse
+    if engine in ALTERNATIVE_ENGINES:
+        global_scored = [None] * len(pending)
+    else:
+        global_scored = index.search_many(user_matrix, user_norms, top_k)
+    
+    for i, position in enumerate(pending):
+        results[position] = search_vectorized(
+            questions[position], user_matrix[i].toarray().ravel(), float(user_norms[i]),
+            top_k, min_score, engine=engine, index=index, global_scored=global_scored[i],
+        )
+    
+    print(f"[Similarity] ✅ LOT TERMINÉ ({len(pending)} questions vectorisées)")
+    return results
+
+
+def direct_response_result(question: str, response: str) -> Dict:
+    """Résultat d'une règle conversationnelle (FAQ virtuelle pour compatibilité)."""
+    virtual_faq = type('VirtualFAQ', (), {
+        'id': 0,
+        'question': question,
+        'answer': response,
+        'category': type('Category', (), {'name': 'conversationnel'})(),
+        'popularity': 999
+    })()
+    
+    return {'faq': virtual_faq, 'score': 1.0}
+
+
+def not_understood_result(question: str) -> Dict:
+    """Résultat d'une question sans aucun mot connu (FAQ virtuelle)."""
+    virtual_faq = type('VirtualFAQ', (), {
+        'id': 0,
+        'question': question,
+        'answer': "Je n'ai pas compris votre question. Pouvez-vous la reformuler avec plus de détails ?",
+        'category': type('Category', (), {'name': 'système'})(),
+        'popularity': 0
+    })()
+    
+    return {'faq': virtual_faq, 'score': 0.0}
+
+
 # ═══════════════════════════════════════════════════════════════════════
 # COMPATIBILITÉ
 # ═══════════════════════════════════════════════════════════════════════
@@ -0,0 +1,348 @@
+"""
+Racinisation française en Python pur (algorithme Snowball « french »).
+
+Aucune dépendance ni modèle à charger: les tables de suffixes sont
+compilées une fois à l'import, une racinisation coûte quelques
+microsecondes. inscription / inscriptions / inscrire / inscrit ont des
+racines proches ("inscript", "inscrir", "inscrit"); les formes fléchies
+d'un même mot (pluriels, conjugaisons) se confondent.
+
+Référence: https://snowballstem.org/algorithms/french/stemmer.html
+
+Fonctions principales :
+- `french_stem(word)` : racine d'un mot en minuscules (accents conservés en entrée).
+"""
+
+from typing import Iterable, Optional, Tuple
+
+
+VOWELS = frozenset('aeiouyâàëéêèïîôûù')
+
+
+def _suffixes(words: str) -> Tuple[str, ...]:
+    """Suffixes triés du plus long au plus court (recherche du plus long suffixe)."""
+    return tuple(sorted(set(words.split()), key=len, reverse=True))
+
+
+def _longest_suffix(word: str, suffixes: Iterable[str]) -> Optional[str]:
+    for suffix in suffixes:
+        if word.endswith(suffix):
+            return suffix
+    return None
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# TABLES DE SUFFIXES (compilées à l'import)
+# ═══════════════════════════════════════════════════════════════════════
+
+STEP1_SUFFIXES = _suffixes("""
+ance iqUe isme able iste eux ances iqUes ismes ables istes
+atrice ateur ation atrices ateurs ations
+logie logies
+usion ution usions utions
+ence ences
+ement ements
+ité ités
+if ive ifs ives
+eaux
+aux
+euse euses
+issement issements
+amment
+emment
+ment ments
+""")
+
+STEP2A_SUFFIXES = _suffixes("""
+îmes ît îtes i ie ies ir ira irai iraIent irais irait iras irent irez iriez
+irions irons iront is issaIent issais issait issant issante issantes issants
+isse issent isses issez issiez issions issons it
+""")
+
+STEP2B_ER_SUFFIXES = _suffixes("""
+é ée ées és èrent er era erai eraIent erais erait eras erez eriez erions
+erons eront ez iez
+""")
+
+STEP2B_A_SUFFIXES = _suffixes("""
+âmes ât âtes a ai aIent ais ait ant ante antes ants as asse assent asses
+assiez assions
+""")
+
+# Étape 2b: le plus long suffixe est cherché dans les trois listes à la fois
+STEP2B_SUFFIXES = _suffixes(' '.join(('ions',) + STEP2B_ER_SUFFIXES + STEP2B_A_SUFFIXES))
+
+STEP4_SUFFIXES = _suffixes("ion ier ière Ier Ière e ë")
+
+UNDOUBLE_SUFFIXES = ('enn', 'onn', 'ett', 'ell', 'eill')
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# RÉGIONS RV / R1 / R2
+# ═══════════════════════════════════════════════════════════════════════
+
+def _mark_vowels(word: str) -> str:
+    """u/i entre deux voyelles, y contre une voyelle et u après q passent en majuscules."""
+    chars = list(word)
+    for i, char in enumerate(chars):
+        before = chars[i - 1] if i > 0 else ''
+        after = chars[i + 1] if i + 1 < len(chars) else ''
+        if char in 'ui' and before in VOWELS and after in VOWELS and before and after:
+            chars[i] = char.upper()
+        elif char == 'y' and ((before and before in VOWELS) or (after and after in VOWELS)):
+            chars[i] = 'Y'
+        elif char == 'u' and before == 'q':
+            chars[i] = 'U'
+    return ''.join(chars)
+
+
+def _region_after_non_vowel(word: str, start: int) -> int:
+    """Début de la région après la première non-voyelle suivant une voyelle (à partir de `start`)."""
+    for i in range(max(start, 1), len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def _regions(word: str) -> Tuple[int, int, int]:
+    """Positions de début de RV, R1 et R2."""
+    if len(word) >= 2 and word[0] in VOWELS and word[1] in VOWELS:
+        rv = 3
+    elif word.startswith(('par', 'col', 'tap')):
+        rv = 3
+    else:
+        rv = len(word)
+        for i in range(1, len(word)):
+            if word[i] in VOWELS:
+                rv = i + 1
+                break
+    rv = min(rv, len(word))
+
+    r1 = _region_after_non_vowel(word, 1)
+    r2 = _region_after_non_vowel(word, r1 + 1) if r1 < len(word) else len(word)
+    return rv, r1, r2
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# ÉTAPES
+# ═══════════════════════════════════════════════════════════════════════
+
+def _step1(word: str, rv: int, r1: int, r2: int) -> Tuple[str, bool, bool]:
+    """
+    Suffixes standards.
+
+    Returns:
+        (mot, modifié, passer à l'étape 2a) — l'étape 2a suit aussi la
+        suppression de amment/emment/ment/ments
+    """
+    suffix = _longest_suffix(word, STEP1_SUFFIXES)
+    if suffix is None:
+        return word, False, True
+
+    start = len(word) - len(suffix)
+    stem = word[:start]
+
+    def in_r2(position: int) -> bool:
+        return position >= r2
+
+    def in_r1(position: int) -> bool:
+        return position >= r1
+
+    def in_rv(position: int) -> bool:
+        return position >= rv
+
+    if suffix in ('ance', 'iqUe', 'isme', 'able', 'iste', 'eux',
+                  'ances', 'iqUes', 'ismes', 'ables', 'istes'):
+        if in_r2(start):
+            return stem, True, False
+
+    elif suffix in ('atrice', 'ateur', 'ation', 'atrices', 'ateurs', 'ations'):
+        if in_r2(start):
+            if stem.endswith('ic'):
+                return (stem[:-2] if in_r2(start - 2) else stem[:-2] + 'iqU'), True, False
+            return stem, True, False
+
+    elif suffix in ('logie', 'logies'):
+        if in_r2(start):
+            return stem + 'log', True, False
+
+    elif suffix in ('usion', 'ution', 'usions', 'utions'):
+        if in_r2(start):
+            return stem + 'u', True, False
+
+    elif suffix in ('ence', 'ences'):
+        if in_r2(start):
+            return stem + 'ent', True, False
+
+    elif suffix in ('ement', 'ements'):
+        if in_rv(start):
+            if stem.endswith('iv') and in_r2(start - 2):
+                stem = stem[:-2]
+                if stem.endswith('at') and in_r2(start - 4):
+                    stem = stem[:-2]
+            elif stem.endswith('eus'):
+                if in_r2(start - 3):
+                    stem = stem[:-3]
+                elif in_r1(start - 3):
+                    stem = stem[:-3] + 'eux'
+            elif stem.endswith(('abl', 'iqU')):
+                if in_r2(start - 3):
+                    stem = stem[:-3]
+            elif stem.endswith(('ièr', 'Ièr')):
+                if in_rv(start - 3):
+                    stem = stem[:-3] + 'i'
+            return stem, True, False
+
+    elif suffix in ('ité', 'ités'):
+        if in_r2(start):
+            if stem.endswith('abil'):
+                stem = stem[:-4] if in_r2(start - 4) else stem[:-4] + 'abl'
+            elif stem.endswith('ic'):
+                stem = stem[:-2] if in_r2(start - 2) else stem[:-2] + 'iqU'
+            elif stem.endswith('iv'):
+                if in_r2(start - 2):
+                    stem = stem[:-2]
+            return stem, True, False
+
+    elif suffix in ('if', 'ive', 'ifs', 'ives'):
+        if in_r2(start):
+            if stem.endswith('at') and in_r2(start - 2):
+                stem = stem[:-2]
+                if stem.endswith('ic'):
+                    stem = stem[:-2] if in_r2(start - 4) else stem[:-2] + 'iqU'
+            return stem, True, False
+
+    elif suffix == 'eaux':
+        return stem + 'eau', True, False
+
+    elif suffix == 'aux':
+        if in_r1(start):
+            return stem + 'al', True, False
+
+    elif suffix in ('euse', 'euses'):
+        if in_r2(start):
+            return stem, True, False
+        if in_r1(start):
+            return stem + 'eux', True, False
+
+    elif suffix in ('issement', 'issements'):
+        if in_r1(start) and stem and stem[-1] not in VOWELS:
+            return stem, True, False
+
+    elif suffix == 'amment':
+        if in_rv(start):
+            return stem + 'ant', True, True
+
+    elif suffix == 'emment':
+        if in_rv(start):
+            return stem + 'ent', True, True
+
+    elif suffix in ('ment', 'ments'):
+        if stem and stem[-1] in VOWELS and in_rv(start - 1):
+            return stem, True, True
+
+    return word, False, True
+
+
+def _step2a(word: str, rv: int) -> Tuple[str, bool]:
+    """Suffixes verbaux en i (précédés d'une non-voyelle dans RV)."""
+    suffix = _longest_suffix(word[rv:], STEP2A_SUFFIXES)
+    if suffix is None:
+        return word, False
+    start = len(word) - len(suffix)
+    if start - 1 >= rv and word[start - 1] not in VOWELS:
+        return word[:start], True
+    return word, False
+
+
+def _step2b(word: str, rv: int, r2: int) -> Tuple[str, bool]:
+    """Autres suffixes verbaux (dans RV, plus long suffixe des trois listes)."""
+    suffix = _longest_suffix(word[rv:], STEP2B_SUFFIXES)
+    if suffix is None:
+        return word, False
+
+    stem = word[:-len(suffix)]
+    if suffix == 'ions':
+        if len(stem) >= r2:
+            return stem, True
+        return word, False
+
+    if suffix in STEP2B_A_SUFFIXES and stem.endswith('e') and len(stem) - 1 >= rv:
+        stem = stem[:-1]
+    return stem, True
+
+
+def _step4(word: str, rv: int, r2: int) -> str:
+    """Suffixes résiduels (si les étapes 1 et 2 n'ont rien changé)."""
+    if word.endswith('s') and len(word) >= 2 and word[-2] not in 'aiouès':
+        word = word[:-1]
+
+    suffix = _longest_suffix(word[rv:], STEP4_SUFFIXES)
+    if suffix is None:
+        return word
+    start = len(word) - len(suffix)
+    if suffix == 'ion':
+        if start >= r2 and start - 1 >= rv and word[start - 1] in 'st':
+            return word[:start]
+    elif suffix in ('ier', 'ière', 'Ier', 'Ière'):
+        return word[:start] + 'i'
+    elif suffix == 'e':
+        return word[:start]
+    elif suffix == 'ë' and word[:start].endswith('gu'):
+        return word[:start]
+    return word
+
+
+def _step5(word: str) -> str:
+    """Dédoublement final: enn, onn, ett, ell, eill → une lettre de moins."""
+    if word.endswith(UNDOUBLE_SUFFIXES):
+        return word[:-1]
+    return word
+
+
+def _step6(word: str) -> str:
+    """é/è suivi d'au moins une non-voyelle en fin de mot → e."""
+    i = len(word)
+    while i > 0 and word[i - 1] not in VOWELS:
+        i -= 1
+    if i < len(word) and i > 0 and word[i - 1] in 'éè':
+        return word[:i - 1] + 'e' + word[i:]
+    return word
+
+
+def french_stem(word: str) -> str:
+    """
+    Racine Snowball d'un mot français.
+
+    Args:
+        word (str): mot en minuscules (avec ses accents)
+
+    Returns:
+        str: racine en minuscules
+
+    >>> [french_stem(w) for w in ('inscriptions', 'inscrire', 'aimerions', 'aimions')]
+    ['inscript', 'inscrir', 'aim', 'aimion']
+    """
+    if not word:
+        return word
+
+    word = _mark_vowels(word)
+    rv, r1, r2 = _regions(word)
+
+    word, changed, try_verbs = _step1(word, rv, r1, r2)
+    if try_verbs:
+        word, verb_changed = _step2a(word, rv)
+        if not verb_changed:
+            word, verb_changed = _step2b(word, rv, r2)
+        changed = changed or verb_changed
+
+    if changed:
+        if word.endswith('Y'):
+            word = word[:-1] + 'i'
+        elif word.endswith('ç'):
+            word = word[:-1] + 'c'
+    else:
+        word = _step4(word, rv, r2)
+
+    word = _step6(_step5(word))
+    return word.lower()
@@ -1,20 +1,18 @@
 """
 Utilitaires généraux pour l'application chatbot.
 Point d'entrée unique pour les fonctions du cœur du chatbot.
+
+Façade paresseuse: importer ce module ne charge ni numpy, ni scipy, ni
+scikit-learn (ni spaCy). Les modules de vectorisation et de recherche sont
+importés au premier appel, ou d'avance par `warmup()`; `manage.py migrate`
+et les scripts d'import ne paient donc pas ces imports.
 """
 
-from chatbot.preprocessing import preprocess_text, TextPreprocessor
-from chatbot.vectorization import (
-    train_vectorizer,
-    compute_tfidf_vector,
-    compute_and_store_vectors,
-)
-from chatbot.similarity import (
-    compute_cosine_similarity,
-    find_best_faq,
-)
+from chatbot.preprocessing import canonicalize_query, normalize_query, preprocess_text, TextPreprocessor
 
 __all__ = [
+    'canonicalize_query',
+    'normalize_query',
     'preprocess_text',
     'TextPreprocessor',
     'train_vectorizer',
@@ -22,4 +20,42 @@ __all__ = [
     'compute_and_store_vectors',
     'compute_cosine_similarity',
     'find_best_faq',
+    'find_best_faq_batch',
+    'warmup',
 ]
+
+
+def train_vectorizer(corpus):
+    from chatbot.vectorization import train_vectorizer
+    return train_vectorizer(corpus)
+
+
+def compute_tfidf_vector(text):
+    from chatbot.vectorization import compute_tfidf_vector
+    return compute_tfidf_vector(text)
+
+
+def compute_and_store_vectors():
+    from chatbot.vectorization import compute_and_store_vectors
+    return compute_and_store_vectors()
+
+
+def compute_cosine_similarity(vec1, vec2):
+    from chatbot.similarity import compute_cosine_similarity
+    return compute_cosine_similarity(vec1, vec2)
+
+
+def find_best_faq(question, top_k=3, min_score=0.0, engine=None, client_id=None):
+    from chatbot.similarity import find_best_faq
+    return find_best_faq(question, top_k=top_k, min_score=min_score, engine=engine, client_id=client_id)
+
+
+def find_best_faq_batch(questions, top_k=3, min_score=0.0, engine=None):
+    from chatbot.similarity import find_best_faq_batch
+    return find_best_faq_batch(questions, top_k=top_k, min_score=min_score, engine=engine)
+
+
+def warmup():
+    """Importer les modules de recherche et charger artefacts, normaliseur et moteur."""
+    from chatbot.similarity import warmup
+    warmup()
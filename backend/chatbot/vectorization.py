@@ -3,10 +3,16 @@ Module de tokenisation et vecteur TF-IDF.
 VERSION OPTIMISÉE pour corpus de 15000+ FAQs avec 1GB RAM.
 
 Optimisations clés:
-1. Vectorizer sauvegardé sur disque (pickle) - chargé une seule fois
+1. Vectorizer publié dans un répertoire d'artefacts versionné (pickle) avec
+   l'index; chaque worker le recharge à chaud quand une nouvelle version
+   est publiée (voir `chatbot.artifacts`)
 2. Limite de features (max_features=3000) pour réduire dimensionnalité
 3. Traitement par batch lors de l'initialisation
 4. float32 au lieu de float64 partout
+5. Mode 'hashing' (settings.CHATBOT_VECTORIZER): espace de dimension fixe,
+   pas de vocabulaire à réapprendre, IDF tenu à jour document par document
+6. scikit-learn n'est importé qu'à l'entraînement ou au chargement du
+   vectorizer (pickle): importer ce module ne coûte que numpy/scipy
 
 Ce module fournit des utilitaires pour entraîner un `TfidfVectorizer`,
 calculer le vecteur TF-IDF d'une chaîne de caractères et stocker ces vecteurs
@@ -14,24 +20,241 @@ dans le modèle `FAQVector` lié aux instances `FAQ`.
 
 Fonctions principales :
 - `train_vectorizer(corpus)` : entraîne le vectorizer sur un corpus de questions.
+- `get_search_index()` : index du processus et son vectorizer (publiés ensemble).
 - `compute_tfidf_vector(text)` : calcule le vecteur TF-IDF et sa norme pour un texte.
+- `compute_tfidf_matrix(texts)` : vectorise plusieurs textes en un seul transform.
 - `compute_and_store_vectors()` : calcule et persiste les vecteurs pour toutes les FAQ.
+- `get_vectorizer_version(vec)` : empreinte du vectorizer (version de l'index).
+- `get_stored_version(vec)` : version inscrite dans les lignes `FAQVector`.
+- `update_faq_vector(faq)` : met à jour le vecteur d'UNE FAQ (création/édition/désactivation).
+- `publish_faq_changes(faq_ids)` : republie les artefacts avec les FAQs modifiées, sans tout relire.
+- `reload_artifacts_if_changed()` : bascule à chaud sur les derniers artefacts publiés.
+- `compute_corpus_fingerprint()` : empreinte du corpus (ids, updated_at, is_active).
+- `HashingTfidfVectorizer` : TF-IDF haché à dimension fixe et DF incrémentaux.
 """
 
-from sklearn.feature_extraction.text import TfidfVectorizer
+import copy
+import hashlib
+import json
+import threading
 import numpy as np
 import pickle
-from pathlib import Path
+import scipy.sparse as sp
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Q, Sum
 from faq.models import FAQ, FAQVector
+from chatbot.answer_cache import bump_corpus_generation
+from chatbot.ann import IVFIndex
+from chatbot.artifacts import (
+    artifact_generation,
+    current_artifact_dir,
+    publication_lock,
+    publish_artifacts,
+)
+from chatbot.lsa import DEFAULT_LSA_COMPONENTS, LSAIndex
+from chatbot.ngrams import (
+    CharNgramChannel,
+    get_char_ngram_budget,
+    get_char_ngram_mode,
+    patch_char_channel,
+    remove_from_char_channel,
+)
+from chatbot.index import (
+    FAQIndex,
+    get_faq_index,
+    install_faq_index,
+    pack_sparse_vector,
+    update_faq_index,
+)
+from chatbot.preprocessing import (
+    canonical_signature,
+    normalize_query,
+    normalizer_signature,
+    prime_normalizer,
+)
 
-# Chemin pour sauvegarder le vectorizer entraîné
-VECTORIZER_PATH = Path('/tmp/tfidf_vectorizer.pkl')
+# Nom du fichier du vectorizer dans un répertoire d'artefacts
+VECTORIZER_FILE = 'vectorizer.pkl'
 
-# Vectorizer TF-IDF global (chargé depuis le disque)
-vectorizer = None
+# Nombre de FAQs vectorisées et écrites par transaction
+VECTOR_BATCH_SIZE = 1000
 
+# Empreinte du corpus ayant servi à construire les artefacts
+FINGERPRINT_FILE = 'fingerprint.json'
 
-def save_vectorizer(vec, path=VECTORIZER_PATH):
+# Le vectorizer courant n'est pas une variable globale: c'est un attribut de
+# l'index du processus (`FAQIndex.vectorizer`), publié avec lui d'un bloc
+
+# Génération d'artefacts actuellement chargée par ce processus
+_loaded_generation = None
+_reload_lock = threading.Lock()
+
+# Dérive du vocabulaire: réentraînement complet si le taux de mots hors
+# vocabulaire des FAQs créées/modifiées depuis le dernier entraînement dépasse
+# le seuil (évalué seulement après DRIFT_MIN_TOKENS tokens observés)
+DRIFT_OOV_THRESHOLD = 0.15
+DRIFT_MIN_TOKENS = 200
+
+_drift_stats = {'tokens': 0, 'oov': 0}
+
+# Publications demandées en arrière-plan: réentraînement complet (dérive) ou
+# republication des FAQs modifiées (mises à jour incrémentales).
+# Un seul thread publie à la fois; les demandes reçues entre-temps sont
+# regroupées en une seule publication suivante.
+_pending_publication = {'retrain': False, 'faq_ids': set()}
+_pending_lock = threading.Lock()
+_publish_lock = threading.Lock()
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# MODE HACHAGE (sans vocabulaire)
+# ═══════════════════════════════════════════════════════════════════════
+
+VECTORIZER_MODES = ('tfidf', 'hashing')
+
+# Dimension fixe de l'espace haché (collisions négligeables pour ~20k mots)
+HASHING_N_FEATURES = 2 ** 18
+
+
+class HashingTfidfVectorizer:
+    """
+    TF-IDF sans vocabulaire appris.
+    
+    Les termes sont hachés dans un espace de dimension fixe: deux processus
+    produisent toujours les mêmes colonnes, sans fit préalable. L'IDF est
+    dérivé de compteurs de fréquence documentaire (DF) mis à jour à chaque
+    FAQ ajoutée ou retirée.
+    
+    Une instance installée (celle d'un index) n'est jamais modifiée: les
+    requêtes en cours la lisent sans verrou. Une mise à jour travaille sur
+    une copie (`updated`) et repondère l'index avec le nouvel IDF avant de
+    les installer ensemble (voir `update_faq_vector`). Les lignes `FAQVector`
+    stockent les TF hachés, indépendants de l'IDF (`stored_vector_version`).
+    """
+
+    def __init__(self, n_features=HASHING_N_FEATURES):
+        from sklearn.feature_extraction.text import HashingVectorizer  # import coûteux: au premier usage
+
+        self.n_features = n_features
+        self.hasher = HashingVectorizer(
+            n_features=n_features,
+            preprocessor=normalize_query,
+            alternate_sign=False,
+            norm=None,
+            dtype=np.float32,
+        )
+        self.doc_freq = np.zeros(n_features, dtype=np.int64)
+        self.n_docs = 0
+        self._idf = None
+        self._version = None
+
+    @property
+    def version(self):
+        """Dimension + empreinte des DF: change dès que l'IDF change."""
+        if self._version is None:
+            digest = hashlib.sha1(str(self.n_docs).encode())
+            digest.update(self.doc_freq.tobytes())
+            self._version = f"hashing-{self.n_features}-{digest.hexdigest()[:8]}"
+        return self._version
+
+    @property
+    def idf_(self):
+        """IDF lissé (même formule que TfidfVectorizer), recalculé si les DF ont changé."""
+        if self._idf is None:
+            self._idf = (np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1).astype(np.float32)
+        return self._idf
+
+    def hash(self, texts):
+        """Fréquences de termes hachées (CSR, indices triés)."""
+        texts = list(texts)
+        if not texts:
+            return sp.csr_matrix((0, self.n_features), dtype=np.float32)
+        tf = self.hasher.transform(texts).tocsr()
+        tf.sort_indices()
+        return tf
+
+    def count_documents(self, indices, n_docs=1):
+        """Ajouter aux DF les colonnes non nulles de `n_docs` documents (instance non installée)."""
+        self.doc_freq += np.bincount(np.asarray(indices, dtype=np.int64), minlength=self.n_features)
+        self.n_docs += n_docs
+        self._idf = self._version = None
+
+    def forget_documents(self, indices, n_docs=1):
+        """Retirer des DF les colonnes non nulles de `n_docs` documents (instance non installée)."""
+        self.doc_freq -= np.bincount(np.asarray(indices, dtype=np.int64), minlength=self.n_features)
+        np.maximum(self.doc_freq, 0, out=self.doc_freq)
+        self.n_docs = max(self.n_docs - n_docs, 0)
+        self._idf = self._version = None
+
+    def fit(self, corpus, batch_size=1000):
+        """Compter les DF d'un corpus (un passage linéaire, par batch)."""
+        self.doc_freq[:] = 0
+        self.n_docs = 0
+        corpus = list(corpus)
+        for i in range(0, len(corpus), batch_size):
+            tf = self.hash(corpus[i:i + batch_size])
+            self.count_documents(tf.indices, n_docs=tf.shape[0])
+        return self
+
+    def updated(self, forgotten=(), n_forgotten=0, counted=(), n_counted=0):
+        """
+        Copie du vectorizer dont les DF perdent `n_forgotten` documents
+        (colonnes non nulles `forgotten`) et gagnent `n_counted` documents
+        (colonnes `counted`), l'original reste inchangé.
+        """
+        vec = copy.copy(self)
+        vec.doc_freq = self.doc_freq.copy()
+        vec._idf = vec._version = None
+        if n_forgotten:
+            vec.forget_documents(forgotten, n_docs=n_forgotten)
+        if n_counted:
+            vec.count_documents(counted, n_docs=n_counted)
+        return vec
+
+    def weighted(self, tf):
+        """Lignes TF-IDF (CSR float32) de fréquences hachées `tf`, avec l'IDF courant."""
+        data = np.asarray(tf.data, dtype=np.float32) * self.idf_[tf.indices]
+        return sp.csr_matrix((data, tf.indices, tf.indptr), shape=tf.shape, dtype=np.float32)
+
+    def term_frequencies(self, matrix):
+        """
+        Fréquences hachées des lignes TF-IDF `matrix` calculées avec ce
+        vectorizer (des comptes entiers: la division par l'IDF est exacte
+        après arrondi).
+        """
+        data = np.rint(np.asarray(matrix.data, dtype=np.float64) / self.idf_[matrix.indices])
+        return sp.csr_matrix((data.astype(np.float32), matrix.indices, matrix.indptr),
+                             shape=matrix.shape, dtype=np.float32)
+
+    def transform(self, texts):
+        """Vecteurs TF-IDF (CSR float32) avec l'IDF courant."""
+        return self.weighted(self.hash(texts))
+
+    def build_analyzer(self):
+        return self.hasher.build_analyzer()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_idf'] = state['_version'] = None
+        return state
+
+    def __setstate__(self, state):
+        # Vectorizers publiés avant l'empreinte des DF
+        state.setdefault('_version', None)
+        self.__dict__.update(state)
+
+
+def get_vectorizer_mode():
+    """Mode configuré (`settings.CHATBOT_VECTORIZER`, défaut: 'tfidf')."""
+    mode = getattr(settings, 'CHATBOT_VECTORIZER', 'tfidf')
+    if mode not in VECTORIZER_MODES:
+        print(f"[Vectorization] ⚠️ Mode inconnu '{mode}', utilisation de 'tfidf'")
+        return 'tfidf'
+    return mode
+
+
+def save_vectorizer(vec, path):
     """
     Sauvegarder le vectorizer entraîné sur disque.
     
@@ -39,32 +262,33 @@ def save_vectorizer(vec, path=VECTORIZER_PATH):
         vec (TfidfVectorizer): Vectorizer entraîné
         path (Path): Chemin de sauvegarde
     """
-    try:
-        with open(path, 'wb') as f:
-            pickle.dump(vec, f)
-        print(f"[Vectorization] Vectorizer sauvegardé: {path}")
-    except Exception as e:
-        print(f"[Vectorization] Erreur sauvegarde: {e}")
+    with open(path, 'wb') as f:
+        pickle.dump(vec, f)
+    print(f"[Vectorization] Vectorizer sauvegardé: {path}")
 
 
-def load_vectorizer(path=VECTORIZER_PATH):
+def load_vectorizer(path=None):
     """
-    Charger le vectorizer depuis le disque.
+    Charger un vectorizer depuis le disque.
     
     Args:
-        path (Path): Chemin du fichier pickle
+        path (Path): Chemin du fichier pickle (défaut: artefacts courants)
     
     Returns:
         TfidfVectorizer ou None si fichier n'existe pas
     """
-    global vectorizer
+    if path is None:
+        directory = current_artifact_dir()
+        if directory is None:
+            return None
+        path = directory / VECTORIZER_FILE
     
     if path.exists():
         try:
             with open(path, 'rb') as f:
-                vectorizer = pickle.load(f)
+                vec = pickle.load(f)
             print(f"[Vectorization] Vectorizer chargé depuis: {path}")
-            return vectorizer
+            return vec
         except Exception as e:
             print(f"[Vectorization] Erreur chargement: {e}")
             return None
@@ -72,9 +296,205 @@ def load_vectorizer(path=VECTORIZER_PATH):
     return None
 
 
+def write_artifacts(vec, index, directory, fingerprint='', char_channel=None,
+                    ann_index=None, lsa_index=None):
+    """
+    Écrire vectorizer, vocabulaire et snapshot de l'index dans `directory`
+    (plus l'index IVF ou LSA quand le moteur de recherche est 'ann' ou 'lsa').
+    
+    Args:
+        vec (TfidfVectorizer): Vectorizer entraîné
+        index (FAQIndex): Index correspondant
+        directory (Path): Répertoire d'artefacts en cours de construction
+        fingerprint (str): Empreinte du corpus vectorisé
+        char_channel (CharNgramChannel): Canal n-grammes de caractères (optionnel)
+        ann_index (IVFIndex): Index IVF à jour (défaut: k-means sur `index`)
+        lsa_index (LSAIndex): Index LSA à jour (défaut: SVD sur `index`)
+    """
+    save_vectorizer(vec, directory / VECTORIZER_FILE)
+    if hasattr(vec, 'vocabulary_'):
+        with open(directory / 'vocabulary.json', 'w', encoding='utf-8') as f:
+            json.dump({term: int(idx) for term, idx in vec.vocabulary_.items()}, f, ensure_ascii=False)
+    with open(directory / FINGERPRINT_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'fingerprint': fingerprint}, f)
+    index.save_snapshot(directory)
+    if char_channel is not None:
+        char_channel.save(directory)
+    engine = getattr(settings, 'CHATBOT_SEARCH_ENGINE', 'cascade')
+    if engine == 'ann':
+        if ann_index is None:
+            ann_index = IVFIndex.build(index, getattr(settings, 'CHATBOT_ANN_CLUSTERS', 0) or None)
+        ann_index.save(directory)
+    elif engine == 'lsa':
+        if lsa_index is None:
+            lsa_index = LSAIndex.build(index, getattr(settings, 'CHATBOT_LSA_COMPONENTS', DEFAULT_LSA_COMPONENTS))
+        lsa_index.save(directory)
+
+
+def compute_corpus_fingerprint():
+    """
+    Empreinte du corpus FAQ en UNE requête d'agrégat.
+    
+    Combine nombre/somme/max des ids, dernière modification et ids actifs:
+    toute création, suppression, édition (`updated_at`) ou (dés)activation
+    change l'empreinte, tout comme un changement de mode de vectorisation,
+    de règles de canonicalisation ou de structure de recherche publiée
+    (moteurs 'ann' / 'lsa' et leurs paramètres de construction).
+    
+    Returns:
+        str: Hash SHA-1 (16 caractères) des agrégats
+    """
+    active = Q(is_active=True)
+    stats = FAQ.objects.aggregate(
+        count=Count('id'),
+        id_sum=Sum('id'),
+        id_max=Max('id'),
+        last_update=Max('updated_at'),
+        active_count=Count('id', filter=active),
+        active_id_sum=Sum('id', filter=active),
+    )
+    # Changer de mode de vectorisation ou de canonicalisation impose aussi une reconstruction
+    # (le mode hachage stocke des TF en base: format distinct des anciennes lignes TF-IDF)
+    mode = get_vectorizer_mode()
+    stats['vectorizer'] = 'hashing-tf' if mode == 'hashing' else mode
+    stats['char_ngrams'] = get_char_ngram_budget() if get_char_ngram_mode() != 'off' else 0
+    stats['canonical'] = canonical_signature()
+    stats['preprocessor'] = normalizer_signature()
+    # Index IVF / LSA publiés avec les artefacts: changer de moteur ou de paramètres
+    # les reconstruit au démarrage, pas sur la 1re requête de chaque worker
+    engine = getattr(settings, 'CHATBOT_SEARCH_ENGINE', 'cascade')
+    if engine == 'ann':
+        stats['engine'] = f"ann-{getattr(settings, 'CHATBOT_ANN_CLUSTERS', 0)}"
+    elif engine == 'lsa':
+        stats['engine'] = f"lsa-{getattr(settings, 'CHATBOT_LSA_COMPONENTS', DEFAULT_LSA_COMPONENTS)}"
+    payload = json.dumps(stats, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def stored_corpus_fingerprint():
+    """
+    Empreinte du corpus enregistrée avec les artefacts courants.
+    
+    Returns:
+        str ou None si aucun artefact publié
+    """
+    directory = current_artifact_dir()
+    if directory is None:
+        return None
+    try:
+        with open(directory / FINGERPRINT_FILE, encoding='utf-8') as f:
+            return json.load(f).get('fingerprint') or None
+    except (OSError, ValueError):
+        return None
+
+
+def reload_artifacts_if_changed():
+    """
+    Basculer à chaud sur les derniers artefacts publiés (vectorizer + index).
+    
+    Appelé à chaque recherche: le coût normal est un seul `os.stat` du
+    pointeur CURRENT. Le vectorizer et l'index sont chargés AVANT d'être
+    installés, puis installés ensemble (l'index porte son vectorizer): les
+    requêtes en cours ne voient jamais d'état intermédiaire.
+    
+    Returns:
+        bool: True si une nouvelle génération a été chargée
+    """
+    global _loaded_generation
+    
+    generation = artifact_generation()
+    if generation is None or generation == _loaded_generation:
+        return False
+    
+    with _reload_lock:
+        if generation == _loaded_generation:
+            return False
+        
+        directory = current_artifact_dir()
+        if directory is None:
+            return False
+        
+        vec = load_vectorizer(directory / VECTORIZER_FILE)
+        if vec is None:
+            return False
+        
+        try:
+            index = FAQIndex.load_snapshot(directory, vectorizer=vec)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[Vectorization] ⚠️ Artefacts illisibles ({e}), version courante conservée")
+            return False
+        
+        install_faq_index(index)
+        _loaded_generation = generation
+    
+    print(f"[Vectorization] 🔄 Artefacts chargés à chaud: {directory.name} ({len(index)} FAQs)")
+    return True
+
+
+def get_vectorizer_version(vec):
+    """
+    Empreinte courte du vectorizer (vocabulaire + poids IDF).
+    
+    Deux vecteurs ne sont comparables que s'ils portent la même version.
+    En mode hachage, la version dépend de la dimension et des DF (IDF).
+    
+    Args:
+        vec (TfidfVectorizer | HashingTfidfVectorizer): Vectorizer entraîné
+    
+    Returns:
+        str: hash hexadécimal de 16 caractères (ou 'hashing-<dimension>-<empreinte des DF>')
+    """
+    if isinstance(vec, HashingTfidfVectorizer):
+        return vec.version
+    
+    digest = hashlib.sha1()
+    for term, idx in sorted(vec.vocabulary_.items()):
+        digest.update(f"{term}:{idx};".encode('utf-8'))
+    digest.update(np.asarray(vec.idf_, dtype=np.float32).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def get_stored_version(vec):
+    """
+    Version inscrite dans les lignes `FAQVector` calculées avec `vec`.
+    
+    En mode hachage les lignes stockent les TF hachés (voir
+    `vectorize_for_storage`), qui ne dépendent que de la dimension: une
+    mise à jour des DF ne rend aucune ligne en base obsolète.
+    
+    Args:
+        vec (TfidfVectorizer | HashingTfidfVectorizer): Vectorizer entraîné
+    
+    Returns:
+        str: `get_vectorizer_version(vec)` ou 'hashing-<dimension>-tf'
+    """
+    if isinstance(vec, HashingTfidfVectorizer):
+        return f"hashing-{vec.n_features}-tf"
+    return get_vectorizer_version(vec)
+
+
+def vectorize_for_storage(vec, texts):
+    """
+    Lignes à stocker dans `FAQVector`: TF hachés en mode hachage (l'IDF est
+    appliqué à la construction de l'index), vecteurs TF-IDF sinon.
+    
+    Returns:
+        scipy.sparse.csr_matrix: une ligne float32 par texte, indices triés
+    """
+    if isinstance(vec, HashingTfidfVectorizer):
+        return vec.hash(texts)
+    matrix = vec.transform(texts).tocsr().astype(np.float32)
+    matrix.sort_indices()
+    return matrix
+
+
 def train_vectorizer(corpus):
     """
-    Entraîner et mémoriser un `TfidfVectorizer` sur un corpus donné.
+    Entraîner un `TfidfVectorizer` sur un corpus donné.
+    
+    Le vectorizer retourné n'est PAS installé: le vectorizer courant continue
+    de servir les requêtes jusqu'à ce que l'appelant l'installe avec l'index
+    construit à partir de lui (voir `compute_and_store_vectors()`).
     
     OPTIMISATIONS:
     - max_features=5000 : Limite dimensionnalité (au lieu de 5000-10000)
@@ -88,11 +508,19 @@ def train_vectorizer(corpus):
     Returns:
         TfidfVectorizer: l'instance entraînée du vectorizer
     """
-    global vectorizer
+    # Lemmatisation éventuelle: tous les mots du corpus en lots (nlp.pipe)
+    prime_normalizer(corpus)
+    
+    if get_vectorizer_mode() == 'hashing':
+        # Pas de vocabulaire: un simple comptage des DF, linéaire
+        print(f"[Vectorization] Comptage des DF (hachage) sur {len(corpus)} questions...")
+        return HashingTfidfVectorizer().fit(corpus)
     
     # OPTIMISATION: Limiter le nombre de features pour réduire la dimensionnalité
     # 3000 features au lieu de tout le vocabulaire = -60% RAM
-    vectorizer = TfidfVectorizer(
+    from sklearn.feature_extraction.text import TfidfVectorizer  # import coûteux: au premier entraînement
+    vec = TfidfVectorizer(
+        preprocessor=normalize_query,  # forme canonique (clé de cache) ou lemmes
         norm=None,
         max_features=5000,  # LIMITE CRITIQUE !
         dtype=np.float32     # float32 au lieu de float64
@@ -100,16 +528,66 @@ def train_vectorizer(corpus):
     
     # Ajuster le vectorizer sur le corpus fourni
     print(f"[Vectorization] Entraînement sur {len(corpus)} questions...")
-    vectorizer.fit(corpus)
-    print(f"[Vectorization] Vocabulaire: {len(vectorizer.vocabulary_)} mots")
+    vec.fit(corpus)
+    _drift_stats['tokens'] = _drift_stats['oov'] = 0
+    print(f"[Vectorization] Vocabulaire: {len(vec.vocabulary_)} mots")
+    
+    # Le vectorizer est publié sur disque avec l'index par compute_and_store_vectors()
+    return vec
+
+
+def get_search_index(train_if_missing=True):
+    """
+    Retourner l'index du processus avec son vectorizer (`FAQIndex.vectorizer`).
+    
+    Une requête qui lit cet index UNE fois vectorise et score avec la même
+    génération, même si une bascule à chaud a lieu pendant la requête.
+    
+    Args:
+        train_if_missing (bool): réindexer le corpus si aucun vectorizer
+            n'est disponible (pas d'artefacts publiés)
     
-    # Sauvegarder sur disque pour réutilisation
-    save_vectorizer(vectorizer)
+    Returns:
+        FAQIndex: index dont `vectorizer` peut être None (si absent et
+        `train_if_missing=False`)
     
-    return vectorizer
+    Raises:
+        ValueError: si aucun vectorizer ni corpus n'est disponible.
+    """
+    reload_artifacts_if_changed()
+    index = get_faq_index()
+    
+    # Si toujours pas de vectorizer, réindexer (une seule fois): vectorizer et index ensemble
+    if index.vectorizer is None and train_if_missing:
+        with _publish_lock:
+            if get_faq_index().vectorizer is None:
+                print("[Vectorization] Vectorizer non trouvé, réindexation à la demande...")
+                compute_and_store_vectors()
+        index = get_faq_index()
+        if index.vectorizer is None:
+            raise ValueError("Vectorizer not trained and no FAQ corpus available.")
+    
+    return index
 
 
-def compute_tfidf_vector(text):
+def get_vectorizer(train_if_missing=True):
+    """
+    Retourner le vectorizer courant (celui de l'index du processus).
+    
+    Args:
+        train_if_missing (bool): réindexer le corpus si aucun vectorizer
+            n'est disponible
+    
+    Returns:
+        TfidfVectorizer ou None (si absent et `train_if_missing=False`)
+    
+    Raises:
+        ValueError: si aucun vectorizer ni corpus n'est disponible.
+    """
+    return get_search_index(train_if_missing).vectorizer
+
+
+def compute_tfidf_vector(text, vec=None):
     """
     Calculer le vecteur TF-IDF d'une chaîne de caractères et sa norme euclidienne.
     
@@ -118,6 +596,8 @@ def compute_tfidf_vector(text):
     
     Args:
         text (str): le texte à transformer en vecteur TF-IDF
+        vec: vectorizer à utiliser, celui de l'index qui sera scoré
+            (défaut: vectorizer courant)
 
     Returns:
         tuple[numpy.ndarray, float]: (vecteur numpy 1D float32, norme L2 du vecteur)
@@ -125,23 +605,12 @@ def compute_tfidf_vector(text):
     Raises:
         ValueError: si le `vectorizer` n'a pas encore été entraîné.
     """
-    global vectorizer
-    
     # Charger le vectorizer si pas encore fait
-    if vectorizer is None:
-        vectorizer = load_vectorizer()
-        
-        # Si toujours pas de vectorizer, essayer de l'entraîner
-        if vectorizer is None:
-            print("[Vectorization] Vectorizer non trouvé, entraînement à la demande...")
-            corpus = list(FAQ.objects.values_list('question', flat=True))
-            if corpus:
-                train_vectorizer(corpus)
-            else:
-                raise ValueError("Vectorizer not trained and no FAQ corpus available.")
+    if vec is None:
+        vec = get_vectorizer()
     
     # Transformer le texte en vecteur TF-IDF (format sparse → dense)
-    vector = vectorizer.transform([text]).toarray()[0]
+    vector = vec.transform([text]).toarray()[0]
     
     # Calculer la norme L2 (utile pour la similarité cosinus)
     norm = np.linalg.norm(vector)
@@ -149,22 +618,61 @@ def compute_tfidf_vector(text):
     return vector, norm
 
 
+def compute_tfidf_matrix(texts, vec=None):
+    """
+    Vectoriser plusieurs textes en UN seul appel à `transform`.
+    
+    Args:
+        texts (list[str]): textes à transformer
+        vec: vectorizer à utiliser (défaut: vectorizer courant)
+    
+    Returns:
+        tuple[scipy.sparse.csr_matrix, numpy.ndarray]: (matrice CSR float32
+        une ligne par texte, normes L2 float32)
+    """
+    if vec is None:
+        vec = get_vectorizer()
+    prime_normalizer(texts)
+    matrix = vec.transform(texts).tocsr().astype(np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()).astype(np.float32)
+    return matrix, norms
+
+
 def compute_and_store_vectors():
     """
     Construire un vectorizer à partir de toutes les questions de la base,
     puis calculer et sauvegarder le vecteur TF-IDF pour chaque FAQ.
     
-    OPTIMISATION: Traitement par batch de 1000 FAQs pour économiser RAM.
+    OPTIMISATION: Traitement par batch de VECTOR_BATCH_SIZE FAQs (pagination
+    par id, un transform et un upsert groupé par batch).
     
     Comportement:
     - Récupère le corpus (liste des questions) depuis le modèle `FAQ`.
     - Entraîne le `TfidfVectorizer` sur ce corpus avec max_features=3000.
-    - Pour chaque FAQ (par batch), calcule le vecteur et la norme, puis met à jour
-      ou crée une instance `FAQVector` liée.
+    - Pour chaque batch, calcule vecteurs et normes, puis crée ou met à jour
+      les `FAQVector` liés en un seul `bulk_create(update_conflicts=True)`.
+    - Reconstruit l'index résident (`chatbot.index`) et le canal n-grammes
+      (`chatbot.ngrams`), puis publie vectorizer + vocabulaire + snapshots +
+      empreinte du corpus dans un répertoire d'artefacts versionné.
+    
+    Seule opération qui réajuste tout (vocabulaire/IDF, n-grammes, k-means,
+    SVD): les sauvegardes de FAQs ne republient que leurs lignes
+    (`publish_faq_changes`).
     """
-    # Récupérer toutes les questions (itérable de chaînes)
+    # Verrou tenu de la lecture du corpus à la publication: une republication
+    # incrémentale d'un autre worker s'appliquera ensuite sur ces artefacts
+    with publication_lock():
+        _compute_and_store_vectors()
+
+
+def _compute_and_store_vectors():
+    """Corps de `compute_and_store_vectors()`, verrou de publication tenu."""
+    # Empreinte AVANT lecture: une modification concurrente forcera un rebuild
+    fingerprint = compute_corpus_fingerprint()
+    
+    # Récupérer toutes les questions (sans le tri par défaut du modèle, inutile ici)
     print("[Vectorization] Récupération du corpus...")
-    corpus = list(FAQ.objects.values_list("question", flat=True))
+    corpus = list(FAQ.objects.order_by().values_list("question", flat=True))
     
     if not corpus:
         print("[Vectorization] Aucune FAQ en base, skip")
@@ -173,38 +681,361 @@ def compute_and_store_vectors():
     total_faqs = len(corpus)
     print(f"[Vectorization] Corpus: {total_faqs} FAQs")
     
-    # Entraîner le vectorizer sur ce corpus
-    train_vectorizer(corpus)
+    # Entraîner un NOUVEAU vectorizer: le courant sert les requêtes jusqu'à l'installation
+    vec = train_vectorizer(corpus)
+    del corpus
     
-    # OPTIMISATION: Traiter par batch pour éviter de charger 15000 FAQs en RAM
-    batch_size = 1000
     vectors_created = 0
+    last_id = 0
     
-    for i in range(0, total_faqs, batch_size):
-        # Charger un batch de FAQs
-        faqs_batch = FAQ.objects.all()[i:i+batch_size]
+    # Pagination par clé (id > dernier id vu): pas d'OFFSET ni de tri coûteux
+    while True:
+        batch = list(
+            FAQ.objects.filter(id__gt=last_id)
+            .order_by('id')
+            .values_list('id', 'question')[:VECTOR_BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_id = batch[-1][0]
         
-        # Calculer les vecteurs pour ce batch
-        questions_batch = [faq.question for faq in faqs_batch]
-        vectors_batch = vectorizer.transform(questions_batch).toarray()
-        
-        # Sauvegarder les vecteurs
-        for idx, faq in enumerate(faqs_batch):
-            vector = vectors_batch[idx]
-            norm = np.linalg.norm(vector)
-            
-            # Convertir le vecteur en liste pour le stockage JSON-serializable
-            FAQVector.objects.update_or_create(
-                faq=faq,
-                defaults={
-                    "tfidf_vector": vector.tolist(),
-                    "norm": float(norm),
-                },
-            )
-            vectors_created += 1
+        faq_ids, questions = zip(*batch)
+        prime_normalizer(questions)
+        vectors_created += _store_vectors(vec, faq_ids, questions)
         
         # Afficher la progression
-        progress = min(i + batch_size, total_faqs)
-        print(f"[Vectorization] Progression: {progress}/{total_faqs} FAQs ({int(progress/total_faqs*100)}%)")
+        print(f"[Vectorization] Progression: {vectors_created}/{total_faqs} FAQs ({int(vectors_created/total_faqs*100)}%)")
     
     print(f"[Vectorization] ✅ {vectors_created} vecteurs calculés et stockés")
+    
+    # Construire l'index (sans l'installer) puis publier vectorizer + index
+    index = FAQIndex.from_database()
+    if isinstance(vec, HashingTfidfVectorizer):
+        index = index.with_matrix(vec.weighted(index.matrix))
+    index.version = get_vectorizer_version(vec)
+    char_channel = CharNgramChannel.build(get_char_ngram_budget()) if get_char_ngram_mode() != 'off' else None
+    _publish_and_install(vec, index, fingerprint, char_channel)
+
+
+def _store_vectors(vec, faq_ids, questions):
+    """
+    Vectoriser des FAQs et créer ou mettre à jour leurs `FAQVector`.
+    
+    Un seul transform (les vecteurs restent creux: jamais densifiés) et une
+    requête d'upsert, dans sa propre transaction.
+    
+    Returns:
+        int: nombre de lignes écrites
+    """
+    matrix = vectorize_for_storage(vec, questions)
+    version = get_stored_version(vec)
+    
+    # Stockage binaire creux (indices int32 + valeurs float32)
+    rows = []
+    for idx, faq_id in enumerate(faq_ids):
+        start, end = matrix.indptr[idx], matrix.indptr[idx + 1]
+        indices = matrix.indices[start:end]
+        values = matrix.data[start:end]
+        rows.append(FAQVector(
+            faq_id=faq_id,
+            sparse_vector=pack_sparse_vector(indices, values),
+            vectorizer_version=version,
+            norm=float(np.linalg.norm(values)),
+        ))
+    
+    with transaction.atomic():
+        FAQVector.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['faq'],
+            update_fields=['sparse_vector', 'vectorizer_version', 'norm'],
+        )
+    return len(rows)
+
+
+def publish_faq_changes(faq_ids):
+    """
+    Republier les artefacts courants avec les FAQs `faq_ids` relues en
+    base, SANS réentraîner ni relire tout le corpus.
+    
+    Les mises à jour incrémentales (`update_faq_vector`) ne modifient que
+    l'index du processus qui a traité la sauvegarde: cette publication les
+    rend visibles aux autres workers (bascule à chaud au prochain os.stat du
+    pointeur) et aux prochains démarrages. Lancée en arrière-plan par
+    `schedule_publication()`.
+    
+    Seules les FAQs modifiées sont lues et vectorisées, avec le vectorizer
+    publié (leurs `FAQVector` sont réécrits avec lui). Le canal n-grammes
+    garde son vectorizer, l'index IVF ses centroïdes et l'index LSA ses
+    composantes: les réajustements complets restent l'affaire de
+    `compute_and_store_vectors()`.
+    
+    Args:
+        faq_ids: ids des FAQs créées, modifiées, désactivées ou supprimées
+    """
+    faq_ids = set(faq_ids)
+    
+    # Verrou entre processus: chaque publication part de la précédente
+    with publication_lock():
+        # Empreinte AVANT lecture, comme compute_and_store_vectors()
+        fingerprint = compute_corpus_fingerprint()
+        directory = current_artifact_dir()
+        vec = load_vectorizer(directory / VECTORIZER_FILE) if directory is not None else None
+        if vec is None:
+            # Rien de publié: la prochaine réindexation complète inclura ces FAQs
+            return
+        
+        engine = getattr(settings, 'CHATBOT_SEARCH_ENGINE', 'cascade')
+        try:
+            index = FAQIndex.load_snapshot(directory, vectorizer=vec)
+            char_channel = CharNgramChannel.load(directory) if get_char_ngram_mode() != 'off' else None
+            ann_index = IVFIndex.load(directory) if engine == 'ann' else None
+            lsa_index = LSAIndex.load(directory) if engine == 'lsa' else None
+        except (OSError, ValueError, KeyError, pickle.UnpicklingError) as e:
+            print(f"[Vectorization] ⚠️ Artefacts illisibles ({e}), réindexation complète")
+            _compute_and_store_vectors()
+            return
+        
+        faqs = list(
+            FAQ.objects.filter(id__in=faq_ids, is_active=True)
+            .order_by('id').only('id', 'category_id', 'question')
+        )
+        removed_ids = faq_ids - {faq.id for faq in faqs}
+        prime_normalizer([faq.question for faq in faqs])
+        
+        # Index publié + lignes modifiées (mode hachage: DF et IDF mis à jour sur une copie)
+        previous_version = index.version
+        index = apply_faq_changes(index, faqs, removed_ids)
+        vec = index.vectorizer
+        index.version = get_vectorizer_version(vec)
+        _store_vectors(vec, [faq.id for faq in faqs], [faq.question for faq in faqs])
+        
+        if char_channel is None and get_char_ngram_mode() != 'off':
+            char_channel = CharNgramChannel.build(get_char_ngram_budget())
+        elif char_channel is not None:
+            char_channel = char_channel.with_faqs(faqs, removed_ids)
+        # IVF / LSA absents ou d'un autre index: reconstruits par write_artifacts
+        if ann_index is not None and ann_index.version == previous_version:
+            ann_index = ann_index.with_faqs(index, faq_ids)
+        else:
+            ann_index = None
+        if lsa_index is not None and lsa_index.version == previous_version:
+            lsa_index = lsa_index.with_faqs(index, faq_ids)
+        else:
+            lsa_index = None
+        
+        _publish_and_install(vec, index, fingerprint, char_channel, ann_index, lsa_index)
+    print(f"[Vectorization] 📤 {len(faq_ids)} FAQ(s) republiée(s) ({len(index)} FAQs)")
+
+
+def _publish_and_install(vec, index, fingerprint, char_channel=None, ann_index=None, lsa_index=None):
+    """
+    Publier vectorizer + index (+ canal n-grammes, index IVF / LSA) en
+    artefacts versionnés, puis les installer ensemble dans ce processus.
+    
+    Les autres workers basculent à chaud au prochain os.stat du pointeur.
+    """
+    global _loaded_generation
+    
+    try:
+        directory = publish_artifacts(
+            lambda d: write_artifacts(vec, index, d, fingerprint, char_channel, ann_index, lsa_index)
+        )
+    except OSError as e:
+        print(f"[Vectorization] ⚠️ Publication des artefacts impossible ({e}), version courante conservée")
+        return
+    
+    # Ce processus passe lui aussi sur la version mmap (pages partagées):
+    # nouveau vectorizer et nouvel index installés ensemble, jamais l'un sans l'autre
+    try:
+        index = FAQIndex.load_snapshot(directory, vectorizer=vec)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[Vectorization] ⚠️ Snapshot illisible ({e}), index en mémoire conservé")
+        index.vectorizer = vec
+    with _reload_lock:
+        install_faq_index(index)
+        _loaded_generation = artifact_generation()
+    
+    # Les réponses en cache viennent de l'ancien index
+    bump_corpus_generation()
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# MISES À JOUR INCRÉMENTALES (une FAQ à la fois)
+# ═══════════════════════════════════════════════════════════════════════
+
+def update_faq_vector(faq):
+    """
+    Recalculer le vecteur d'UNE FAQ avec le vectorizer courant, sans réentraîner.
+    
+    - FAQ active : vectorisation de sa question, mise à jour de `FAQVector`
+      et des lignes correspondantes de l'index résident et du canal n-grammes.
+    - FAQ inactive : retrait de l'index résident et du canal n-grammes.
+    
+    Les autres workers reçoivent la modification par une republication des
+    artefacts en arrière-plan (`schedule_publication()`).
+    
+    Aucun entraînement n'est déclenché ici: sans vectorizer disponible, la
+    FAQ sera prise en compte au prochain `compute_and_store_vectors()`.
+    
+    Args:
+        faq (FAQ): instance sauvegardée
+    
+    Returns:
+        bool: True si le vecteur/l'index ont été mis à jour
+    """
+    if not faq.is_active:
+        update_faq_index(lambda index: apply_faq_changes(index, removed_ids=[faq.id]))
+        remove_from_char_channel(faq.id)
+        schedule_publication(faq.id)
+        print(f"[Vectorization] FAQ #{faq.id} désactivée → retirée de l'index")
+        return True
+    
+    if get_vectorizer(train_if_missing=False) is None:
+        return False
+    
+    vec = update_faq_index(lambda index: apply_faq_changes(index, faqs=[faq])).vectorizer
+    if vec is None:
+        return False
+    
+    row = vectorize_for_storage(vec, [faq.question])
+    FAQVector.objects.update_or_create(
+        faq=faq,
+        defaults={
+            "sparse_vector": pack_sparse_vector(row.indices, row.data),
+            "vectorizer_version": get_stored_version(vec),
+            "norm": float(np.linalg.norm(row.data)),
+        },
+    )
+    patch_char_channel(faq)
+    
+    if isinstance(vec, HashingTfidfVectorizer) or not record_vocabulary_drift(vec, faq.question):
+        schedule_publication(faq.id)
+    return True
+
+
+def remove_faq_vector(faq_id):
+    """Retirer une FAQ supprimée de l'index résident (la ligne `FAQVector` part en cascade)."""
+    update_faq_index(lambda index: apply_faq_changes(index, removed_ids=[faq_id]))
+    remove_from_char_channel(faq_id)
+    schedule_publication(faq_id)
+
+
+def apply_faq_changes(index, faqs=(), removed_ids=()):
+    """
+    Copie de l'index où les FAQs actives `faqs` sont (re)vectorisées et les
+    FAQs `removed_ids` retirées; ni l'index reçu ni son vectorizer ne sont
+    modifiés.
+    
+    En mode hachage, les DF sont mis à jour sur une COPIE du vectorizer
+    (l'ancienne ligne d'une FAQ sort, la nouvelle entre) et toutes les
+    lignes de l'index passent au nouvel IDF (O(nnz), sans accès base): la
+    copie est installée avec l'index repondéré, jamais l'un sans l'autre.
+    La version de l'index reste celle de sa publication (index IVF / LSA
+    publiés avec lui), comme pour une mise à jour en mode 'tfidf'.
+    
+    Args:
+        index (FAQIndex): index courant (avec son vectorizer)
+        faqs: FAQs actives à vectoriser (id, category_id, question)
+        removed_ids: ids des FAQs à retirer
+    
+    Returns:
+        FAQIndex: nouvel index (et son vectorizer)
+    """
+    vec = index.vectorizer
+    faqs = list(faqs)
+    changed = {faq.id for faq in faqs} | set(removed_ids)
+    if vec is None or not faqs and not isinstance(vec, HashingTfidfVectorizer):
+        return index.without_faqs(changed)
+    
+    if isinstance(vec, HashingTfidfVectorizer):
+        tf = vec.hash([faq.question for faq in faqs])
+        previous = [indices for indices in map(index.row_indices, changed) if indices is not None]
+        updated = vec.updated(
+            forgotten=np.concatenate(previous) if previous else (),
+            n_forgotten=len(previous),
+            counted=tf.indices,
+            n_counted=len(faqs),
+        )
+        index = index.with_matrix(updated.weighted(vec.term_frequencies(index.matrix)), vectorizer=updated)
+        rows = updated.weighted(tf)
+    else:
+        rows = vectorize_for_storage(vec, [faq.question for faq in faqs])
+    
+    norms = np.sqrt(np.asarray(rows.multiply(rows).sum(axis=1), dtype=np.float64).ravel())
+    return index.without_faqs(changed).with_faqs(
+        [faq.id for faq in faqs], [faq.category_id for faq in faqs], rows, norms,
+    )
+
+
+def record_vocabulary_drift(vec, text):
+    """
+    Comptabiliser les mots hors vocabulaire d'un texte et lancer un
+    réentraînement complet en arrière-plan si la dérive dépasse le seuil.
+    
+    Args:
+        vec (TfidfVectorizer): vectorizer courant
+        text (str): question nouvellement indexée
+    
+    Returns:
+        bool: True si un réentraînement a été demandé
+    """
+    tokens = vec.build_analyzer()(text)
+    _drift_stats['tokens'] += len(tokens)
+    _drift_stats['oov'] += sum(1 for token in tokens if token not in vec.vocabulary_)
+    
+    if _drift_stats['tokens'] < DRIFT_MIN_TOKENS:
+        return False
+    
+    oov_rate = _drift_stats['oov'] / _drift_stats['tokens']
+    if oov_rate <= DRIFT_OOV_THRESHOLD:
+        return False
+    
+    print(f"[Vectorization] ⚠️ Dérive du vocabulaire: {oov_rate:.1%} hors vocabulaire → réentraînement")
+    _drift_stats['tokens'] = _drift_stats['oov'] = 0
+    schedule_publication(retrain=True)
+    return True
+
+
+def schedule_publication(faq_id=None, retrain=False):
+    """
+    Demander une publication d'artefacts en arrière-plan.
+    
+    Args:
+        faq_id (int): FAQ créée, modifiée ou retirée, à republier
+            (`publish_faq_changes`)
+        retrain (bool): réentraînement complet (`compute_and_store_vectors`)
+    """
+    with _pending_lock:
+        if retrain:
+            _pending_publication['retrain'] = True
+        if faq_id is not None:
+            _pending_publication['faq_ids'].add(faq_id)
+    threading.Thread(target=_publish_in_background, daemon=True).start()
+
+
+def _publish_in_background():
+    """Traiter les publications en attente (un seul thread à la fois) dans un thread séparé."""
+    try:
+        # Revérifié après chaque publication: une demande arrivée pendant
+        # celle-ci (thread refoulé par le verrou) est traitée ici
+        while _pending_publication['retrain'] or _pending_publication['faq_ids']:
+            if not _publish_lock.acquire(blocking=False):
+                return
+            try:
+                # Un réentraînement relit tout le corpus: il absorbe les FAQs en attente
+                with _pending_lock:
+                    retrain = _pending_publication['retrain']
+                    faq_ids = _pending_publication['faq_ids']
+                    _pending_publication['retrain'] = False
+                    _pending_publication['faq_ids'] = set()
+                if retrain:
+                    compute_and_store_vectors()
+                elif faq_ids:
+                    publish_faq_changes(faq_ids)
+            except Exception as e:
+                print(f"[Vectorization] ⚠️ Publication en arrière-plan échouée: {e}")
+            finally:
+                _publish_lock.release()
+    finally:
+        connection.close()
@@ -79,9 +79,84 @@ CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
-    }
+    },
+    # Réponses du chatbot: partagées entre workers et conservées au redémarrage
+    # (invalidées par génération du corpus, voir chatbot/answer_cache.py).
+    # Table en base (créée par la migration chatbot 0001): au-delà de
+    # MAX_ENTRIES, chaque écriture ne coûte qu'un COUNT(*) sur la table, là où
+    # FileBasedCache listerait tout son répertoire (20k fichiers) à chaque set
+    'answers': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'chatbot_answer_cache',
+        'TIMEOUT': 3600,
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
 }
 
+# Moteur de recherche FAQ derrière find_best_faq():
+# - 'cascade'  : niveaux 0/1/2 (catégories par popularité puis fallback global)
+# - 'inverted' : index inversé terme → FAQs avec top-k élagué (MaxScore)
+# - 'ann'      : index IVF approximatif (clusters) + rescoring exact
+# - 'lsa'      : plongements denses LSA (TruncatedSVD), cosinus latent
+CHATBOT_SEARCH_ENGINE = os.getenv('CHATBOT_SEARCH_ENGINE', 'cascade')
+
+# Moteur 'ann' (chatbot.ann): clusters explorés par question (rappel ↑, latence ↑)
+# et nombre de clusters construits (0 = automatique, ~4·√N)
+CHATBOT_ANN_NPROBE = int(os.getenv('CHATBOT_ANN_NPROBE', '8'))
+CHATBOT_ANN_CLUSTERS = int(os.getenv('CHATBOT_ANN_CLUSTERS', '0'))
+
+# Moteur 'lsa' (chatbot.lsa): dimensions des plongements denses float32
+CHATBOT_LSA_COMPONENTS = int(os.getenv('CHATBOT_LSA_COMPONENTS', '256'))
+
+# Niveau 1 de la cascade: nombre de catégories explorées d'après leurs centroïdes
+CHATBOT_ROUTING_TOP_M = int(os.getenv('CHATBOT_ROUTING_TOP_M', '3'))
+
+# Affinité conversation → catégories du niveau 1 (chatbot.affinity):
+# nombre de conversations suivies par worker et durée d'inactivité (secondes)
+CHATBOT_AFFINITY_MAX_CLIENTS = int(os.getenv('CHATBOT_AFFINITY_MAX_CLIENTS', '10000'))
+CHATBOT_AFFINITY_TTL = int(os.getenv('CHATBOT_AFFINITY_TTL', '1800'))
+
+# Vectorisation des questions:
+# - 'tfidf'   : TfidfVectorizer à vocabulaire appris (réentraîné à chaque changement)
+# - 'hashing' : termes hachés en dimension fixe + IDF incrémental (sans fit global)
+CHATBOT_VECTORIZER = os.getenv('CHATBOT_VECTORIZER', 'tfidf')
+
+# Forme canonique des questions (chatbot.preprocessing.canonicalize_query):
+# retirer aussi les mots vides français (le, de, mon...) de la clé de cache
+# et du vectorizer
+CHATBOT_QUERY_STOPWORDS = os.getenv('CHATBOT_QUERY_STOPWORDS', 'False') == 'True'
+
+# Normalisation des textes avant vectorisation (chatbot.preprocessing):
+# - 'canonical' : forme canonique seule (aucun modèle chargé)
+# - 'french'    : racines Snowball en Python pur (inscription / inscriptions →
+#                 même terme), sans modèle: démarrage rapide, peu de mémoire
+# - 'spacy'     : lemmes spaCy (inscrire / inscrit → même terme), calculés en
+#                 lots à l'indexation puis lus dans un cache LRU token → lemme
+CHATBOT_PREPROCESSOR = os.getenv('CHATBOT_PREPROCESSOR', 'canonical')
+CHATBOT_SPACY_MODEL = os.getenv('CHATBOT_SPACY_MODEL', 'fr_core_news_sm')
+CHATBOT_SPACY_N_PROCESS = int(os.getenv('CHATBOT_SPACY_N_PROCESS', '1'))
+CHATBOT_LEMMA_CACHE_SIZE = int(os.getenv('CHATBOT_LEMMA_CACHE_SIZE', '50000'))
+
+# Canal n-grammes de caractères (chatbot.ngrams), tolérant aux fautes de frappe:
+# - 'fallback' : utilisé quand le vecteur par mots est nul
+# - 'blend'    : aussi mélangé aux scores par mots (poids CHATBOT_CHAR_NGRAM_WEIGHT)
+# - 'off'      : désactivé
+# CHATBOT_CHAR_NGRAM_FEATURES borne le nombre de n-grammes (et donc la mémoire)
+CHATBOT_CHAR_NGRAMS = os.getenv('CHATBOT_CHAR_NGRAMS', 'fallback')
+CHATBOT_CHAR_NGRAM_FEATURES = int(os.getenv('CHATBOT_CHAR_NGRAM_FEATURES', '20000'))
+CHATBOT_CHAR_NGRAM_WEIGHT = float(os.getenv('CHATBOT_CHAR_NGRAM_WEIGHT', '0.3'))
+
+# Intervalle (secondes) entre deux vérifications du mtime de
+# conversational_rules.json (règles rechargées à chaud)
+CHATBOT_RULES_RELOAD_INTERVAL = float(os.getenv('CHATBOT_RULES_RELOAD_INTERVAL', '5'))
+
+# Préchauffage au chargement de config.wsgi (chatbot.utils.warmup): modules ML,
+# artefacts et moteur chargés avant la première question. Désactivé, chaque
+# worker démarre sans numpy/scipy/scikit-learn et les charge à la première
+# recherche (avec `gunicorn --preload`, un préchauffage dans le maître est
+# partagé par tous les workers)
+CHATBOT_WARMUP = os.getenv('CHATBOT_WARMUP', 'False') == 'True'
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
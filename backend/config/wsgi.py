@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if getattr(settings, 'CHATBOT_WARMUP', False) and not os.environ.get('SKIP_FAQ_VECTORIZER'):
+    from chatbot.utils import warmup  # noqa: E402
+    warmup()
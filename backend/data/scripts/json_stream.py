@@ -0,0 +1,182 @@
+"""
+Lecture incrémentale des fichiers d'import FAQ (sans dépendance externe).
+
+`json.load` charge tout le fichier puis toute la liste d'objets en mémoire:
+acceptable pour supptic_chatbot_standard.json (1,4 Mo), pas pour les
+exports partenaires. Ici les items (intent ou FAQ) sont produits un par un:
+
+- tableau JSON au premier niveau (`[ {...}, {...} ]`): le fichier est lu par
+  blocs et chaque élément décodé par `JSONDecoder.raw_decode` dès qu'il est
+  complet dans le tampon;
+- JSON Lines (`.jsonl` / `.ndjson`, ou fichier commençant par `{`): un objet
+  par ligne.
+
+La mémoire reste bornée par la taille d'un item (plus un bloc de lecture),
+quelle que soit la taille du fichier.
+
+Fonctions principales :
+- `detect_json_format(path)` : 'array' ou 'lines'.
+- `iter_json_items(path)` : items du fichier, un par un.
+- `iter_chunks(items, size)` : regroupement en lots de taille fixe.
+"""
+
+import json
+from itertools import islice
+from pathlib import Path
+
+
+# Taille d'un bloc de lecture (caractères)
+READ_SIZE = 1 << 16
+
+# Extensions traitées comme JSON Lines
+JSON_LINES_SUFFIXES = ('.jsonl', '.ndjson')
+
+_WHITESPACE = ' \t\n\r'
+
+
+def detect_json_format(path):
+    """
+    Format d'un fichier d'import.
+
+    Returns:
+        str: 'array' (tableau JSON) ou 'lines' (JSON Lines)
+
+    Raises:
+        ValueError: fichier vide ou ne commençant ni par '[' ni par '{'
+    """
+    path = Path(path)
+    if path.suffix.lower() in JSON_LINES_SUFFIXES:
+        return 'lines'
+
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            char = f.read(1)
+            if not char:
+                raise ValueError(f"Fichier JSON vide: {path.name}")
+            if char not in _WHITESPACE:
+                break
+
+    if char == '[':
+        return 'array'
+    if char == '{':
+        return 'lines'
+    raise ValueError("Le fichier JSON doit contenir une liste d'objets FAQ")
+
+
+class _ArrayReader:
+    """Tampon glissant sur un tableau JSON: seuls les caractères non consommés sont gardés."""
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        """Lire un bloc de plus (au moins la taille du tampon: coût de relecture amorti)."""
+        if self.eof:
+            return False
+        chunk = self.f.read(max(READ_SIZE, len(self.buffer) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def next_char(self):
+        """Premier caractère significatif (sans le consommer), '' en fin de fichier."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char):
+        found = self.next_char()
+        if found != char:
+            raise ValueError(f"JSON invalide: '{char}' attendu, '{found or 'fin de fichier'}' trouvé")
+        self.pos += 1
+
+    def decode(self):
+        """Décoder la valeur suivante, en relisant des blocs tant qu'elle est incomplète."""
+        self.next_char()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self.fill():
+                    continue
+                raise ValueError(f"JSON invalide: {e}") from e
+            # Une valeur qui touche la fin du tampon peut être tronquée (nombre, littéral)
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _iter_array(f):
+    reader = _ArrayReader(f)
+    reader.expect('[')
+    if reader.next_char() == ']':
+        reader.pos += 1
+    else:
+        while True:
+            yield reader.decode()
+            char = reader.next_char()
+            if char == ']':
+                reader.pos += 1
+                break
+            reader.expect(',')
+
+    if reader.next_char():
+        raise ValueError("JSON invalide: contenu après la fin du tableau")
+
+
+def _iter_lines(f):
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            if line_number == 1:
+                raise ValueError(
+                    "Le fichier JSON doit contenir une liste d'objets FAQ (tableau JSON ou JSON Lines)"
+                ) from e
+            raise ValueError(f"JSON Lines invalide (ligne {line_number}): {e}") from e
+
+
+def iter_json_items(path):
+    """
+    Items d'un fichier d'import, un par un (tableau JSON ou JSON Lines).
+
+    Args:
+        path (Path): fichier .json, .jsonl ou .ndjson
+
+    Yields:
+        dict: un objet FAQ (ancien format) ou intent (nouveau format)
+
+    Raises:
+        ValueError: JSON invalide ou élément qui n'est pas un objet
+    """
+    iterator = _iter_array if detect_json_format(path) == 'array' else _iter_lines
+    with open(path, 'r', encoding='utf-8') as f:
+        for idx, item in enumerate(iterator(f), 1):
+            if not isinstance(item, dict):
+                raise ValueError(f"Élément #{idx}: objet FAQ attendu, {type(item).__name__} trouvé")
+            yield item
+
+
+def iter_chunks(items, size):
+    """Regrouper un itérable en listes d'au plus `size` éléments."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
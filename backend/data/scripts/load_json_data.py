@@ -1,31 +1,59 @@
 """
 Script de chargement des données FAQ au format JSON depuis data/json.
-Usage: python load_json_data.py
+Usage: python load_json_data.py [--chunk-size 500]
+
+Les fichiers (tableau JSON ou JSON Lines) sont lus en flux par
+`json_stream`: les items arrivent par lots de taille fixe, la mémoire ne
+dépend pas de la taille du fichier.
+
+Chaque lot est importé en quelques requêtes: les questions existantes sont
+préchargées une fois (question normalisée → id), le lot est comparé en
+mémoire puis écrit par bulk_create / bulk_update dans une transaction.
 """
 
 import os
 import sys
 import json
+import textwrap
 from pathlib import Path
-from collections import defaultdict
 
 # Configuration Django
 BACKEND_DIR = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 os.environ.setdefault('SKIP_FAQ_VECTORIZER', '1')
 
 import django
 from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
 
 django.setup()
 
+import json_stream
+
 from django.apps import apps
 Category = apps.get_model('faq', 'Category')
 FAQ = apps.get_model('faq', 'FAQ')
 User = apps.get_model('users', 'CustomUser')
 
+# Nombre d'items (intents ou FAQs) lus et traités par lot
+IMPORT_CHUNK_SIZE = 500
+
+# Lignes par requête d'insertion / mise à jour en masse
+BULK_BATCH_SIZE = 1000
+
+# Longueurs maximales des champs CharField (vérifiées avant l'écriture d'un lot)
+LONGUEURS_MAX = {
+    'categorie': Category._meta.get_field('name').max_length,
+    'sous_theme': FAQ._meta.get_field('subtheme').max_length,
+    'source': FAQ._meta.get_field('source').max_length,
+}
+
+# Fichiers importés depuis data/json
+IMPORT_PATTERNS = ('*.json',) + tuple(f'*{suffix}' for suffix in json_stream.JSON_LINES_SUFFIXES)
+
 
 def clear_database():
     """Vider les tables FAQ et Category avant l'import et réinitialiser les séquences."""
@@ -71,8 +99,9 @@ def create_admin_user():
 class FAQJsonImporter:
     """Importateur de données FAQ depuis un fichier JSON."""
     
-    def __init__(self, json_path=None):
+    def __init__(self, json_path=None, chunk_size=IMPORT_CHUNK_SIZE):
         self.json_path = json_path
+        self.chunk_size = chunk_size
         self.stats = {
             'categories_crees': 0,
             'categories_existantes': 0,
@@ -82,23 +111,30 @@ class FAQJsonImporter:
             'erreurs': 0
         }
         self.categories_cache = {}
+        # Question normalisée → id des FAQs en base (voir precharger_questions)
+        self.questions_existantes = None
         
-    def load_json(self, path=None):
-        """Charger et valider le fichier JSON."""
+    def iter_items(self, path=None):
+        """Items du fichier un par un (tableau JSON ou JSON Lines), sans tout charger."""
         if path:
             self.json_path = Path(path)
         
         if not self.json_path or not self.json_path.exists():
             raise FileNotFoundError(f"Fichier JSON non trouvé: {self.json_path}")
         
-        print(f"📂 Chargement du fichier: {self.json_path.name}")
-        with open(self.json_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        # Validation basique
-        if not isinstance(data, list):
-            raise ValueError("Le fichier JSON doit contenir une liste d'objets FAQ")
-        
+        # Validation du format dès l'ouverture (avant le premier lot)
+        format_fichier = json_stream.detect_json_format(self.json_path)
+        print(f"📂 Lecture en flux du fichier: {self.json_path.name} "
+              f"({'JSON Lines' if format_fichier == 'lines' else 'tableau JSON'})")
+        return json_stream.iter_json_items(self.json_path)
+    
+    def iter_chunks(self, path=None):
+        """Items du fichier par lots de `chunk_size`."""
+        return json_stream.iter_chunks(self.iter_items(path), self.chunk_size)
+    
+    def load_json(self, path=None):
+        """Charger et valider tout le fichier JSON (petits fichiers; l'import lit par lots)."""
+        data = list(self.iter_items(path))
         print(f"   ✓ {len(data)} FAQ(s) trouvée(s)")
         return data
     
@@ -192,8 +228,20 @@ class FAQJsonImporter:
         
         return faq_normalisee
     
-    def traiter_intent(self, item, idx, total):
-        """Traiter un item au nouveau format (intent/examples/responses)."""
+    def cle_question(self, question):
+        """Clé de comparaison d'une question (espaces normalisés, insensible à la casse)."""
+        return self.normaliser_chaine(question).casefold()
+    
+    def precharger_questions(self):
+        """Charger en une requête la table question normalisée → id des FAQs existantes."""
+        self.questions_existantes = {}
+        for faq_id, question in FAQ.objects.values_list('id', 'question').iterator(chunk_size=5000):
+            # Comme .first() sur question__iexact: la première FAQ (ordre du modèle) gagne
+            self.questions_existantes.setdefault(self.cle_question(question), faq_id)
+        print(f"   ✓ {len(self.questions_existantes)} question(s) existante(s) préchargée(s)")
+    
+    def donnees_intent(self, item, idx):
+        """Une donnée FAQ par example d'un item au nouveau format (intent/examples/responses)."""
         intent = item.get('intent', f'unknown_{idx}')
         examples = item.get('examples', [])
         responses = item.get('responses', [])
@@ -210,54 +258,39 @@ class FAQJsonImporter:
         sous_theme = metadata.get('sous_theme', '')
         source = metadata.get('source', '')
         
-        faqs_creees = 0
-        faqs_maj = 0
-        faqs_ignorees = 0
-        
-        # Créer une FAQ pour chaque example
-        for ex_idx, example in enumerate(examples):
-            # Utiliser la première réponse ou rotation si plusieurs
-            response = responses[0] if len(responses) == 1 else responses[ex_idx % len(responses)]
-            
-            try:
-                # Créer l'objet donnee comme l'ancien format
-                donnee = {
-                    'question': self.normaliser_chaine(example),
-                    'reponse': self.normaliser_chaine(response),
-                    'categorie': categorie,
-                    'sous_theme': sous_theme,
-                    'source': source
-                }
-                
-                # Vérifier si existe
-                faq_existant = self.faq_existe(donnee['question'])
-                
-                if faq_existant:
-                    modifie, statut = self.mettre_a_jour_faq(faq_existant, donnee)
-                    if modifie:
-                        faqs_maj += 1
-                    else:
-                        faqs_ignorees += 1
-                else:
-                    self.creer_faq(donnee)
-                    faqs_creees += 1
-                    
-            except Exception as e:
-                self.stats['erreurs'] += 1
-                print(f"   ❌ Erreur pour example '{example[:60]}...': {e}")
-        
-        # Afficher résumé pour cet intent
-        print(f"✅ [{idx}/{total}] Intent '{intent}': {faqs_creees} créées, {faqs_maj} MAJ, {faqs_ignorees} ignorées")
-        
-        return faqs_creees, faqs_maj, faqs_ignorees
-    
-    def faq_existe(self, question):
-        """Vérifier si une FAQ existe déjà (insensible à la casse)."""
-        question_normalisee = self.normaliser_chaine(question)
-        return FAQ.objects.filter(question__iexact=question_normalisee).first()
-    
-    def mettre_a_jour_faq(self, faq, nouvelle_donnee):
-        """Mettre à jour une FAQ existante si nécessaire."""
+        # Utiliser la première réponse ou rotation si plusieurs
+        return [
+            {
+                'question': self.normaliser_chaine(example),
+                'reponse': self.normaliser_chaine(responses[ex_idx % len(responses)]),
+                'categorie': categorie,
+                'sous_theme': sous_theme,
+                'source': source
+            }
+            for ex_idx, example in enumerate(examples)
+        ]
+    
+    def verifier_donnee(self, donnee):
+        """
+        Vérifier les longueurs des champs et résoudre la catégorie d'une donnée.
+        
+        Appelé HORS de la transaction du lot: une donnée invalide est refusée
+        seule, et une catégorie créée ici est enregistrée même si le lot est
+        annulé ensuite (le cache des catégories reste valide).
+        
+        Raises:
+            ValueError: champ plus long que sa colonne en base
+        """
+        for champ, longueur in LONGUEURS_MAX.items():
+            valeur = donnee.get(champ) or ''
+            if champ == 'categorie':
+                valeur = self.normaliser_chaine(valeur)
+            if len(str(valeur)) > longueur:
+                raise ValueError(f"Champ '{champ}' trop long ({len(str(valeur))} > {longueur} caractères)")
+        self.get_or_create_categorie(donnee['categorie'])
+    
+    def appliquer_mise_a_jour(self, faq, nouvelle_donnee):
+        """Compléter une FAQ (en mémoire) avec une nouvelle donnée. Retourne True si modifiée."""
         modifie = False
         
         # Mettre à jour la catégorie si différente
@@ -281,86 +314,161 @@ class FAQJsonImporter:
             faq.source = nouvelle_donnee['source']
             modifie = True
         
-        if modifie:
-            faq.save()
-            self.stats['faqs_mises_a_jour'] += 1
-            return True, "Mise à jour"
-        else:
-            self.stats['faqs_ignorees'] += 1
-            return False, "Déjà à jour"
+        return modifie
     
-    def creer_faq(self, donnee):
-        """Créer une nouvelle FAQ."""
-        categorie = self.get_or_create_categorie(donnee['categorie'])
-        
-        faq = FAQ.objects.create(
+    def nouvelle_faq(self, donnee):
+        """FAQ non enregistrée pour une donnée (insérée par bulk_create)."""
+        return FAQ(
             question=donnee['question'],
             answer=donnee.get('reponse', ''),
-            category=categorie,
+            category=self.get_or_create_categorie(donnee['categorie']),
             subtheme=donnee.get('sous_theme', ''),
             source=donnee.get('source', ''),
             is_active=True,
             popularity=0
         )
+    
+    def importer_lot(self, chunk, format_type, premier_idx):
+        """
+        Importer un lot d'items en quelques requêtes.
+        
+        1. normalisation des items en données FAQ;
+        2. vérification des longueurs et résolution des catégories, hors
+           transaction: une donnée invalide part seule en erreur;
+        3. FAQs existantes visées par le lot chargées en UNE requête
+           (ids trouvés dans la table préchargée des questions);
+        4. diff en mémoire: création, complément ou rien à faire;
+        5. écriture par bulk_create / bulk_update dans UNE transaction.
+        """
+        # 1. Normalisation
+        entrees = []
+        for idx, item in enumerate(chunk, premier_idx):
+            try:
+                if format_type == 'nouveau':
+                    donnees = self.donnees_intent(item, idx)
+                else:
+                    donnees = [self.normaliser_champs_faq(item)]
+                entrees.append((idx, item, donnees))
+            except Exception as e:
+                self.stats['erreurs'] += 1
+                print(f"❌ [{idx}] ERREUR: {e}")
+                print(f"   Donnée: {json.dumps(item, ensure_ascii=False)[:200]}...")
         
-        self.stats['faqs_crees'] += 1
-        return faq
+        # 2. Champs et catégories (les catégories ne sont jamais créées dans la transaction)
+        for _, _, donnees in entrees:
+            valides = []
+            for donnee in donnees:
+                try:
+                    self.verifier_donnee(donnee)
+                    valides.append(donnee)
+                except Exception as e:
+                    self.stats['erreurs'] += 1
+                    print(f"   ❌ Erreur pour '{str(donnee.get('question', ''))[:60]}...': {e}")
+            donnees[:] = valides
+        
+        # 3. FAQs existantes du lot
+        ids = {
+            self.questions_existantes[cle]
+            for _, _, donnees in entrees
+            for cle in (self.cle_question(donnee['question']) for donnee in donnees)
+            if cle in self.questions_existantes
+        }
+        existantes = FAQ.objects.only('id', 'category', 'answer', 'subtheme', 'source').in_bulk(ids)
+        
+        a_creer = {}
+        modifiees = {}
+        compteurs = {'faqs_crees': 0, 'faqs_mises_a_jour': 0, 'faqs_ignorees': 0}
+        
+        with transaction.atomic():
+            # 4. Diff en mémoire (une question répétée complète la FAQ déjà vue dans le lot)
+            for idx, item, donnees in entrees:
+                creees = maj = ignorees = 0
+                for donnee in donnees:
+                    try:
+                        cle = self.cle_question(donnee['question'])
+                        faq = a_creer.get(cle) or existantes.get(self.questions_existantes.get(cle))
+                        if faq is None:
+                            a_creer[cle] = self.nouvelle_faq(donnee)
+                            creees += 1
+                        elif self.appliquer_mise_a_jour(faq, donnee):
+                            if faq.pk:
+                                modifiees[faq.pk] = faq
+                            maj += 1
+                        else:
+                            ignorees += 1
+                    except Exception as e:
+                        self.stats['erreurs'] += 1
+                        print(f"   ❌ Erreur pour '{donnee.get('question', '')[:60]}...': {e}")
+                
+                compteurs['faqs_crees'] += creees
+                compteurs['faqs_mises_a_jour'] += maj
+                compteurs['faqs_ignorees'] += ignorees
+                if format_type == 'nouveau':
+                    intent = item.get('intent', f'unknown_{idx}')
+                    print(f"✅ [{idx}] Intent '{intent}': {creees} créées, {maj} MAJ, {ignorees} ignorées")
+                elif donnees:
+                    statut = "créée" if creees else ("Mise à jour" if maj else "Déjà à jour")
+                    prefix = "✅" if creees else ("🔄" if maj else "⏭️")
+                    print(f"{prefix} [{idx}] FAQ: {donnees[0]['question'][:80]}... [{statut}]")
+            
+            # 5. Écriture du lot
+            nouvelles = FAQ.objects.bulk_create(list(a_creer.values()), batch_size=BULK_BATCH_SIZE)
+            if modifiees:
+                # bulk_update ne passe pas par save(): updated_at (auto_now) est posé ici
+                maintenant = timezone.now()
+                for faq in modifiees.values():
+                    faq.updated_at = maintenant
+                FAQ.objects.bulk_update(
+                    list(modifiees.values()),
+                    ['category', 'answer', 'subtheme', 'source', 'updated_at'],
+                    batch_size=BULK_BATCH_SIZE,
+                )
+        
+        # Les FAQs créées deviennent des questions existantes pour les lots suivants
+        if nouvelles and nouvelles[0].pk is None:
+            # Base sans RETURNING sur les insertions en masse: relire les ids
+            nouvelles = FAQ.objects.filter(question__in=[faq.question for faq in nouvelles]).only('id', 'question')
+        for faq in nouvelles:
+            self.questions_existantes.setdefault(self.cle_question(faq.question), faq.pk)
+        
+        for cle, valeur in compteurs.items():
+            self.stats[cle] += valeur
     
     def importer(self, json_path=None):
-        """Importer toutes les FAQs du fichier JSON (ancien ou nouveau format)."""
+        """Importer toutes les FAQs du fichier JSON (ancien ou nouveau format), lot par lot."""
         from django.db import connection
         
-        data = self.load_json(json_path)
-        total = len(data)
-        
         print("\n🚀 DÉBUT DE L'IMPORTATION")
         print("=" * 80)
         
-        # Détecter le format du fichier
-        if data and 'intent' in data[0] and 'examples' in data[0]:
-            print("📋 Format détecté: NOUVEAU (intent/examples/responses)")
-            format_type = 'nouveau'
-        else:
-            print("📋 Format détecté: ANCIEN (question/reponse)")
-            format_type = 'ancien'
-        
-        print()
+        if self.questions_existantes is None:
+            self.precharger_questions()
         
-        # COMMIT RÉGULIER : Sauvegarder tous les 50 items
-        BATCH_SIZE = 50
+        format_type = None
+        idx = 0
         
-        for idx, item in enumerate(data, 1):
-            try:
-                # Traitement selon le format
-                if format_type == 'nouveau':
-                    # Nouveau format avec intent/examples/responses
-                    self.traiter_intent(item, idx, total)
+        for chunk in self.iter_chunks(json_path):
+            # Détecter le format du fichier sur le premier item
+            if format_type is None:
+                if 'intent' in chunk[0] and 'examples' in chunk[0]:
+                    print("📋 Format détecté: NOUVEAU (intent/examples/responses)")
+                    format_type = 'nouveau'
                 else:
-                    # Ancien format classique
-                    donnee = self.normaliser_champs_faq(item)
-                    
-                    # Vérifier si la FAQ existe déjà
-                    faq_existant = self.faq_existe(donnee['question'])
-                    
-                    if faq_existant:
-                        # Mise à jour
-                        modifie, statut = self.mettre_a_jour_faq(faq_existant, donnee)
-                        prefix = "🔄" if modifie else "⏭️"
-                        print(f"{prefix} [{idx}/{total}] FAQ #{faq_existant.id}: {donnee['question'][:80]}... [{statut}]")
-                    else:
-                        # Création
-                        faq = self.creer_faq(donnee)
-                        print(f"✅ [{idx}/{total}] FAQ #{faq.id} créée: {donnee['question'][:80]}...")
-                
-                # COMMIT tous les BATCH_SIZE items pour éviter timeout
-                if idx % BATCH_SIZE == 0:
-                    connection.close()  # Fermer l'ancienne connexion
-                    print(f"💾 Sauvegarde intermédiaire ({idx}/{total} traités)...")
-                
+                    print("📋 Format détecté: ANCIEN (question/reponse)")
+                    format_type = 'ancien'
+                print()
+            
+            try:
+                self.importer_lot(chunk, format_type, idx + 1)
             except Exception as e:
-                self.stats['erreurs'] += 1
-                print(f"❌ [{idx}/{total}] ERREUR: {e}")
-                print(f"   Donnée: {json.dumps(item, ensure_ascii=False)[:200]}...")
+                # Lot annulé en entier (transaction)
+                self.stats['erreurs'] += len(chunk)
+                print(f"❌ [{idx + 1}-{idx + len(chunk)}] ERREUR, lot annulé: {e}")
+            idx += len(chunk)
+            
+            # Nouvelle connexion après chaque lot pour éviter timeout
+            connection.close()
+            print(f"💾 Lot enregistré ({idx} traités)...")
         
         print("\n" + "=" * 80)
         print("📊 RÉSUMÉ DE L'IMPORTATION")
@@ -379,7 +487,8 @@ class FAQJsonImporter:
     
     def dry_run(self, json_path=None):
         """Simuler l'import sans écrire en base."""
-        data = self.load_json(json_path)
+        items = self.iter_items(json_path)
+        total = 0
         print("\n🚀 SIMULATION D'IMPORT (dry run)")
         print("=" * 80)
         
@@ -387,7 +496,8 @@ class FAQJsonImporter:
         doublons_questions = set()
         questions_vues = set()
         
-        for item in data:
+        for item in items:
+            total += 1
             try:
                 donnee = self.normaliser_champs_faq(item)
                 categories_uniques.add(donnee['categorie'])
@@ -402,7 +512,7 @@ class FAQJsonImporter:
                 print(f"❌ Erreur dans l'item: {e}")
         
         print(f"\n📊 Statistiques:")
-        print(f"   • Total FAQ dans fichier: {len(data)}")
+        print(f"   • Total FAQ dans fichier: {total}")
         print(f"   • Catégories uniques: {len(categories_uniques)}")
         print(f"   • Doublons de questions: {len(doublons_questions)}")
         
@@ -416,39 +526,54 @@ class FAQJsonImporter:
             print(f"   • {cat}")
         
         return {
-            'total': len(data),
+            'total': total,
             'categories': len(categories_uniques),
             'doublons': len(doublons_questions)
         }
 
 
 def split_fichier_par_categorie(json_path, output_dir=None):
-    """Sépare un fichier JSON unique en plusieurs fichiers par catégorie."""
+    """
+    Sépare un fichier JSON unique en plusieurs fichiers par catégorie.
+    
+    Lecture en flux: chaque item est ajouté au fichier de sa catégorie dès
+    qu'il est lu (un fichier ouvert par catégorie), rien n'est regroupé en
+    mémoire.
+    """
     if output_dir is None:
         output_dir = Path(json_path).parent / 'split'
     
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    with open(json_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # Grouper par catégorie
-    par_categorie = defaultdict(list)
-    for item in data:
-        cat = item.get('categorie', 'Non categorise')
-        # Nettoyer le nom pour le fichier
-        nom_fichier = cat.lower().replace(' ', '_').replace('&', 'et')
-        nom_fichier = ''.join(c for c in nom_fichier if c.isalnum() or c == '_')
-        par_categorie[nom_fichier].append(item)
+    # nom de fichier -> [fichier ouvert, chemin, nombre d'items écrits]
+    sorties = {}
+    try:
+        for item in json_stream.iter_json_items(json_path):
+            cat = item.get('categorie', 'Non categorise')
+            # Nettoyer le nom pour le fichier
+            nom_fichier = cat.lower().replace(' ', '_').replace('&', 'et')
+            nom_fichier = ''.join(c for c in nom_fichier if c.isalnum() or c == '_')
+            
+            sortie = sorties.get(nom_fichier)
+            if sortie is None:
+                output_path = output_dir / f"{nom_fichier}.json"
+                sortie = sorties[nom_fichier] = [open(output_path, 'w', encoding='utf-8'), output_path, 0]
+                sortie[0].write('[')
+            
+            # Même mise en forme que json.dump(items, indent=2)
+            sortie[0].write(',\n' if sortie[2] else '\n')
+            sortie[0].write(textwrap.indent(json.dumps(item, indent=2, ensure_ascii=False), '  '))
+            sortie[2] += 1
+    finally:
+        for f, _, _ in sorties.values():
+            f.write('\n]')
+            f.close()
     
     fichiers_crees = []
-    for nom, items in par_categorie.items():
-        output_path = output_dir / f"{nom}.json"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(items, f, indent=2, ensure_ascii=False)
+    for _, output_path, count in sorties.values():
         fichiers_crees.append(output_path)
-        print(f"✅ Créé: {output_path.name} ({len(items)} FAQ)")
+        print(f"✅ Créé: {output_path.name} ({count} FAQ)")
     
     return fichiers_crees
 
@@ -497,6 +622,8 @@ def main():
     parser.add_argument('--split', action='store_true', help='Séparer le fichier par catégorie')
     parser.add_argument('--verify', action='store_true', help='Vérifier l\'intégrité de la base')
     parser.add_argument('--skip-clear', action='store_true', help='Ne pas vider la base avant import')
+    parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE,
+                        help=f"Items lus et traités par lot (défaut: {IMPORT_CHUNK_SIZE})")
     
     args = parser.parse_args()
     
@@ -507,8 +634,8 @@ def main():
         print(f"❌ Répertoire non trouvé: {data_json_dir}")
         return
     
-    # Trouver tous les fichiers JSON
-    json_files = sorted(data_json_dir.glob('*.json'))
+    # Trouver tous les fichiers JSON / JSON Lines
+    json_files = sorted(f for pattern in IMPORT_PATTERNS for f in data_json_dir.glob(pattern))
     
     if not json_files:
         print(f"❌ Aucun fichier JSON trouvé dans {data_json_dir}")
@@ -525,7 +652,7 @@ def main():
         return
     
     # Mode import
-    importer = FAQJsonImporter()
+    importer = FAQJsonImporter(chunk_size=args.chunk_size)
     
     # Vider la base (sauf si skip-clear)
     if not args.skip_clear:
@@ -5,6 +5,21 @@ from pathlib import Path
 from django.apps import AppConfig
 
 
+# Commandes manage.py qui servent des requêtes : seules à vérifier les vecteurs
+SERVER_COMMANDS = ('runserver',)
+
+
+def _management_command():
+    """
+    Nom de la commande manage.py / django-admin en cours, None sinon
+    (Gunicorn, WSGI, script qui appelle django.setup()).
+    """
+    program = Path(sys.argv[0]).name if sys.argv and sys.argv[0] else ''
+    if program in ('manage.py', 'django-admin', 'django-admin.py') and len(sys.argv) > 1:
+        return sys.argv[1]
+    return None
+
+
 class FaqConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'faq'
@@ -13,6 +28,15 @@ class FaqConfig(AppConfig):
         """
         Initialiser le vectorizer TF-IDF au démarrage de Django.
         Version avec logging détaillé pour debug.
+        
+        La vectorisation complète n'est relancée que si l'empreinte du
+        corpus (ids, updated_at, is_active) diffère de celle enregistrée
+        avec les artefacts publiés. Seuls le serveur (Gunicorn, WSGI,
+        `runserver`) et les scripts qui appellent django.setup() vérifient
+        l'empreinte : les autres commandes manage.py (migrate, check,
+        startup_report...) et SKIP_FAQ_VECTORIZER (scripts d'import) ne
+        vérifient ni n'importent rien: numpy, scipy et scikit-learn restent
+        déchargés.
         """
         
         # ===== DEBUG : Afficher qu'on est bien dans ready() =====
@@ -29,17 +53,37 @@ class FaqConfig(AppConfig):
             print("[FAQ] ⏭️ Skip (autoreloader parent process)", file=sys.stderr)
             return
         
-        # ===== 2. Lock fichier pour éviter l'init multiple avec Gunicorn =====
+        # ===== 2. Empreinte du corpus : réutiliser les vecteurs si rien n'a changé =====
         lock_file = Path('/tmp/faq_vectorizer.lock')
-        init_done_file = Path('/tmp/faq_vectorizer_done.flag')
+        fingerprint = stored = None
+        command = _management_command()
         
-        print(f"[FAQ DEBUG] Lock file: {lock_file}", file=sys.stderr)
-        print(f"[FAQ DEBUG] Done flag: {init_done_file}", file=sys.stderr)
-        print(f"[FAQ DEBUG] Done flag exists: {init_done_file.exists()}", file=sys.stderr)
+        if os.environ.get('SKIP_FAQ_VECTORIZER'):
+            # Scripts d'import / maintenance : ni vectorisation ni imports ML
+            print("[FAQ] ⏭️ SKIP_FAQ_VECTORIZER : vectorisation ignorée au démarrage")
+        elif command is not None and command not in SERVER_COMMANDS:
+            # Commande de maintenance : ne sert pas de requêtes, rien à vérifier
+            print(f"[FAQ] ⏭️ Commande '{command}' : vectorisation ignorée au démarrage")
+        else:
+            try:
+                from chatbot.vectorization import (
+                    compute_and_store_vectors,
+                    compute_corpus_fingerprint,
+                    stored_corpus_fingerprint,
+                )
+                fingerprint = compute_corpus_fingerprint()
+                stored = stored_corpus_fingerprint()
+            except Exception as e:
+                # Base non migrée (ex: `runserver` avant `migrate`) : rien à vectoriser
+                print(f"[FAQ] ⚠️ Empreinte du corpus indisponible : {e}")
+                fingerprint = stored = None
         
-        # Si déjà initialisé (flag existe), skip
-        if init_done_file.exists():
-            print("[FAQ] ⏭️ Vectorizer déjà initialisé (flag détecté)")
+        print(f"[FAQ DEBUG] Empreinte corpus: {fingerprint} (artefacts: {stored})", file=sys.stderr)
+        
+        if fingerprint is None:
+            pass
+        elif stored == fingerprint:
+            print("[FAQ] ⏭️ Corpus inchangé, vecteurs existants réutilisés")
         else:
             # Essayer d'acquérir le lock
             try:
@@ -51,16 +95,14 @@ class FaqConfig(AppConfig):
                 
                 print("[FAQ DEBUG] Lock acquis !", file=sys.stderr)
                 
-                # On a le lock, on initialise
+                # On a le lock, on initialise (sauf si un autre worker vient de finir)
                 try:
-                    from chatbot.vectorization import compute_and_store_vectors
-                    print("[FAQ] 🚀 Initialisation du vectorizer TF-IDF...")
-                    compute_and_store_vectors()
-                    print("[FAQ] ✅ Vectorizer entraîné et FAQVectors stockés en BD")
-                    
-                    # Créer le flag "done"
-                    init_done_file.touch()
-                    print("[FAQ DEBUG] Flag 'done' créé", file=sys.stderr)
+                    if stored_corpus_fingerprint() == fingerprint:
+                        print("[FAQ] ✅ Vecteurs publiés entre-temps par un autre worker")
+                    else:
+                        print("[FAQ] 🚀 Corpus modifié, initialisation du vectorizer TF-IDF...")
+                        compute_and_store_vectors()
+                        print("[FAQ] ✅ Vectorizer entraîné et FAQVectors stockés en BD")
                     
                 except Exception as e:
                     print(f"[FAQ] ⚠️ Initialisation vectorizer échouée : {e}")
@@ -73,13 +115,13 @@ class FaqConfig(AppConfig):
                     print("[FAQ DEBUG] Lock libéré", file=sys.stderr)
                     
             except FileExistsError:
-                # Un autre worker a le lock, attendre qu'il finisse
+                # Un autre worker a le lock, attendre qu'il publie les artefacts
                 print("[FAQ] ⏳ Attente de l'initialisation par un autre worker...")
                 print(f"[FAQ DEBUG] Lock déjà pris, attente...", file=sys.stderr)
                 
-                # Attendre max 60 secondes que le flag "done" apparaisse
+                # Attendre max 60 secondes que l'empreinte publiée corresponde
                 for i in range(60):
-                    if init_done_file.exists():
+                    if stored_corpus_fingerprint() == fingerprint:
                         print("[FAQ] ✅ Initialisation terminée par un autre worker")
                         break
                     if i % 5 == 0:
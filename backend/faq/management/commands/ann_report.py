@@ -0,0 +1,87 @@
+import random
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from chatbot.ann import IVFIndex
+from chatbot.vectorization import compute_tfidf_matrix, get_search_index
+from ...models import FAQ
+
+
+class Command(BaseCommand):
+    help = "Mesure rappel et latence du moteur 'ann' (IVF) face à la recherche exacte"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', type=int, default=300, help='Nombre de questions testées')
+        parser.add_argument('--top-k', type=int, default=3, help='Taille du top-k comparé')
+        parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32],
+                            help='Valeurs de nprobe à mesurer')
+        parser.add_argument('--clusters', type=int, default=0, help='Nombre de clusters (0 = automatique)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        top_k = options['top_k']
+
+        index = get_search_index()
+        if not len(index):
+            self.stdout.write(self.style.ERROR("Index vide. Vectorisez d'abord les FAQs."))
+            return
+
+        # 1. Questions de test: questions de FAQs amputées d'un mot (formulation approchée)
+        questions = list(FAQ.objects.filter(is_active=True).values_list('question', flat=True))
+        questions = rng.sample(questions, min(options['queries'], len(questions)))
+        queries = []
+        for question in questions:
+            words = question.split()
+            if len(words) > 3:
+                del words[rng.randrange(len(words))]
+            queries.append(' '.join(words))
+
+        matrix, norms = compute_tfidf_matrix(queries, index.vectorizer)
+        vectors = [(matrix[i].toarray().ravel(), float(norms[i])) for i in range(len(queries)) if norms[i] > 0]
+
+        # 2. Construction de l'index IVF
+        start = time.perf_counter()
+        ann = IVFIndex.build(index, options['clusters'] or None)
+        build_time = time.perf_counter() - start
+        self.stdout.write(
+            f"{len(index)} FAQs, {ann.n_clusters} clusters (construction {build_time:.2f}s), "
+            f"{len(vectors)} questions, top-{top_k}"
+        )
+
+        # 3. Référence: recherche exacte sur tout l'index
+        exact, latencies = [], []
+        for user_vec, user_norm in vectors:
+            start = time.perf_counter()
+            results = index.search(user_vec, user_norm, top_k=top_k)
+            latencies.append(time.perf_counter() - start)
+            exact.append(results)
+        self.stdout.write(f"{'exact':>8} | rappel@{top_k} 1.000 | top-1 1.000 | "
+                          f"candidats {len(index):>6} | {self._latency(latencies)}")
+
+        # 4. IVF pour chaque nprobe
+        for nprobe in options['nprobe']:
+            hits, top1, candidates, latencies = 0, 0, 0, []
+            for (user_vec, user_norm), reference in zip(vectors, exact):
+                start = time.perf_counter()
+                results = ann.search(index, user_vec, user_norm, top_k=top_k, nprobe=nprobe)
+                latencies.append(time.perf_counter() - start)
+
+                candidates += len(ann.candidate_rows(index, user_vec, user_norm, nprobe))
+                reference_ids = {faq_id for faq_id, _ in reference}
+                hits += len(reference_ids & {faq_id for faq_id, _ in results})
+                top1 += bool(results and reference and results[0][0] == reference[0][0])
+
+            total = sum(len(reference) for reference in exact) or 1
+            self.stdout.write(
+                f"{'n=' + str(nprobe):>8} | rappel@{top_k} {hits / total:.3f} | "
+                f"top-1 {top1 / len(vectors):.3f} | candidats {candidates // len(vectors):>6} | "
+                f"{self._latency(latencies)}"
+            )
+
+        self.stdout.write(self.style.SUCCESS("Rapport terminé"))
+
+    @staticmethod
+    def _latency(latencies):
+        latencies = np.asarray(latencies) * 1000
+        return f"médiane {np.median(latencies):.2f} ms, p95 {np.percentile(latencies, 95):.2f} ms"
@@ -0,0 +1,91 @@
+import os
+import subprocess
+import sys
+from django.core.management.base import BaseCommand
+
+
+# Modules mesurés, du plus léger au plus lourd
+MODULES = [
+    'chatbot.preprocessing',
+    'chatbot.utils',
+    'chatbot.artifacts',
+    'chatbot.index',
+    'chatbot.routing',
+    'chatbot.inverted_index',
+    'chatbot.ann',
+    'chatbot.lsa',
+    'chatbot.ngrams',
+    'chatbot.vectorization',
+    'chatbot.similarity',
+    'faq.views',
+]
+
+# Dépendances lourdes dont on signale le chargement
+HEAVY_PACKAGES = ('numpy', 'scipy', 'scipy.sparse', 'sklearn', 'spacy')
+
+# Code exécuté dans un interpréteur neuf pour chaque module
+SNIPPET = (
+    "import time; start = time.perf_counter(); import django; django.setup(); "
+    "setup = time.perf_counter() - start; start = time.perf_counter(); "
+    "import importlib; importlib.import_module({module!r}); "
+    "print(setup, time.perf_counter() - start)"
+)
+
+
+class Command(BaseCommand):
+    help = "Mesure le temps d'import de chaque module du chatbot (interpréteur neuf, -X importtime)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('modules', nargs='*', help='Modules à mesurer (défaut: modules du chatbot)')
+        parser.add_argument('--repeat', type=int, default=3, help='Mesures par module (la meilleure est gardée)')
+        parser.add_argument('--with-vectorizer', action='store_true',
+                            help="Ne pas poser SKIP_FAQ_VECTORIZER (ready() vérifie l'empreinte du corpus)")
+
+    def handle(self, *args, **options):
+        modules = options['modules'] or MODULES
+        env = dict(os.environ)
+        if options['with_vectorizer']:
+            env.pop('SKIP_FAQ_VECTORIZER', None)
+        else:
+            env['SKIP_FAQ_VECTORIZER'] = '1'
+
+        self.stdout.write(f"{'module':<24} | {'setup':>9} | {'import':>9} | dépendances lourdes (cumul)")
+        for module in modules:
+            best = None
+            for _ in range(max(options['repeat'], 1)):
+                measure = self._measure(module, env)
+                if measure is not None and (best is None or sum(measure[:2]) < sum(best[:2])):
+                    best = measure
+            if best is None:
+                self.stdout.write(self.style.ERROR(f"{module:<24} | import impossible"))
+                continue
+            setup, elapsed, heavy = best
+            details = ', '.join(f"{name} {ms:.0f} ms" for name, ms in heavy.items()) or '—'
+            self.stdout.write(f"{module:<24} | {setup * 1000:>6.0f} ms | {elapsed * 1000:>6.0f} ms | {details}")
+
+        self.stdout.write(self.style.SUCCESS("Rapport terminé"))
+
+    @staticmethod
+    def _measure(module, env):
+        """
+        Durées de django.setup() puis de l'import du module, et dépendances
+        lourdes chargées par le processus (None si l'import échoue).
+        """
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', SNIPPET.format(module=module)],
+            capture_output=True, text=True, env=env,
+        )
+        if result.returncode != 0:
+            return None
+
+        # Sortie -X importtime: "import time: self [us] | cumulative | package"
+        heavy = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            _, cumulative, name = line.split('|')
+            name = name.strip()
+            if name in HEAVY_PACKAGES and cumulative.strip().isdigit():
+                heavy[name] = heavy.get(name, 0) + int(cumulative) / 1000
+        setup, elapsed = map(float, result.stdout.strip().splitlines()[-1].split())
+        return setup, elapsed, heavy
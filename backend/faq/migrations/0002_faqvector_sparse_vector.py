@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faq', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='faqvector',
+            name='sparse_vector',
+            field=models.BinaryField(default=b'', verbose_name='Vecteur TF-IDF (creux, binaire)'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='faqvector',
+            name='vectorizer_version',
+            field=models.CharField(blank=True, max_length=64, verbose_name='Version du vectorizer'),
+        ),
+        migrations.AlterField(
+            model_name='faqvector',
+            name='tfidf_vector',
+            field=models.JSONField(null=True, verbose_name='Vecteur TF-IDF'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:00
+
+from django.db import migrations
+
+
+BATCH_SIZE = 500
+
+# Version des vecteurs convertis: tous issus du même vectorizer (celui de
+# l'ancien format JSON), remplacés au prochain compute_and_store_vectors()
+LEGACY_VECTORIZER_VERSION = 'legacy-json'
+
+
+def pack_json_vectors(apps, schema_editor):
+    """
+    Convertir les vecteurs JSON denses en blobs creux (int32 indices + float32 valeurs).
+
+    Les lignes sans version reçoivent LEGACY_VECTORIZER_VERSION: l'index
+    construit depuis la base ne voit ainsi qu'un seul vectorizer.
+    """
+    import numpy as np  # import local: `manage.py migrate` ne charge numpy que s'il exécute cette migration
+
+    FAQVector = apps.get_model('faq', 'FAQVector')
+
+    batch = []
+    for faq_vector in FAQVector.objects.only('id', 'tfidf_vector', 'vectorizer_version').iterator(chunk_size=BATCH_SIZE):
+        dense = np.asarray(faq_vector.tfidf_vector or [], dtype=np.float32)
+        indices = np.flatnonzero(dense)
+        faq_vector.sparse_vector = (indices.astype('<i4').tobytes()
+                                    + dense[indices].astype('<f4').tobytes())
+        faq_vector.vectorizer_version = faq_vector.vectorizer_version or LEGACY_VECTORIZER_VERSION
+        batch.append(faq_vector)
+
+        if len(batch) >= BATCH_SIZE:
+            FAQVector.objects.bulk_update(batch, ['sparse_vector', 'vectorizer_version'])
+            batch = []
+
+    if batch:
+        FAQVector.objects.bulk_update(batch, ['sparse_vector', 'vectorizer_version'])
+
+
+def unpack_sparse_vectors(apps, schema_editor):
+    """
+    Reconstruire les listes JSON denses depuis les blobs creux.
+
+    La dimension n'étant pas stockée, elle est déduite du plus grand indice
+    présent dans la table.
+    """
+    import numpy as np
+
+    FAQVector = apps.get_model('faq', 'FAQVector')
+
+    decoded = []
+    n_features = 0
+    for faq_vector in FAQVector.objects.only('id', 'sparse_vector').iterator(chunk_size=BATCH_SIZE):
+        blob = faq_vector.sparse_vector
+        nnz = len(blob) // 8
+        indices = np.frombuffer(blob, dtype='<i4', count=nnz)
+        values = np.frombuffer(blob, dtype='<f4', count=nnz, offset=4 * nnz)
+        if nnz:
+            n_features = max(n_features, int(indices.max()) + 1)
+        decoded.append((faq_vector.id, indices, values))
+
+    batch = []
+    for vector_id, indices, values in decoded:
+        dense = np.zeros(n_features, dtype=np.float32)
+        dense[indices] = values
+        batch.append(FAQVector(id=vector_id, tfidf_vector=dense.tolist()))
+
+        if len(batch) >= BATCH_SIZE:
+            FAQVector.objects.bulk_update(batch, ['tfidf_vector'])
+            batch = []
+
+    if batch:
+        FAQVector.objects.bulk_update(batch, ['tfidf_vector'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faq', '0002_faqvector_sparse_vector'),
+    ]
+
+    operations = [
+        migrations.RunPython(pack_json_vectors, unpack_sparse_vectors),
+    ]
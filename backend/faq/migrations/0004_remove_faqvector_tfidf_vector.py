@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 09:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('faq', '0003_pack_faqvector_sparse_vector'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='faqvector',
+            name='tfidf_vector',
+        ),
+    ]
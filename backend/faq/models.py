@@ -47,9 +47,14 @@ class FAQVector(models.Model):
     """
     Vecteurs TF-IDF pré-calculés pour chaque FAQ.
     Utilisé pour la recherche par similarité.
+
+    Le vecteur est stocké en format creux binaire (voir `chatbot.index`):
+    indices int32 des termes non nuls suivis de leurs poids float32.
+    En mode hachage, les poids sont les fréquences de termes (sans IDF).
     """
     faq = models.OneToOneField(FAQ, on_delete=models.CASCADE, related_name='vector', verbose_name="FAQ associée")
-    tfidf_vector = models.JSONField(verbose_name="Vecteur TF-IDF")
+    sparse_vector = models.BinaryField(verbose_name="Vecteur TF-IDF (creux, binaire)")
+    vectorizer_version = models.CharField(max_length=64, blank=True, verbose_name="Version du vectorizer")
     norm = models.FloatField(verbose_name="Norme du vecteur")
     computed_at = models.DateTimeField(auto_now_add=True, verbose_name="Calculé le")
 
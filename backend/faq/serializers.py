@@ -115,12 +115,39 @@ class QuestionRequestSerializer(serializers.Serializer):
         max_value=10,
         help_text="Nombre de résultats à retourner (défaut: 3)"
     )
+    session_id = serializers.CharField(
+        max_length=128,
+        required=False,
+        allow_blank=True,
+        help_text="Identifiant de conversation (affinité de catégories entre questions)"
+    )
+
+
+class BatchQuestionRequestSerializer(serializers.Serializer):
+    """Sérialisation d'une requête groupée (POST /api/chatbot/ask/batch/)."""
+    
+    questions = serializers.ListField(
+        child=serializers.CharField(max_length=1000),
+        min_length=1,
+        max_length=500,
+        help_text="Questions posées (500 maximum par requête)"
+    )
+    top_k = serializers.IntegerField(
+        default=3,
+        min_value=1,
+        max_value=10,
+        help_text="Nombre de résultats par question (défaut: 3)"
+    )
 
 
 class ChatbotResponseSerializer(serializers.Serializer):
     """Sérialisation d'une réponse du chatbot avec statut de confiance."""
     
     question = serializers.CharField()
+    canonical_question = serializers.CharField(
+        required=False,
+        help_text="Forme canonique utilisée pour la clé de cache et la vectorisation"
+    )
     results = serializers.ListField(
         child=serializers.DictField(
             child=serializers.CharField(),
@@ -131,3 +158,10 @@ class ChatbotResponseSerializer(serializers.Serializer):
     status = serializers.CharField(
         help_text="Status de confiance: 'not found', 'uncertain', ou 'confident'"
     )
+
+
+class BatchChatbotResponseSerializer(serializers.Serializer):
+    """Sérialisation d'une réponse groupée: une réponse `ask` par question."""
+    
+    responses = ChatbotResponseSerializer(many=True)
+    count = serializers.IntegerField()
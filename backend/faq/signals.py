@@ -1,12 +1,25 @@
 """
 Signaux Django pour l'app FAQ.
 
-Recalcule les poids et scores des vecteurs suite aux feedbacks utilisateurs.
+- Recalcule les poids et scores des vecteurs suite aux feedbacks utilisateurs.
+- Met à jour le vecteur et l'index d'UNE FAQ quand elle est créée,
+  modifiée, désactivée ou supprimée (sans réindexer tout le corpus).
+- Invalide le cache partagé des réponses à chaque modification de FAQ
+  ou de catégorie (nouvelle génération du corpus).
 """
 
-from django.db.models.signals import post_save
+import os
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from faq.models import Feedback, FAQVector
+from faq.models import Category, FAQ, Feedback
+
+
+# Champs dont la modification change le vecteur ou la présence dans l'index
+VECTOR_FIELDS = {'question', 'is_active', 'category'}
+
+# Champs modifiés sans changer les réponses servies (feedbacks → popularité)
+CACHE_NEUTRAL_FIELDS = {'popularity'}
 
 
 @receiver(post_save, sender=Feedback)
@@ -34,7 +47,7 @@ def update_faq_vector_on_feedback(sender, instance, created, **kwargs):
     # Seuls les feedbacks positifs augmentent la popularité
     if feedback_type == 'positif':
         faq.popularity += 1
-        faq.save()
+        faq.save(update_fields=['popularity'])
     
     # ===== 2. Ajuster le score_similarite selon la satisfaction =====
     # Les scores négatifs doivent affecter le avg_score en le réduisant
@@ -46,3 +59,68 @@ def update_faq_vector_on_feedback(sender, instance, created, **kwargs):
         print(f"[FAQ Signal] Feedback #{instance.id} négatif : score réduit de 30%")
     
 
+
+def _incremental_indexing_enabled(**kwargs):
+    """Pas de vectorisation pendant le chargement de fixtures ou les imports en masse."""
+    if kwargs.get('raw'):
+        return False
+    return not os.environ.get('SKIP_FAQ_VECTORIZER')
+
+
+@receiver(post_save, sender=FAQ)
+def update_vector_on_faq_save(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Signal : création/modification/désactivation d'une FAQ → mise à jour
+    incrémentale de son vecteur et de l'index résident (après commit).
+    """
+    if not _incremental_indexing_enabled(**kwargs):
+        return
+
+    if update_fields is not None and not VECTOR_FIELDS.intersection(update_fields):
+        return
+
+    def _update():
+        from chatbot.vectorization import update_faq_vector
+        try:
+            update_faq_vector(instance)
+        except Exception as e:
+            print(f"[FAQ Signal] ⚠️ Mise à jour du vecteur FAQ #{instance.id} échouée : {e}")
+
+    transaction.on_commit(_update)
+
+
+@receiver(post_delete, sender=FAQ)
+def remove_vector_on_faq_delete(sender, instance, **kwargs):
+    """Signal : suppression d'une FAQ → retrait de l'index résident (après commit)."""
+    if not _incremental_indexing_enabled(**kwargs):
+        return
+
+    faq_id = instance.id
+
+    def _remove():
+        from chatbot.vectorization import remove_faq_vector
+        remove_faq_vector(faq_id)
+
+    transaction.on_commit(_remove)
+
+
+@receiver(post_save, sender=FAQ)
+@receiver(post_delete, sender=FAQ)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_answer_cache(sender, update_fields=None, **kwargs):
+    """
+    Signal : toute modification de FAQ ou de catégorie → nouvelle génération
+    du corpus (après commit), les réponses en cache ne sont plus servies.
+    """
+    if update_fields is not None and set(update_fields) <= CACHE_NEUTRAL_FIELDS:
+        return
+
+    def _bump():
+        from chatbot.answer_cache import bump_corpus_generation
+        try:
+            bump_corpus_generation()
+        except Exception as e:
+            print(f"[FAQ Signal] ⚠️ Invalidation du cache des réponses échouée : {e}")
+
+    transaction.on_commit(_bump)
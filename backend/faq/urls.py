@@ -5,17 +5,13 @@ Routes enregistrées via DRF router:
 - /api/categories/ : GET, POST, PUT, DELETE
 - /api/faq/ : GET, POST, PUT, DELETE
 - /api/chatbot/ask/ : POST
+- /api/chatbot/ask/batch/ : POST
 - /api/feedback/ : GET, POST
 """
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-<<<<<<< HEAD
-from .views import (
-=======
-
 from faq.views import (
->>>>>>> dev
     CategoryViewSet,
     FAQViewSet,
     ChatbotAskViewSet,
@@ -7,12 +7,12 @@ Endpoints :
 - GET /api/categories/ : lister catégories
 - POST /api/categories/ : créer catégorie
 - POST /api/chatbot/ask/ : poser une question et obtenir réponses pertinentes
+- POST /api/chatbot/ask/batch/ : poser plusieurs questions en une requête
 - POST /api/feedback/ : envoyer un feedback
 """
 
 from rest_framework import viewsets, status
 from django.db.models import Count, Avg, Q
-from django.core.cache import cache
 from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -25,9 +25,13 @@ from faq.serializers import (
     FAQListSerializer,
     FeedbackSerializer,
     QuestionRequestSerializer,
+    BatchQuestionRequestSerializer,
     ChatbotResponseSerializer,
+    BatchChatbotResponseSerializer,
 )
-from chatbot.utils import find_best_faq
+from chatbot.answer_cache import get_cached_answers, set_cached_answers
+from chatbot.preprocessing import canonicalize_query
+from chatbot.utils import find_best_faq, find_best_faq_batch
 
 
 class CategoryViewSet(viewsets.ModelViewSet):
@@ -88,6 +92,7 @@ class ChatbotAskViewSet(viewsets.ViewSet):
     Endpoint pour poser une question au chatbot.
     
     - POST /api/chatbot/ask/ : poser question et obtenir top-k réponses
+    - POST /api/chatbot/ask/batch/ : poser N questions en une requête
     """
     permission_classes = [AllowAny]
     
@@ -104,12 +109,14 @@ class ChatbotAskViewSet(viewsets.ViewSet):
         Body:
         {
             "question": "Comment réinitialiser mon mot de passe ?",
-            "top_k": 3
+            "top_k": 3,
+            "session_id": "a1b2c3"   (optionnel)
         }
         
         Response:
         {
             "question": "Comment réinitialiser mon mot de passe ?",
+            "canonical_question": "comment reinitialiser mon mot de passe",
             "results": [
                 {
                     "faq_id": 1,
@@ -130,16 +137,15 @@ class ChatbotAskViewSet(viewsets.ViewSet):
         question = serializer.validated_data['question']
         top_k = serializer.validated_data.get('top_k', 1)
         
-        # ===== 1. Vérifier le cache =====
-        import hashlib
-        cache_key = f"query_{hashlib.md5(question.strip().lower().encode()).hexdigest()}"
-        cached_response = cache.get(cache_key)
+        # ===== 1. Vérifier le cache partagé (génération courante du corpus) =====
+        cached_response = get_cached_answers([question], top_k).get(question)
         if cached_response:
             return Response(cached_response, status=status.HTTP_200_OK)
         
         # ===== 2. Recherche TF-IDF =====
+        client_id = _client_id(request, serializer.validated_data.get('session_id'))
         try:
-            faq_results = find_best_faq(question, top_k=top_k)
+            faq_results = find_best_faq(question, top_k=top_k, client_id=client_id)
         except Exception as e:
             return Response(
                 {'error': f'Erreur lors de la recherche : {str(e)}'},
@@ -147,43 +153,128 @@ class ChatbotAskViewSet(viewsets.ViewSet):
             )
         
         # ===== 3. Appliquer les seuils et formater =====
-        results = []
-        status_confidence = "not found"
-        
-        for faq_result in faq_results:
-            faq = faq_result['faq']
-            score = faq_result['score']
-            
-            # Déterminer le statut de confiance
-            if score < 0.6:
-                if status_confidence == "not found":
-                    status_confidence = "not found"
-            elif 0.6 <= score < 0.8:
-                if status_confidence != "confident":
-                    status_confidence = "uncertain"
-            else:
-                status_confidence = "confident"
-            
-            results.append({
-                'faq_id': faq.id,
-                'question': faq.question,
-                'answer': faq.answer,
-                'score': round(score, 4),
-                'category': faq.category.name,
-            })
-        
-        response_data = {
-            'question': question,
-            'results': results,
-            'count': len(results),
-            'status': status_confidence,
-        }
+        response_data = _format_chatbot_response(question, faq_results)
         
         # ===== 4. Mettre en cache pour 1 heure =====
-        cache.set(cache_key, response_data, 3600)
+        # (sauf un résultat orienté par l'affinité de CETTE conversation: le
+        # cache est partagé par tous les clients)
+        if not any(result.get('affinity') for result in faq_results):
+            set_cached_answers({question: response_data}, top_k)
         
         response_serializer = ChatbotResponseSerializer(response_data)
         return Response(response_serializer.data, status=status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'], url_path='ask/batch')
+    def ask_batch(self, request):
+        """
+        Poser plusieurs questions en une seule requête (intégrations, jobs).
+        
+        Les questions absentes du cache sont vectorisées ensemble puis
+        cherchées par le même parcours que `ask` (sans affinité de
+        conversation): les réponses mises en cache sont celles que `ask`
+        aurait données. Mêmes seuils de confiance que `ask`.
+        
+        Body:
+        {
+            "questions": ["Comment réinitialiser mon mot de passe ?", "..."],
+            "top_k": 3
+        }
+        
+        Response:
+        {
+            "responses": [ { même format que /api/chatbot/ask/ }, ... ],
+            "count": 2
+        }
+        """
+        serializer = BatchQuestionRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        questions = serializer.validated_data['questions']
+        top_k = serializer.validated_data.get('top_k', 1)
+        
+        # ===== 1. Vérifier le cache partagé (une lecture groupée) =====
+        cached = get_cached_answers(questions, top_k)
+        missing = list(dict.fromkeys(q for q in questions if q not in cached))
+        
+        # ===== 2. Recherche groupée des questions absentes du cache =====
+        try:
+            batch_results = find_best_faq_batch(missing, top_k=top_k)
+        except Exception as e:
+            return Response(
+                {'error': f'Erreur lors de la recherche : {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        
+        # ===== 3. Appliquer les seuils, formater et mettre en cache =====
+        fresh = {
+            question: _format_chatbot_response(question, faq_results)
+            for question, faq_results in zip(missing, batch_results)
+        }
+        set_cached_answers(fresh, top_k)
+        
+        responses = [cached.get(question) or fresh[question] for question in questions]
+        response_serializer = BatchChatbotResponseSerializer({
+            'responses': responses,
+            'count': len(responses),
+        })
+        return Response(response_serializer.data, status=status.HTTP_200_OK)
+
+
+def _client_id(request, session_id=None):
+    """
+    Identifiant de conversation pour l'affinité de catégories: `session_id`
+    envoyé par le client, sinon session Django, sinon adresse IP.
+    """
+    if session_id:
+        return f"sid:{session_id}"
+    session_key = getattr(getattr(request, 'session', None), 'session_key', None)
+    if session_key:
+        return f"session:{session_key}"
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')[0].strip()
+    return f"ip:{forwarded or request.META.get('REMOTE_ADDR', '')}"
+
+
+def _format_chatbot_response(question, faq_results):
+    """
+    Appliquer les seuils de confiance et formater les résultats.
+    
+    - Score < 0.6 : "not found"
+    - Score 0.6-0.8 : "uncertain"
+    - Score >= 0.8 : "confident"
+    """
+    results = []
+    status_confidence = "not found"
+    
+    for faq_result in faq_results:
+        faq = faq_result['faq']
+        score = faq_result['score']
+        
+        # Déterminer le statut de confiance
+        if score < 0.6:
+            if status_confidence == "not found":
+                status_confidence = "not found"
+        elif 0.6 <= score < 0.8:
+            if status_confidence != "confident":
+                status_confidence = "uncertain"
+        else:
+            status_confidence = "confident"
+        
+        results.append({
+            'faq_id': faq.id,
+            'question': faq.question,
+            'answer': faq.answer,
+            'score': round(score, 4),
+            'category': faq.category.name,
+        })
+    
+    return {
+        'question': question,
+        'canonical_question': canonicalize_query(question),
+        'results': results,
+        'count': len(results),
+        'status': status_confidence,
+    }
 
 
 class FeedbackViewSet(viewsets.ModelViewSet):
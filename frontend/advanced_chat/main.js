@@ -22,6 +22,16 @@ const API_BASE = (() => {
 })();
 
 const API_URL = `${API_BASE}/api/chatbot/ask/`;
+
+// Identifiant de conversation (affinité de catégories côté serveur)
+const SESSION_ID = (() => {
+  let id = sessionStorage.getItem("chatbot_session_id");
+  if (!id) {
+    id = Math.random().toString(36).slice(2) + Date.now().toString(36);
+    sessionStorage.setItem("chatbot_session_id", id);
+  }
+  return id;
+})();
 const API_FEEDBACK_URL = `${API_BASE}/api/feedback/`;
 const API_STATS_URL = `${API_BASE}/api/stats/`;
 
@@ -455,7 +465,7 @@ async function ask(question) {
         "Content-Type": "application/json",
         Accept: "application/json",
       },
-      body: JSON.stringify({ question, top_k: 1 }), // On demande 1 seul résultat
+      body: JSON.stringify({ question, top_k: 1, session_id: SESSION_ID }), // On demande 1 seul résultat
     });
 
     if (!response.ok) {